@@ -1,20 +1,27 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
 from backend.models import get_db, User, CheckInTask
 from backend.schemas.check_in import BatchCheckInRequest
 from backend.schemas.user import UserResponse
 from backend.services.check_in_service import CheckInService
 from backend.services.admin_service import AdminService
+from backend.services.task_service import TaskService
 from backend.dependencies import get_current_admin_user
 from backend.config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 实时日志轮询间隔与心跳间隔（秒）
+LOG_STREAM_POLL_SECONDS = 1.0
+LOG_STREAM_HEARTBEAT_SECONDS = 15.0
+
 
 class BatchToggleTasksRequest(BaseModel):
     """批量启用/禁用任务请求"""
@@ -22,8 +29,31 @@ class BatchToggleTasksRequest(BaseModel):
     is_active: bool
 
 
+class BatchUpdateCronRequest(BaseModel):
+    """批量修改 Cron 表达式请求"""
+    task_ids: List[int]
+    cron_expression: Optional[str] = Field(None, max_length=100, description="Crontab 表达式，NULL 表示禁用定时打卡")
+
+    @field_validator('cron_expression')
+    @classmethod
+    def validate_cron_expression(cls, v: Optional[str]) -> Optional[str]:
+        """验证 Crontab 表达式格式"""
+        if v is None:
+            return v
+
+        from croniter import croniter
+        if not v.strip() or not croniter.is_valid(v):
+            raise ValueError(f"无效的 Crontab 表达式: '{v}'")
+        return v
+
+
+class BatchDeleteTasksRequest(BaseModel):
+    """批量删除任务请求"""
+    task_ids: List[int]
+
+
 @router.post("/batch_toggle_tasks", summary="批量启用/禁用任务")
-async def batch_toggle_tasks(
+def batch_toggle_tasks(
     request: BatchToggleTasksRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -35,19 +65,68 @@ async def batch_toggle_tasks(
     - **is_active**: true 为启用，false 为禁用
     """
     try:
-        count = 0
-        for task_id in request.task_ids:
-            task = db.query(CheckInTask).filter(CheckInTask.id == task_id).first()
-            if task:
-                task.is_active = request.is_active
-                count += 1
+        tasks = TaskService.bulk_toggle_tasks(request.task_ids, request.is_active, db)
+
+        return {
+            "success": True,
+            "message": f"已{'启用' if request.is_active else '禁用'} {len(tasks)} 个任务",
+            "count": len(tasks),
+            "task_ids": [task.id for task in tasks]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"批量操作失败: {str(e)}"
+        )
+
+
+@router.post("/batch_update_cron", summary="批量修改任务 Cron 表达式")
+def batch_update_cron(
+    request: BatchUpdateCronRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    批量修改任务的定时打卡时间（需要管理员权限）
+
+    - **task_ids**: 任务 ID 列表
+    - **cron_expression**: 新的 Crontab 表达式，null 表示禁用定时打卡
+    """
+    try:
+        tasks = TaskService.bulk_update_cron(request.task_ids, request.cron_expression, db)
+
+        return {
+            "success": True,
+            "message": f"已修改 {len(tasks)} 个任务的定时设置",
+            "count": len(tasks),
+            "task_ids": [task.id for task in tasks]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"批量操作失败: {str(e)}"
+        )
 
-        db.commit()
+
+@router.post("/batch_delete_tasks", summary="批量删除任务")
+def batch_delete_tasks(
+    request: BatchDeleteTasksRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    批量删除任务及其打卡记录（需要管理员权限）
+
+    - **task_ids**: 任务 ID 列表
+    """
+    try:
+        deleted_ids = TaskService.bulk_delete_tasks(request.task_ids, db)
 
         return {
             "success": True,
-            "message": f"已{'启用' if request.is_active else '禁用'} {count} 个任务",
-            "count": count
+            "message": f"已删除 {len(deleted_ids)} 个任务",
+            "count": len(deleted_ids),
+            "task_ids": deleted_ids
         }
     except Exception as e:
         raise HTTPException(
@@ -57,7 +136,7 @@ async def batch_toggle_tasks(
 
 
 @router.post("/batch_check_in", summary="批量触发打卡")
-async def batch_check_in(
+def batch_check_in(
     request: BatchCheckInRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -67,7 +146,7 @@ async def batch_check_in(
 
     - **task_ids**: 任务 ID 列表
 
-    返回每个任务的打卡结果
+    为每个任务创建待处理的打卡记录，由 worker 在后台执行；返回每个任务的入队结果和 record_id
     """
     try:
         result = CheckInService.batch_check_in_tasks(request.task_ids, db)
@@ -80,14 +159,21 @@ async def batch_check_in(
 
 
 @router.get("/logs", summary="获取系统日志")
-async def get_system_logs(
-    lines: int = Query(200, ge=1, le=2000, description="读取的日志行数"),
+def get_system_logs(
+    lines: int = Query(200, ge=1, le=2000, description="读取的日志条数"),
+    level: Optional[str] = Query(None, description="最低日志级别（DEBUG, INFO, WARNING, ERROR, CRITICAL）"),
+    logger_name: Optional[str] = Query(None, alias="logger", description="logger 名称前缀（如 backend.services）"),
+    since: Optional[datetime] = Query(None, description="起始时间"),
+    until: Optional[datetime] = Query(None, description="结束时间"),
     current_user: User = Depends(get_current_admin_user)
 ):
     """
     获取系统日志（需要管理员权限）
 
-    - **lines**: 读取最后 N 行日志
+    - **lines**: 读取最后 N 条日志（多行的异常堆栈算作一条）
+    - **level**: 只返回不低于该级别的日志
+    - **logger**: 只返回该 logger 及其子 logger 的日志
+    - **since** / **until**: 时间范围
 
     返回日志内容（字符串格式）
     """
@@ -101,19 +187,18 @@ async def get_system_logs(
                 "logs": "日志文件不存在"
             }
 
-        # 使用 deque 高效读取最后 N 行，避免将整个文件加载到内存
-        from collections import deque
+        # 从文件末尾反向读取，开销与日志文件大小无关
+        from backend.utils.log_reader import LogFilter, tail_log
 
-        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            # 使用 deque 保持最后 N 行，内存占用固定
-            last_lines = deque(f, maxlen=lines)
+        log_filter = LogFilter(level=level, logger_name=logger_name, since=since, until=until)
+        records = tail_log(log_file, lines, log_filter)
 
         # 返回字符串格式（不是数组）
-        log_content = ''.join(last_lines)
+        log_content = ''.join(record + '\n' for record in records)
 
         return {
             "success": True,
-            "message": f"读取了最后 {len(last_lines)} 行日志",
+            "message": f"读取了最后 {len(records)} 条日志",
             "logs": log_content
         }
 
@@ -125,8 +210,158 @@ async def get_system_logs(
         )
 
 
+@router.get("/logs/stream", summary="实时跟踪系统日志（SSE）")
+async def stream_system_logs(
+    request: Request,
+    lines: int = Query(50, ge=0, le=2000, description="开始跟踪前先返回的日志条数"),
+    level: Optional[str] = Query(None, description="最低日志级别（DEBUG, INFO, WARNING, ERROR, CRITICAL）"),
+    logger_name: Optional[str] = Query(None, alias="logger", description="logger 名称前缀（如 backend.services）"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    以 Server-Sent Events 实时推送新增日志（需要管理员权限）
+
+    - **lines**: 先推送最后 N 条日志，然后持续推送新日志
+    - **level** / **logger**: 过滤条件，同 /logs
+
+    每条日志为一个 `log` 事件（多行记录拆分为多个 data 行）；无新日志时定期发送注释行保持连接
+    """
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+    from backend.utils.log_reader import LogFilter, LogFollower, parse_log_header, tail_log
+
+    log_file = settings.LOG_FILE
+    log_filter = LogFilter(level=level, logger_name=logger_name)
+
+    def format_event(record: str) -> str:
+        data = "\n".join(f"data: {line}" for line in record.split("\n"))
+        return f"event: log\n{data}\n\n"
+
+    async def event_stream():
+        # 先建立跟踪位置，再读取历史记录，避免两者之间写入的日志丢失
+        follower = LogFollower(log_file)
+        if lines and log_file.exists():
+            for record in await run_in_threadpool(tail_log, log_file, lines, log_filter):
+                yield format_event(record)
+
+        keep = log_filter.is_empty
+        idle_seconds = 0.0
+        while not await request.is_disconnected():
+            new_lines = await run_in_threadpool(follower.poll)
+            records: List[str] = []
+            for line in new_lines:
+                header = parse_log_header(line)
+                if header is not None:
+                    keep = log_filter.matches(header)
+                    if keep:
+                        records.append(line)
+                elif keep and records:
+                    # 续行（如异常堆栈）归属上一条记录
+                    records[-1] += "\n" + line
+                elif keep:
+                    records.append(line)
+
+            if records:
+                idle_seconds = 0.0
+                for record in records:
+                    yield format_event(record)
+            else:
+                idle_seconds += LOG_STREAM_POLL_SECONDS
+                if idle_seconds >= LOG_STREAM_HEARTBEAT_SECONDS:
+                    idle_seconds = 0.0
+                    yield ": keep-alive\n\n"
+
+            await asyncio.sleep(LOG_STREAM_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/logs/records", summary="查询结构化日志")
+def query_log_records(
+    task_id: Optional[int] = Query(None, description="任务 ID"),
+    record_id: Optional[int] = Query(None, description="打卡记录 ID"),
+    user: Optional[str] = Query(None, description="用户别名"),
+    level: Optional[str] = Query(None, description="最低日志级别（DEBUG, INFO, WARNING, ERROR, CRITICAL）"),
+    logger_name: Optional[str] = Query(None, alias="logger", description="logger 名称前缀（如 backend.services）"),
+    limit: int = Query(200, ge=1, le=2000, description="最多返回条数"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    查询最近的结构化日志（需要管理员权限）
+
+    按 record_id 或 task_id 查询时直接走索引，无需扫描日志文件。
+    日志默认保存在本进程内存中；queue 模式（或 LOG_BUFFER_STORE=sqlite）下保存在同一主机的共享文件中，包含独立打卡 worker 的日志
+
+    - **task_id** / **record_id** / **user**: 打卡上下文过滤
+    - **level** / **logger**: 同 /logs
+    - **limit**: 返回最新的 N 条
+    """
+    from backend.utils.log_buffer import log_buffer
+
+    min_level = logging.getLevelName(level.upper()) if level else None
+    if level and not isinstance(min_level, int):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无效的日志级别: {level}"
+        )
+
+    records = log_buffer.query(
+        task_id=task_id,
+        record_id=record_id,
+        user=user,
+        min_level=min_level,
+        logger_name=logger_name,
+        limit=limit
+    )
+
+    return {
+        "success": True,
+        "message": f"查询到 {len(records)} 条日志",
+        "records": records,
+        "buffer": log_buffer.get_stats()
+    }
+
+
+@router.get("/check_in_timings", summary="打卡分阶段耗时分位数")
+def get_check_in_timings(
+    start: Optional[datetime] = Query(None, description="起始时间（含），ISO 8601"),
+    end: Optional[datetime] = Query(None, description="结束时间（含），ISO 8601"),
+    status_filter: Optional[str] = Query(None, alias="status", description="打卡状态过滤"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    按阶段统计时间范围内打卡耗时的分位数（需要管理员权限）
+
+    阶段: queue_wait（排队）、browser（启动浏览器）、capture（捕获签名）、
+    http（打卡请求）、persist（写入记录）、notify（发送通知）、total（总耗时），单位毫秒
+    不带时区的时间视为 UTC
+    """
+    from backend.utils.time_helpers import to_utc
+
+    start, end = to_utc(start), to_utc(end)
+    if start and end and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="起始时间不能晚于结束时间"
+        )
+
+    stages = CheckInService.get_timing_percentiles(db, start=start, end=end, status=status_filter)
+    return {
+        "success": True,
+        "start": start,
+        "end": end,
+        "status": status_filter,
+        "stages": stages
+    }
+
+
 @router.get("/stats", summary="获取系统统计")
-async def get_system_stats(
+def get_system_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
@@ -242,7 +477,7 @@ async def get_system_stats(
 
 
 @router.get("/users/pending", response_model=List[UserResponse], summary="获取待审批用户")
-async def get_pending_users(
+def get_pending_users(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
@@ -260,7 +495,7 @@ async def get_pending_users(
 
 
 @router.post("/users/{user_id}/approve", response_model=dict, summary="审批通过用户")
-async def approve_user(
+def approve_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -288,7 +523,7 @@ async def approve_user(
 
 
 @router.delete("/users/{user_id}/reject", response_model=dict, summary="拒绝用户")
-async def reject_user(
+def reject_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
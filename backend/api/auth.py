@@ -20,7 +20,7 @@ router = APIRouter()
 
 @router.post("/request_qrcode", response_model=dict, summary="请求 QQ 扫码二维码")
 @limiter.limit("10/minute")  # 每分钟最多10次请求
-async def request_qrcode(
+def request_qrcode(
     request_obj: QRCodeRequest,
     request: Request,
     response: Response,
@@ -79,7 +79,7 @@ async def request_qrcode(
 
 
 @router.get("/qrcode_status/{session_id}", response_model=dict, summary="检查二维码扫描状态")
-async def get_qrcode_status(
+def get_qrcode_status(
     session_id: str,
     db: Session = Depends(get_db)
 ):
@@ -110,7 +110,7 @@ async def get_qrcode_status(
 
 
 @router.delete("/qrcode_session/{session_id}", response_model=dict, summary="取消二维码登录会话")
-async def cancel_qrcode_session(
+def cancel_qrcode_session(
     session_id: str
 ):
     """
@@ -131,7 +131,7 @@ async def cancel_qrcode_session(
 
 
 @router.post("/verify_token", response_model=dict, summary="验证 JWT Token 有效性")
-async def verify_token(
+def verify_token(
     request: TokenVerifyRequest,
     db: Session = Depends(get_db)
 ):
@@ -159,7 +159,7 @@ async def verify_token(
 
 @router.post("/alias_login", response_model=dict, summary="别名+密码登录")
 @limiter.limit("5/minute")  # 每分钟最多5次登录尝试
-async def alias_login(
+def alias_login(
     login_data: AliasLoginRequest,
     request: Request,  # slowapi需要的request参数
     db: Session = Depends(get_db)
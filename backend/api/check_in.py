@@ -17,7 +17,7 @@ router = APIRouter()
 
 
 @router.post("/manual/{task_id}", summary="手动触发打卡（异步）")
-async def manual_check_in(
+def manual_check_in(
     task_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -54,7 +54,7 @@ async def manual_check_in(
 
 
 @router.get("/record/{record_id}/status", summary="查询打卡记录状态")
-async def get_check_in_record_status(
+def get_check_in_record_status(
     record_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -90,7 +90,7 @@ async def get_check_in_record_status(
 
 
 @router.get("/task/{task_id}/records", response_model=PaginatedResponse[CheckInRecordResponse], summary="查看任务的打卡记录")
-async def get_task_check_in_records(
+def get_task_check_in_records(
     task_id: int,
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=500, description="限制记录数"),
@@ -135,7 +135,7 @@ async def get_task_check_in_records(
 
 
 @router.get("/my-records", response_model=PaginatedResponse[CheckInRecordResponse], summary="查看当前用户的所有打卡记录")
-async def get_my_check_in_records(
+def get_my_check_in_records(
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=500, description="限制记录数"),
     status_filter: Optional[str] = Query(None, alias="status", description="过滤状态 (success/failure)"),
@@ -170,7 +170,7 @@ async def get_my_check_in_records(
 
 
 @router.get("/records", response_model=PaginatedResponse[CheckInRecordResponse], summary="查看所有打卡记录（管理员）")
-async def get_all_check_in_records(
+def get_all_check_in_records(
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=500, description="限制记录数"),
     task_id: Optional[int] = Query(None, description="过滤任务 ID"),
@@ -204,7 +204,7 @@ async def get_all_check_in_records(
 
 
 @router.get("/records/count", summary="获取打卡记录统计（管理员）")
-async def get_check_in_records_count(
+def get_check_in_records_count(
     task_id: Optional[int] = Query(None, description="过滤任务 ID"),
     status_filter: Optional[str] = Query(None, alias="status", description="过滤状态 (success/failure)"),
     db: Session = Depends(get_db),
@@ -19,7 +19,7 @@ class CronValidateRequest(BaseModel):
 # create_task_from_template: 已在 templates.py 中定义
 
 @router.get("/", response_model=List[TaskResponse], summary="获取当前用户的任务列表")
-async def get_tasks(
+def get_tasks(
     include_inactive: bool = True,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -42,7 +42,7 @@ async def get_tasks(
 
 
 @router.get("/{task_id}", response_model=TaskResponse, summary="获取任务详情")
-async def get_task(
+def get_task(
     task_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -62,7 +62,7 @@ async def get_task(
 
 
 @router.put("/{task_id}", response_model=TaskResponse, summary="更新任务")
-async def update_task(
+def update_task(
     task_id: int,
     task_data: TaskUpdate,
     current_user: User = Depends(get_current_user),
@@ -91,7 +91,7 @@ async def update_task(
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT, summary="删除任务")
-async def delete_task(
+def delete_task(
     task_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -117,7 +117,7 @@ async def delete_task(
 
 
 @router.post("/{task_id}/toggle", response_model=TaskResponse, summary="切换任务启用状态")
-async def toggle_task(
+def toggle_task(
     task_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
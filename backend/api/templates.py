@@ -9,7 +9,9 @@ from backend.schemas.template import (
     TemplateUpdate,
     TemplateResponse,
     TaskFromTemplateRequest,
-    TemplatePreviewResponse
+    TemplatePreviewResponse,
+    BulkTaskFromTemplateRequest,
+    BulkTaskFromTemplateResponse
 )
 from backend.schemas.task import TaskResponse
 from backend.services.template_service import TemplateService
@@ -18,7 +20,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[TemplateResponse], summary="获取所有模板列表")
-async def get_all_templates(
+def get_all_templates(
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=500, description="限制记录数"),
     is_active: Optional[bool] = Query(None, description="过滤启用状态"),
@@ -43,7 +45,7 @@ async def get_all_templates(
 
 
 @router.get("/active", response_model=List[TemplateResponse], summary="获取启用的模板列表")
-async def get_active_templates(
+def get_active_templates(
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=500, description="限制记录数"),
     db: Session = Depends(get_db),
@@ -66,7 +68,7 @@ async def get_active_templates(
 
 
 @router.get("/{template_id}", response_model=TemplateResponse, summary="获取单个模板详情")
-async def get_template(
+def get_template(
     template_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -94,7 +96,7 @@ async def get_template(
 
 
 @router.get("/{template_id}/preview", response_model=TemplatePreviewResponse, summary="预览模板生成的 payload")
-async def preview_template(
+def preview_template(
     template_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -137,7 +139,7 @@ async def preview_template(
 
 
 @router.post("/", response_model=TemplateResponse, summary="创建新模板（管理员）")
-async def create_template(
+def create_template(
     template_data: TemplateCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -154,7 +156,7 @@ async def create_template(
 
 
 @router.put("/{template_id}", response_model=TemplateResponse, summary="更新模板（管理员）")
-async def update_template(
+def update_template(
     template_id: int,
     template_data: TemplateUpdate,
     db: Session = Depends(get_db),
@@ -173,7 +175,7 @@ async def update_template(
 
 
 @router.delete("/{template_id}", summary="删除模板（管理员）")
-async def delete_template(
+def delete_template(
     template_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -188,7 +190,7 @@ async def delete_template(
 
 
 @router.post("/create-task", response_model=TaskResponse, summary="从模板创建任务")
-async def create_task_from_template(
+def create_task_from_template(
     request: TaskFromTemplateRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -212,3 +214,26 @@ async def create_task_from_template(
         cron_expression=request.cron_expression
     )
     return task
+
+
+@router.post("/create-tasks-bulk", response_model=BulkTaskFromTemplateResponse, summary="从模板批量创建任务（管理员）")
+def create_tasks_from_template_bulk(
+    request: BulkTaskFromTemplateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    从模板为多个用户批量创建打卡任务（仅管理员）
+
+    - **template_id**: 模板 ID
+    - **rows**: 每个用户的任务数据（user_id, thread_id, field_values, task_name, cron_expression）
+    - **cron_expression**: 行未指定时使用的 Cron 表达式（默认每天 20:00）
+    - **skip_invalid**: 是否跳过无效行继续创建（默认有任一行无效时不创建任何任务，只返回错误）
+    """
+    return TemplateService.create_tasks_from_template_bulk(
+        template_id=request.template_id,
+        rows=request.rows,
+        db=db,
+        cron_expression=request.cron_expression,
+        skip_invalid=request.skip_invalid
+    )
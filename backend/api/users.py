@@ -14,7 +14,7 @@ router = APIRouter()
 
 
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED, summary="创建用户（管理员）")
-async def create_user(
+def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -54,6 +54,7 @@ async def get_current_user_info(
         "jwt_exp": current_user.jwt_exp,
         "email": current_user.email,
         "has_password": bool(current_user.password_hash),
+        "notify_mode": current_user.notify_mode or "immediate",
         "created_at": current_user.created_at,
         "updated_at": current_user.updated_at,
     }
@@ -76,7 +77,7 @@ async def get_user_status(
 
 
 @router.put("/me/profile", response_model=UserResponse, summary="更新个人信息")
-async def update_current_user_profile(
+def update_current_user_profile(
     profile_data: UserUpdateProfile,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -85,6 +86,7 @@ async def update_current_user_profile(
     更新当前用户的个人信息
 
     - **alias**: 新别名（可选）
+    - **notify_mode**: 打卡结果通知方式（immediate / digest / digest_failures_immediate，可选）
     - **current_password**: 当前密码（修改密码时必填）
     - **new_password**: 新密码（可选）
 
@@ -128,7 +130,7 @@ async def get_current_user_token_status(
 
 
 @router.get("/me/tasks", response_model=List[TaskResponse], summary="获取当前用户的任务列表")
-async def get_current_user_tasks(
+def get_current_user_tasks(
     include_inactive: bool = Query(True, description="是否包含未启用的任务"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -149,7 +151,7 @@ async def get_current_user_tasks(
 
 
 @router.get("", response_model=List[UserResponse], summary="获取所有用户（管理员）")
-async def get_all_users(
+def get_all_users(
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=500, description="限制记录数"),
     search: Optional[str] = Query(None, description="搜索关键词（alias）"),
@@ -176,7 +178,7 @@ async def get_all_users(
 
 
 @router.get("/{user_id}", response_model=UserResponse, summary="获取指定用户")
-async def get_user(
+def get_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -199,7 +201,7 @@ async def get_user(
 
 
 @router.put("/{user_id}", response_model=UserResponse, summary="更新用户信息")
-async def update_user(
+def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
@@ -262,7 +264,7 @@ async def update_user(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT, summary="删除用户（管理员）")
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -28,9 +28,15 @@ class Settings(BaseSettings):
     # 安全配置（登录）
     SECRET_KEY: str = "CheckInSecretKey"
 
+    # 认证用户缓存有效期（秒，写操作会主动失效，TTL 用于多进程部署兜底）
+    USER_CACHE_TTL_SECONDS: int = 60
+
     # 数据库配置
     DATABASE_URL: str = f"sqlite:///{BASE_DIR}/data/checkin.db"
 
+    # 同步端点线程池大小（数据库查询、Selenium、SMTP 等阻塞操作在线程池中执行）
+    API_THREADPOOL_SIZE: int = 40
+
     # CORS 配置（从环境变量读取，用逗号分隔）
     CORS_ORIGINS: str = "http://localhost:3000"
 
@@ -39,9 +45,38 @@ class Settings(BaseSettings):
         """将CORS_ORIGINS字符串转换为列表"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip()]
 
+    # 速率限制存储（默认使用 SQLite 文件，同一主机上的多个 worker 进程共享计数）
+    RATE_LIMIT_DB: Path = BASE_DIR / "data" / "ratelimit.db"
+    RATE_LIMIT_STORAGE_URI: str = ""  # 为空时使用 RATE_LIMIT_DB；也可设置为 memory:// 或 redis://host:6379
+    RATE_LIMIT_STRATEGY: str = "sliding-window-counter"  # fixed-window / sliding-window-counter / moving-window（moving-window 需要 memory:// 或 Redis 存储，SQLite 存储下退回 sliding-window-counter）
+    RATE_LIMIT_COMPACT_SECONDS: int = 300  # 清理过期计数的间隔（秒）
+
+    @property
+    def rate_limit_storage_uri(self) -> str:
+        """速率限制存储地址"""
+        return self.RATE_LIMIT_STORAGE_URI or f"checkin-sqlite://{self.RATE_LIMIT_DB}"
+
+    # 注册用户名预占和注册冷却的存储（memory: 进程内，单进程部署；database: 数据库表，多 worker 进程共享）
+    REGISTRATION_STORE: str = "memory"
+
     # 日志配置
     LOG_FILE: Path = BASE_DIR / "logs" / "backend.log"
     LOG_LEVEL: str = "INFO"
+    # 日志文件轮转方式（size: 进程内按大小轮转，仅限单个进程写入该文件；
+    # external: 由 logrotate 等外部工具轮转，多个进程写入同一个 LOG_FILE 时使用）
+    LOG_ROTATION: str = "size"
+    # 单个日志文件最大字节数（LOG_ROTATION=size 时超过后轮转为 backend.log.1, backend.log.2, ...）
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    # 保留的轮转日志文件数
+    LOG_BACKUP_COUNT: int = 5
+    # 保留的结构化日志条数（供管理员按任务/打卡记录查询）
+    LOG_BUFFER_SIZE: int = 10000
+    # 结构化日志存储（memory: 进程内；sqlite: LOG_BUFFER_DB 文件，API 进程和独立打卡 worker 共享；为空时 queue 模式使用 sqlite）
+    LOG_BUFFER_STORE: str = ""
+    LOG_BUFFER_DB: Path = BASE_DIR / "data" / "logs.db"
+
+    # /metrics 访问令牌（为空时不校验；设置后需携带 Authorization: Bearer <令牌>）
+    METRICS_TOKEN: str = ""
 
     # 会话文件配置
     SESSION_DIR: Path = BASE_DIR / "sessions"
@@ -54,16 +89,75 @@ class Settings(BaseSettings):
     SMTP_SENDER_PASSWORD: str = ""
     SMTP_USE_SSL: bool = True
 
+    # SMTP 连接池配置（复用已认证连接）
+    SMTP_POOL_SIZE: int = 1  # 最大并行连接数（部分服务商限制并发连接，默认单连接）
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 50  # 单个连接最多发送的邮件数，达到后重建连接
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 60  # 连接空闲超过该时间后不再复用（秒）
+
+    # 邮件发件箱配置（邮件先入队，由后台线程发送并重试）
+    EMAIL_OUTBOX_POLL_SECONDS: int = 5  # 发送线程轮询间隔（秒）
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5  # 最大发送尝试次数
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30  # 重试退避基数（秒），按 2 的幂递增
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7  # 已发送邮件保留天数
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300  # 发送租约时长（秒），进程中断后 sending 状态的邮件在租约到期后重新入队
+
+    # 打卡结果汇总配置（用户选择汇总模式时生效）
+    EMAIL_DIGEST_WINDOW_MINUTES: int = 10  # 汇总窗口（分钟），从第一条结果开始计时
+
     # 前端 URL 配置（用于邮件中的链接）
     FRONTEND_URL: str = "http://localhost:3000"
 
     # 定时任务配置（可通过环境变量配置）
+    SCHEDULER_TIMEZONE: str = "Asia/Shanghai"  # 任务 cron 表达式所用时区
     TOKEN_CHECK_INTERVAL_MINUTES: int = 30  # Token 检查间隔（分钟）
     SESSION_CLEANUP_INTERVAL_HOURS: int = 24  # 会话清理间隔（小时）
 
+    # 打卡执行方式（打卡作业统一写入 pending 打卡记录，由 worker 认领执行）
+    # thread: 由 API 进程内置的 worker 线程执行（单进程部署）
+    # queue: API 只入队，由独立的 worker 进程（python run_worker.py）执行
+    CHECK_IN_EXECUTION_MODE: str = "thread"
+    CHECK_IN_WORKER_CONCURRENCY: int = 4  # 每个 worker 同时执行的打卡数（同一用户的合并打卡算一个，每个占用一个浏览器）
+    CHECK_IN_WORKER_POLL_SECONDS: float = 2.0  # worker 轮询新打卡作业的间隔（秒）
+    CHECK_IN_COALESCE_WINDOW_SECONDS: float = 1.0  # 定时打卡的合并窗口（秒），同一用户在窗口内触发的任务合并执行，0 表示不等待
+    CHECK_IN_LEASE_SECONDS: int = 300  # 认领租约时长（秒），执行期间定期续约，进程退出后租约过期即可被重新认领
+    CHECK_IN_MAX_ATTEMPTS: int = 3  # 单个打卡作业最多执行次数（含重试和进程中断后的重新认领）
+
+    # 打卡重试策略（规则名:最多执行次数:退避基数秒，逗号分隔）
+    # transient 对应暂时性失败（网络错误、上游 429/5xx、签名获取失败），其余规则名按打卡结果状态匹配（out_of_time / unknown / failure ...）
+    # 第 n 次重试前等待 退避基数 × 2^(n-1) 秒，并在 ±CHECK_IN_RETRY_JITTER 比例内随机抖动
+    CHECK_IN_RETRY_RULES: str = "transient:3:30,out_of_time:3:120,unknown:2:60"
+    CHECK_IN_RETRY_JITTER: float = 0.2
+    CHECK_IN_RETRY_WINDOW_MINUTES: int = 60  # 重试窗口：距首次入队不超过该时长，且早于任务的下一次定时触发
+
     # Selenium / Chrome 配置（从 .env 读取）
     CHROME_BINARY_PATH: str = ""
     CHROMEDRIVER_PATH: str = ""
 
+    # 接龙上游地址（压测、预发环境可指向本地替身服务，如 benchmarks/fake_jielong.py）
+    JIELONG_WEB_BASE_URL: str = "https://i.jielong.com"  # 网页端（登录页、表单页）
+    JIELONG_API_BASE_URL: str = "https://api.jielong.com"  # 接口（EditRecord）
+    JIELONG_COOKIE_DOMAIN: str = ".jielong.com"  # 注入 token Cookie 的域名，为空时使用当前页面的主机名
+
+    # 打卡签名获取方式: selenium（无头浏览器捕获）/ stub（直接请求表单页读取响应头，仅用于本地替身服务）
+    SIGNATURE_PROVIDER: str = "selenium"
+
+    # 签名预热：密集的 cron 时刻前提前校验 Token、获取签名，高峰时刻只发送打卡请求
+    SIGNATURE_PREWARM_MINUTES: int = 5  # 提前多少分钟预热（0 表示关闭）
+    SIGNATURE_PREWARM_MIN_TASKS: int = 10  # 同一时刻至少有多少个定时任务才预热
+    SIGNATURE_PREWARM_CONCURRENCY: int = 2  # 同时获取签名的数量（每个占用一个浏览器）
+    SIGNATURE_CACHE_TTL_SECONDS: int = 900  # 预热签名有效期（秒），需大于提前量
+
+    @property
+    def jielong_login_url(self) -> str:
+        """QQ 扫码登录页地址"""
+        from urllib.parse import quote
+        web = self.JIELONG_WEB_BASE_URL.rstrip("/")
+        return f"{web}/login?redirectTo={quote(web + '/', safe='')}"
+
+    @property
+    def jielong_edit_record_url(self) -> str:
+        """打卡接口地址"""
+        return f"{self.JIELONG_API_BASE_URL.rstrip('/')}/api/CheckIn/EditRecord"
+
 
 settings = Settings()
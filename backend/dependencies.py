@@ -6,11 +6,12 @@ from fastapi import Depends, HTTPException, Header, status
 from sqlalchemy.orm import Session
 from backend.models import get_db, User
 from backend.utils.jwt import JWTManager
+from backend.services.user_cache import user_cache
 
 logger = logging.getLogger(__name__)
 
 
-async def get_current_user(
+def get_current_user(
     authorization: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> User:
@@ -21,6 +22,9 @@ async def get_current_user(
     1. 网站登录使用 JWT token（存储在前端，21天过期）
     2. 打卡业务使用 authorization token（存储在数据库 User.authorization）
     3. JWT 过期后需要重新登录，但打卡 token 过期不影响网站使用
+
+    JWT 解码结果和用户信息均有进程内缓存（见 user_cache），命中时不访问数据库
+    未命中时需要查询数据库，因此定义为同步函数，由 FastAPI 放入线程池执行
     """
     if not authorization:
         raise HTTPException(
@@ -33,8 +37,11 @@ async def get_current_user(
     token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
 
     try:
-        # 验证 JWT token
-        payload = JWTManager.verify_token(token)
+        # 验证 JWT token（优先使用缓存的解码结果）
+        payload = user_cache.get_payload(token)
+        if payload is None:
+            payload = JWTManager.verify_token(token)
+            user_cache.put_payload(token, payload)
         user_id = payload.get("user_id")
 
         if not user_id:
@@ -44,7 +51,11 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # 从数据库获取用户
+        # 优先从缓存获取用户，未命中再查询数据库
+        user = user_cache.get_user(user_id, db)
+        if user:
+            return user
+
         user = db.query(User).filter(User.id == user_id).first()
 
         if not user:
@@ -54,6 +65,7 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        user_cache.put_user(user)
         return user
 
     except pyjwt.ExpiredSignatureError:
@@ -107,7 +119,7 @@ async def get_current_admin_user(
     return current_user
 
 
-async def get_optional_user(
+def get_optional_user(
     authorization: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
@@ -119,6 +131,6 @@ async def get_optional_user(
         return None
 
     try:
-        return await get_current_user(authorization, db)
+        return get_current_user(authorization, db)
     except HTTPException:
         return None
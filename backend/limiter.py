@@ -3,9 +3,16 @@
 
 支持Cloudflare Tunnel和其他代理服务
 """
+import logging
+
 from slowapi import Limiter
 from fastapi import Request
 
+from backend.config import settings
+from backend.utils.rate_limit_storage import SQLiteRateLimitStorage  # 导入即注册 checkin-sqlite 存储
+
+logger = logging.getLogger(__name__)
+
 
 def get_real_ip(request: Request) -> str:
     """
@@ -41,5 +48,30 @@ def get_real_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-# 初始化速率限制器，使用自定义IP获取函数
-limiter = Limiter(key_func=get_real_ip)
+def _storage_options(storage_uri: str) -> dict:
+    """存储参数（只有 SQLite 存储需要清理间隔，其他存储使用默认参数）"""
+    if storage_uri.startswith("checkin-sqlite://"):
+        return {"compact_interval": settings.RATE_LIMIT_COMPACT_SECONDS}
+    return {}
+
+
+def _strategy(storage_uri: str) -> str:
+    """限流算法（SQLite 存储不支持 moving-window，退回 sliding-window-counter）"""
+    strategy = settings.RATE_LIMIT_STRATEGY
+    scheme = storage_uri.split("://", 1)[0]
+    if strategy == "moving-window" and scheme in SQLiteRateLimitStorage.STORAGE_SCHEME:
+        logger.warning(
+            "RATE_LIMIT_STRATEGY=moving-window 不支持 SQLite 限流存储，改用 sliding-window-counter；"
+            "需要 moving-window 时请将 RATE_LIMIT_STORAGE_URI 设置为 memory:// 或 Redis"
+        )
+        return "sliding-window-counter"
+    return strategy
+
+
+# 初始化速率限制器，使用自定义IP获取函数，计数存储在多进程共享的存储中
+limiter = Limiter(
+    key_func=get_real_ip,
+    storage_uri=settings.rate_limit_storage_uri,
+    storage_options=_storage_options(settings.rate_limit_storage_uri),
+    strategy=_strategy(settings.rate_limit_storage_uri),
+)
@@ -5,6 +5,7 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError as PydanticValidationError
 import logging
+import threading
 from pathlib import Path
 
 from backend.config import settings
@@ -12,26 +13,39 @@ from backend.models import init_db
 from backend.exceptions import BaseAPIException
 from backend.schemas.response import ErrorResponse, ErrorDetail
 from backend.limiter import limiter
+from backend.utils.log_buffer import log_buffer, RingBufferHandler
+from backend.utils.log_file import create_file_handler
 
-# 配置日志
-settings.LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+# 配置日志（多个进程写入同一个 LOG_FILE 时需设置 LOG_ROTATION=external，由 logrotate 轮转）
 logging.basicConfig(
     level=settings.LOG_LEVEL,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[
-        logging.FileHandler(settings.LOG_FILE, encoding="utf-8"),
+        create_file_handler(settings.LOG_FILE),
         logging.StreamHandler(),
+        RingBufferHandler(log_buffer),
     ],
 )
 logger = logging.getLogger(__name__)
 
 
+def _start_scheduler():
+    """后台线程：导入并启动调度器（APScheduler 和定时任务加载不阻塞服务启动）"""
+    from backend.services.scheduler_service import start_scheduler
+    start_scheduler()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时执行
     logger.info("正在启动 CheckIn API 服务...")
 
+    # 设置同步端点线程池大小（普通 def 端点和依赖由 FastAPI 在该线程池中执行）
+    from anyio import to_thread
+    to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+    logger.info(f"同步端点线程池大小: {settings.API_THREADPOOL_SIZE}")
+
     # 初始化数据库
     logger.info("正在初始化数据库...")
     init_db()
@@ -41,10 +55,24 @@ async def lifespan(app: FastAPI):
     settings.SESSION_DIR.mkdir(parents=True, exist_ok=True)
     (settings.BASE_DIR / "data").mkdir(parents=True, exist_ok=True)
 
-    # 启动调度器
-    logger.info("正在启动调度器...")
-    from backend.services.scheduler_service import start_scheduler
-    start_scheduler()
+    # 在后台线程中导入并启动调度器：服务先开始响应请求，定时任务加载完成前 /ready 返回 503
+    logger.info("正在后台启动调度器...")
+    scheduler_loader = threading.Thread(target=_start_scheduler, name="scheduler-loader", daemon=True)
+    scheduler_loader.start()
+
+    # 预加载并编译邮件模板
+    from backend.services.email_templates import email_templates
+    email_templates.load()
+
+    # 启动邮件发件箱发送线程（每个进程都可以启动，取件为原子认领）
+    from backend.workers.email_outbox_worker import email_outbox_worker
+    email_outbox_worker.start()
+
+    # 线程模式：在本进程内认领并执行打卡作业（queue 模式由独立的 run_worker.py 进程执行）
+    from backend.workers.check_in_queue_worker import check_in_queue_worker
+    embedded_check_in_worker = settings.CHECK_IN_EXECUTION_MODE.lower() != "queue"
+    if embedded_check_in_worker:
+        check_in_queue_worker.start()
 
     logger.info(f"CheckIn API 服务已启动，版本: {settings.VERSION}")
 
@@ -52,9 +80,14 @@ async def lifespan(app: FastAPI):
 
     # 关闭时执行
     logger.info("正在关闭 CheckIn API 服务...")
+    scheduler_loader.join(timeout=30)
     from backend.services.scheduler_service import stop_scheduler
     stop_scheduler()
+    email_outbox_worker.stop()
+    if embedded_check_in_worker:
+        check_in_queue_worker.stop()
     logger.info("CheckIn API 服务已关闭")
+    log_buffer.flush()
 
 
 # 创建 FastAPI 应用
@@ -142,6 +175,45 @@ async def health_check():
     }
 
 
+# 就绪检查端点（调度器在后台加载，加载完成前返回 503）
+@app.get("/ready")
+def readiness_check():
+    """就绪检查"""
+    from backend.services.scheduler_service import scheduler_ready, scheduler_state
+
+    ready = scheduler_ready.is_set()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "starting",
+            "scheduler": scheduler_state["status"],
+            "tasks": scheduler_state["tasks"],
+            "version": settings.VERSION,
+        }
+    )
+
+
+# 运行指标端点（Prometheus 文本格式）
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """导出运行指标"""
+    from fastapi.responses import PlainTextResponse
+    from backend.utils.metrics import registry
+
+    if settings.METRICS_TOKEN:
+        import hmac
+        authorization = request.headers.get("authorization", "")
+        if not hmac.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content=ErrorResponse(
+                    error=ErrorDetail(code="UNAUTHORIZED", message="无效的指标访问令牌")
+                ).model_dump()
+            )
+
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # 根路径
 @app.get("/")
 async def root():
@@ -151,6 +223,7 @@ async def root():
         "version": settings.VERSION,
         "docs": "/docs",
         "health": "/health",
+        "ready": "/ready",
     }
 
 
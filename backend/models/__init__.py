@@ -3,5 +3,9 @@ from backend.models.user import User
 from backend.models.check_in_task import CheckInTask
 from backend.models.check_in_record import CheckInRecord
 from backend.models.task_template import TaskTemplate
+from backend.models.email_outbox import EmailOutbox
+from backend.models.check_in_digest import CheckInDigestItem
+from backend.models.prewarmed_signature import PrewarmedSignature
+from backend.models.registration_reservation import RegistrationReservation
 
-__all__ = ["Base", "get_db", "init_db", "User", "CheckInTask", "CheckInRecord", "TaskTemplate"]
+__all__ = ["Base", "get_db", "init_db", "User", "CheckInTask", "CheckInRecord", "TaskTemplate", "EmailOutbox", "CheckInDigestItem", "PrewarmedSignature", "RegistrationReservation"]
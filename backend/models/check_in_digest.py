@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
+from datetime import datetime, timezone
+from backend.models.database import Base
+
+
+class CheckInDigestItem(Base):
+    """打卡结果汇总缓冲模型（汇总模式下待合并发送的打卡结果）"""
+
+    __tablename__ = "check_in_digest_items"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, comment="用户 ID")
+    task_name = Column(String(100), default="", comment="任务名称")
+    thread_id = Column(String(100), default="", comment="接龙 ID")
+    success = Column(Boolean, nullable=False, comment="打卡是否成功")
+    message = Column(Text, default="", comment="结果消息")
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), comment="打卡完成时间（UTC）")
+
+    # 添加复合索引：按用户取出汇总窗口内的结果
+    __table_args__ = (
+        Index('ix_digest_user_created', 'user_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f"<CheckInDigestItem(id={self.id}, user_id={self.user_id}, success={self.success})>"
@@ -9,6 +9,9 @@ class CheckInRecord(Base):
 
     __tablename__ = "check_in_records"
 
+    # 分阶段耗时（毫秒）：排队等待、启动浏览器、捕获签名、打卡请求、写入记录、发送通知、总耗时
+    TIMING_STAGES = ("queue_wait", "browser", "capture", "http", "persist", "notify", "total")
+
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     task_id = Column(Integer, ForeignKey("check_in_tasks.id", ondelete="CASCADE"), nullable=False, index=True, comment="任务 ID")
     status = Column(String(20), nullable=False, index=True, comment="状态: success/failure/out_of_time/unknown/pending")
@@ -18,6 +21,22 @@ class CheckInRecord(Base):
     trigger_type = Column(String(50), default="scheduled", comment="触发类型: scheduled/manual/admin")
     check_in_time = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True, comment="打卡时间（UTC）")
 
+    # 执行认领（pending 记录即待执行的打卡作业，由认领它的进程负责执行）
+    worker_id = Column(String(100), nullable=True, comment="认领该记录的执行进程标识，未认领时为空")
+    claimed_at = Column(DateTime(timezone=True), nullable=True, comment="认领时间（UTC）")
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True, comment="认领租约到期时间（UTC），过期后可被其他进程重新认领")
+    attempts = Column(Integer, nullable=False, default=0, comment="已认领执行的次数")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True, comment="最早可执行时间（UTC，重试退避），为空表示立即执行")
+
+    # 分阶段耗时（毫秒，未经过该阶段时为空）
+    queue_wait_ms = Column(Integer, nullable=True, comment="排队等待耗时（毫秒）")
+    browser_ms = Column(Integer, nullable=True, comment="启动无头浏览器耗时（毫秒）")
+    capture_ms = Column(Integer, nullable=True, comment="捕获签名耗时（毫秒）")
+    http_ms = Column(Integer, nullable=True, comment="打卡请求耗时（毫秒）")
+    persist_ms = Column(Integer, nullable=True, comment="写入打卡结果耗时（毫秒）")
+    notify_ms = Column(Integer, nullable=True, comment="发送通知耗时（毫秒）")
+    total_ms = Column(Integer, nullable=True, comment="总耗时（毫秒）")
+
     # 关联任务
     task = relationship("CheckInTask", back_populates="check_in_records")
 
@@ -27,5 +46,23 @@ class CheckInRecord(Base):
         Index('ix_record_status_time', 'status', 'check_in_time'),  # 按状态和时间查询
     )
 
+    @property
+    def timings(self) -> dict:
+        """分阶段耗时字典 {阶段: 毫秒}"""
+        return {stage: getattr(self, f"{stage}_ms") for stage in self.TIMING_STAGES}
+
+    @classmethod
+    def timing_values(cls, timings: dict) -> dict:
+        """
+        将分阶段耗时字典转换为列值（用于 update）
+
+        Args:
+            timings: {阶段: 毫秒}
+
+        Returns:
+            {列名: 毫秒}，忽略未知阶段
+        """
+        return {f"{stage}_ms": timings[stage] for stage in cls.TIMING_STAGES if stage in timings}
+
     def __repr__(self):
         return f"<CheckInRecord(id={self.id}, task_id={self.task_id}, status={self.status})>"
@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime, timezone
 from backend.config import settings
+from backend.utils.metrics import instrument_engine
 
 # 创建数据库引擎
 engine = create_engine(
@@ -11,6 +13,9 @@ engine = create_engine(
     echo=False,  # 生产环境设为 False
 )
 
+# 统计语句执行耗时（/metrics）
+instrument_engine(engine)
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -22,20 +27,14 @@ Base = declarative_base()
 @event.listens_for(Base, "load", propagate=True)
 def receive_load(target, context):
     """在从数据库加载对象后，将所有 datetime 字段转换为 timezone-aware (UTC)"""
-    for attr_name in dir(target):
-        # 跳过私有属性和方法
-        if attr_name.startswith('_'):
-            continue
-
-        try:
-            attr_value = getattr(target, attr_name)
-
-            # 如果是 naive datetime，添加 UTC timezone
-            if isinstance(attr_value, datetime) and attr_value.tzinfo is None:
-                setattr(target, attr_name, attr_value.replace(tzinfo=timezone.utc))
-        except (AttributeError, TypeError):
-            # 某些属性可能无法访问或设置，跳过
-            continue
+    # 只检查已加载的列属性：访问关系属性会触发懒加载（每个对象额外查询）
+    state = target.__dict__
+    for attr in inspect(target).mapper.column_attrs:
+        attr_value = state.get(attr.key)
+
+        # 如果是 naive datetime，添加 UTC timezone（作为已提交值写回，不标记为修改）
+        if isinstance(attr_value, datetime) and attr_value.tzinfo is None:
+            set_committed_value(target, attr.key, attr_value.replace(tzinfo=timezone.utc))
 
 
 def get_db():
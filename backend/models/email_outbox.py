@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime, timezone
+from backend.models.database import Base
+
+
+class EmailOutbox(Base):
+    """邮件发件箱模型（待发送邮件队列）"""
+
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    to_emails = Column(Text, nullable=False, comment="收件人邮箱列表 JSON")
+    subject = Column(String(255), nullable=False, comment="邮件主题")
+    html_content = Column(Text, nullable=False, comment="HTML 邮件内容")
+    text_content = Column(Text, nullable=True, comment="纯文本邮件内容（HTML 的替代版本）")
+    status = Column(String(20), nullable=False, default="pending", comment="状态: pending/sending/sent/failed")
+    attempts = Column(Integer, nullable=False, default=0, comment="已尝试发送次数")
+    last_error = Column(Text, default="", comment="最后一次发送失败的错误信息")
+    next_attempt_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), comment="下次尝试发送时间（UTC）")
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), comment="入队时间（UTC）")
+    sent_at = Column(DateTime(timezone=True), nullable=True, comment="发送成功时间（UTC）")
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True, comment="发送租约到期时间（UTC，sending 状态的邮件到期后重新入队）")
+
+    # 添加复合索引：发送线程按状态和到期时间取件
+    __table_args__ = (
+        Index('ix_outbox_status_next', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox(id={self.id}, subject={self.subject}, status={self.status}, attempts={self.attempts})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime, timezone
+from backend.models.database import Base
+
+
+class PrewarmedSignature(Base):
+    """预热签名模型（定时打卡高峰前提前获取的 x-api-request-payload）"""
+
+    __tablename__ = "prewarmed_signatures"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    token_hash = Column(String(64), unique=True, nullable=False, index=True, comment="打卡 Token 的 SHA-256（Token 变化后自动失效）")
+    signature = Column(Text, nullable=False, comment="x-api-request-payload 签名")
+    captured_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), comment="获取时间（UTC）")
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True, comment="过期时间（UTC）")
+
+    def __repr__(self):
+        return f"<PrewarmedSignature(id={self.id}, expires_at={self.expires_at})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, Index, UniqueConstraint
+from backend.models.database import Base
+
+
+class RegistrationReservation(Base):
+    """注册预占模型（多进程部署时共享的用户名预占和注册冷却记录）"""
+
+    __tablename__ = "registration_reservations"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    kind = Column(String(20), nullable=False, comment="记录类型: alias（用户名预占）/ cookie（注册冷却）")
+    key = Column(String(255), nullable=False, comment="用户名或注册限流 Cookie 值")
+    session_id = Column(String(100), nullable=True, comment="预占用户名的会话 ID")
+    expires_at = Column(Float, nullable=False, comment="过期时间（Unix 时间戳）")
+
+    # 同一用户名同一时刻只能有一条预占记录；按过期时间清理
+    __table_args__ = (
+        UniqueConstraint('kind', 'key', name='uq_registration_kind_key'),
+        Index('ix_registration_expires', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<RegistrationReservation(kind={self.kind}, key={self.key}, expires_at={self.expires_at})>"
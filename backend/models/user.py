@@ -20,6 +20,7 @@ class User(Base):
     token_expired_notified = Column(Boolean, default=False, nullable=False, comment="Token 已过期提醒是否已发送（过期后30分钟内）")
     role = Column(String(20), default="user", index=True, comment="角色: user/admin")
     is_approved = Column(Boolean, default=False, index=True, comment="是否已通过管理员审批")
+    notify_mode = Column(String(30), default="immediate", nullable=False, server_default="immediate", comment="打卡结果通知方式: immediate/digest/digest_failures_immediate")
 
     # 账户锁定相关字段
     failed_login_attempts = Column(Integer, default=0, nullable=False, comment="连续登录失败次数")
@@ -36,6 +36,10 @@ from backend.schemas.template import (
     TemplateResponse,
     TaskFromTemplateRequest,
     TemplatePreviewResponse,
+    BulkTaskRow,
+    BulkTaskFromTemplateRequest,
+    BulkTaskRowError,
+    BulkTaskFromTemplateResponse,
 )
 
 __all__ = [
@@ -68,4 +72,8 @@ __all__ = [
     "TemplateResponse",
     "TaskFromTemplateRequest",
     "TemplatePreviewResponse",
+    "BulkTaskRow",
+    "BulkTaskFromTemplateRequest",
+    "BulkTaskRowError",
+    "BulkTaskFromTemplateResponse",
 ]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List, Generic, TypeVar
+from typing import Optional, List, Dict, Generic, TypeVar
 from pydantic import BaseModel, Field, ConfigDict
 
 T = TypeVar('T')
@@ -28,6 +28,9 @@ class CheckInRecordResponse(BaseModel):
     trigger_type: str
     check_in_time: datetime  # Pydantic v2 自动序列化为 ISO 8601 格式
 
+    # 分阶段耗时（毫秒）：queue_wait/browser/capture/http/persist/notify/total
+    timings: Optional[Dict[str, Optional[int]]] = Field(None, description="分阶段耗时（毫秒）")
+
     # 新增字段：用户和任务信息（用于管理员查看）
     user_id: Optional[int] = Field(None, description="用户 ID")
     user_email: Optional[str] = Field(None, description="用户邮箱")
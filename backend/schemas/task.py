@@ -15,21 +15,20 @@ class TaskBase(BaseModel):
         """
         验证 payload_config 是否为有效的 JSON，并且包含必需的 ThreadId 字段
         """
-        from backend.utils.json_helpers import safe_parse_json, extract_thread_id
+        from backend.utils.json_helpers import safe_parse_json, parse_payload_cached
 
         if not v or not v.strip():
             raise ValueError("payload_config 不能为空")
 
-        payload = safe_parse_json(v)
+        # 优先使用解析缓存（响应序列化时同一份配置会被反复校验）
+        payload = parse_payload_cached(v)
         if payload is None:
-            raise ValueError("payload_config 必须是有效的 JSON 格式")
-
-        # 检查是否为字典类型
-        if not isinstance(payload, dict):
+            if safe_parse_json(v) is None:
+                raise ValueError("payload_config 必须是有效的 JSON 格式")
             raise ValueError("payload_config 必须是 JSON 对象（字典）")
 
         # 检查必需字段 ThreadId
-        thread_id = extract_thread_id(v)
+        thread_id = payload.get('ThreadId')
         if not thread_id or not str(thread_id).strip():
             raise ValueError("payload_config 必须包含有效的 ThreadId 字段")
 
@@ -81,7 +80,7 @@ class TaskUpdate(BaseModel):
         """
         验证 payload_config 是否为有效的 JSON（如果提供的话）
         """
-        from backend.utils.json_helpers import safe_parse_json, extract_thread_id
+        from backend.utils.json_helpers import safe_parse_json, parse_payload_cached
 
         if v is None:
             return v
@@ -89,16 +88,14 @@ class TaskUpdate(BaseModel):
         if not v.strip():
             raise ValueError("payload_config 不能为空字符串")
 
-        payload = safe_parse_json(v)
+        payload = parse_payload_cached(v)
         if payload is None:
-            raise ValueError("payload_config 必须是有效的 JSON 格式")
-
-        # 检查是否为字典类型
-        if not isinstance(payload, dict):
+            if safe_parse_json(v) is None:
+                raise ValueError("payload_config 必须是有效的 JSON 格式")
             raise ValueError("payload_config 必须是 JSON 对象（字典）")
 
         # 检查必需字段 ThreadId
-        thread_id = extract_thread_id(v)
+        thread_id = payload.get('ThreadId')
         if not thread_id or not str(thread_id).strip():
             raise ValueError("payload_config 必须包含有效的 ThreadId 字段")
 
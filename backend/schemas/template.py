@@ -3,6 +3,8 @@ from typing import Optional, Dict, Any, List, Union
 from pydantic import BaseModel, Field, field_validator
 import json
 
+from backend.schemas.task import TaskResponse
+
 
 class FieldOption(BaseModel):
     """字段选项（用于 select 类型）"""
@@ -140,6 +142,38 @@ class TaskFromTemplateRequest(BaseModel):
     cron_expression: Optional[str] = Field("0 20 * * *", description="Cron 表达式（可选，默认每天 20:00）")
 
 
+class BulkTaskRow(BaseModel):
+    """批量创建任务的单行数据"""
+    user_id: int = Field(..., description="用户 ID")
+    thread_id: str = Field(..., min_length=1, description="接龙项目 ID")
+    field_values: Dict[str, Any] = Field(default_factory=dict, description="用户填写的字段值")
+    task_name: Optional[str] = Field(None, max_length=100, description="任务名称（可选）")
+    cron_expression: Optional[str] = Field(None, description="Cron 表达式（可选，默认使用请求中的 cron_expression）")
+
+
+class BulkTaskFromTemplateRequest(BaseModel):
+    """从模板批量创建任务的请求 Schema"""
+    template_id: int = Field(..., description="模板 ID")
+    rows: List[BulkTaskRow] = Field(..., min_length=1, max_length=1000, description="每个用户的任务数据")
+    cron_expression: Optional[str] = Field("0 20 * * *", description="Cron 表达式（可选，默认每天 20:00）")
+    skip_invalid: bool = Field(False, description="是否跳过无效行继续创建（否则有任一行无效时不创建任何任务）")
+
+
+class BulkTaskRowError(BaseModel):
+    """批量创建任务的行错误"""
+    index: int = Field(..., description="行序号（从 0 开始）")
+    user_id: int
+    thread_id: str
+    detail: str
+
+
+class BulkTaskFromTemplateResponse(BaseModel):
+    """从模板批量创建任务的响应 Schema"""
+    created: int = Field(..., description="创建的任务数")
+    tasks: List[TaskResponse] = Field(default_factory=list, description="创建的任务")
+    errors: List[BulkTaskRowError] = Field(default_factory=list, description="无效的行")
+
+
 class TemplatePreviewResponse(BaseModel):
     """模板预览响应 Schema"""
     template_id: int
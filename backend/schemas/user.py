@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Literal
 from pydantic import BaseModel, Field, EmailStr
 
 
@@ -32,6 +32,9 @@ class UserUpdateProfile(BaseModel):
     email: Optional[EmailStr] = Field(None, description="邮箱地址")
     current_password: Optional[str] = Field(None, min_length=6, description="当前密码（修改密码时必填）")
     new_password: Optional[str] = Field(None, min_length=6, description="新密码")
+    notify_mode: Optional[Literal["immediate", "digest", "digest_failures_immediate"]] = Field(
+        None, description="打卡结果通知方式: immediate（每次发送）/digest（汇总发送）/digest_failures_immediate（失败立即发送，成功汇总）"
+    )
 
 
 class UserResponse(BaseModel):
@@ -43,6 +46,7 @@ class UserResponse(BaseModel):
     jwt_exp: str
     email: Optional[EmailStr] = None
     has_password: bool = False  # 是否已设置密码
+    notify_mode: str = "immediate"  # 打卡结果通知方式
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -0,0 +1,65 @@
+"""
+数据库迁移脚本：为打卡记录添加租约与重试字段（持久化打卡作业队列）
+
+添加字段：
+- check_in_records.lease_expires_at: 认领租约到期时间（到期未续租的作业可被其他 worker 重新认领）
+- check_in_records.attempts: 已执行次数
+- check_in_records.next_attempt_at: 下次重试时间（暂时性失败后按指数退避延后）
+
+运行方式：
+    python -m backend.scripts.migrate_add_check_in_lease
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from backend.models.database import engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LEASE_COLUMNS = (
+    ("lease_expires_at", "DATETIME"),
+    ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+    ("next_attempt_at", "DATETIME"),
+)
+
+
+def migrate():
+    """执行迁移"""
+    logger.info("开始迁移：为打卡记录添加租约与重试字段...")
+
+    with engine.connect() as conn:
+        # 检查字段是否已存在
+        result = conn.execute(text("PRAGMA table_info(check_in_records)"))
+        columns = [row[1] for row in result]
+
+        if not columns:
+            logger.info("✓ check_in_records 表不存在，启动服务时会自动创建，跳过")
+        else:
+            for column, column_type in LEASE_COLUMNS:
+                if column not in columns:
+                    logger.info(f"添加 {column} 字段...")
+                    conn.execute(text(
+                        f"ALTER TABLE check_in_records ADD COLUMN {column} {column_type}"
+                    ))
+                    conn.commit()
+                    logger.info(f"✓ {column} 字段添加成功")
+                else:
+                    logger.info(f"✓ {column} 字段已存在，跳过")
+
+    logger.info("✅ 迁移完成！")
+
+
+if __name__ == "__main__":
+    try:
+        migrate()
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,74 @@
+"""
+数据库迁移脚本：为打卡记录添加执行认领字段（打卡作业队列）
+
+添加字段：
+- check_in_records.worker_id: 认领该记录的执行进程标识
+- check_in_records.claimed_at: 认领时间
+
+已有的 pending 记录会标记为由迁移认领，避免升级后被 worker 重新执行
+
+运行方式：
+    python -m backend.scripts.migrate_add_check_in_queue
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from backend.models.database import engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUEUE_COLUMNS = (
+    ("worker_id", "VARCHAR(100)"),
+    ("claimed_at", "DATETIME"),
+)
+
+
+def migrate():
+    """执行迁移"""
+    logger.info("开始迁移：为打卡记录添加执行认领字段...")
+
+    with engine.connect() as conn:
+        # 检查字段是否已存在
+        result = conn.execute(text("PRAGMA table_info(check_in_records)"))
+        columns = [row[1] for row in result]
+
+        if not columns:
+            logger.info("✓ check_in_records 表不存在，启动服务时会自动创建，跳过")
+        else:
+            for column, column_type in QUEUE_COLUMNS:
+                if column not in columns:
+                    logger.info(f"添加 {column} 字段...")
+                    conn.execute(text(
+                        f"ALTER TABLE check_in_records ADD COLUMN {column} {column_type}"
+                    ))
+                    conn.commit()
+                    logger.info(f"✓ {column} 字段添加成功")
+                else:
+                    logger.info(f"✓ {column} 字段已存在，跳过")
+
+            # 升级前遗留的 pending 记录由旧版本的后台线程负责（进程已退出的会一直停留在 pending），不交给 worker 执行
+            result = conn.execute(text(
+                "UPDATE check_in_records SET worker_id = 'migration' "
+                "WHERE status = 'pending' AND worker_id IS NULL"
+            ))
+            conn.commit()
+            if result.rowcount:
+                logger.info(f"✓ 已标记 {result.rowcount} 条遗留的 pending 记录")
+
+    logger.info("✅ 迁移完成！")
+
+
+if __name__ == "__main__":
+    try:
+        migrate()
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        sys.exit(1)
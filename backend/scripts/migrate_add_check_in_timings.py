@@ -0,0 +1,73 @@
+"""
+数据库迁移脚本：为打卡记录添加分阶段耗时字段
+
+添加字段（单位毫秒，可为空）：
+- check_in_records.queue_wait_ms: 排队等待耗时
+- check_in_records.browser_ms: 启动无头浏览器耗时
+- check_in_records.capture_ms: 捕获签名耗时
+- check_in_records.http_ms: 打卡请求耗时
+- check_in_records.persist_ms: 写入打卡结果耗时
+- check_in_records.notify_ms: 发送通知耗时
+- check_in_records.total_ms: 总耗时
+
+运行方式：
+    python -m backend.scripts.migrate_add_check_in_timings
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from backend.models.database import engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TIMING_COLUMNS = (
+    "queue_wait_ms",
+    "browser_ms",
+    "capture_ms",
+    "http_ms",
+    "persist_ms",
+    "notify_ms",
+    "total_ms",
+)
+
+
+def migrate():
+    """执行迁移"""
+    logger.info("开始迁移：为打卡记录添加分阶段耗时字段...")
+
+    with engine.connect() as conn:
+        # 检查字段是否已存在
+        result = conn.execute(text("PRAGMA table_info(check_in_records)"))
+        columns = [row[1] for row in result]
+
+        if not columns:
+            logger.info("✓ check_in_records 表不存在，启动服务时会自动创建，跳过")
+        else:
+            for column in TIMING_COLUMNS:
+                if column not in columns:
+                    logger.info(f"添加 {column} 字段...")
+                    conn.execute(text(
+                        f"ALTER TABLE check_in_records ADD COLUMN {column} INTEGER"
+                    ))
+                    conn.commit()
+                    logger.info(f"✓ {column} 字段添加成功")
+                else:
+                    logger.info(f"✓ {column} 字段已存在，跳过")
+
+    logger.info("✅ 迁移完成！")
+
+
+if __name__ == "__main__":
+    try:
+        migrate()
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        sys.exit(1)
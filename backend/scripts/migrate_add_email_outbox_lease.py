@@ -0,0 +1,61 @@
+"""
+数据库迁移脚本：为邮件发件箱添加发送租约字段
+
+添加字段：
+- email_outbox.lease_expires_at: 发送租约到期时间（进程中断后 sending 状态的邮件在租约到期后重新入队）
+
+运行方式：
+    python -m backend.scripts.migrate_add_email_outbox_lease
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from backend.models.database import engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LEASE_COLUMNS = (
+    ("lease_expires_at", "DATETIME"),
+)
+
+
+def migrate():
+    """执行迁移"""
+    logger.info("开始迁移：为邮件发件箱添加发送租约字段...")
+
+    with engine.connect() as conn:
+        # 检查字段是否已存在
+        result = conn.execute(text("PRAGMA table_info(email_outbox)"))
+        columns = [row[1] for row in result]
+
+        if not columns:
+            logger.info("✓ email_outbox 表不存在，启动服务时会自动创建，跳过")
+        else:
+            for column, column_type in LEASE_COLUMNS:
+                if column not in columns:
+                    logger.info(f"添加 {column} 字段...")
+                    conn.execute(text(
+                        f"ALTER TABLE email_outbox ADD COLUMN {column} {column_type}"
+                    ))
+                    conn.commit()
+                    logger.info(f"✓ {column} 字段添加成功")
+                else:
+                    logger.info(f"✓ {column} 字段已存在，跳过")
+
+    logger.info("✅ 迁移完成！")
+
+
+if __name__ == "__main__":
+    try:
+        migrate()
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        sys.exit(1)
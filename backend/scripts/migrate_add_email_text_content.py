@@ -0,0 +1,55 @@
+"""
+数据库迁移脚本：为邮件发件箱添加纯文本内容字段
+
+添加字段：
+- email_outbox.text_content: 纯文本邮件内容（HTML 的替代版本）
+
+运行方式：
+    python -m backend.scripts.migrate_add_email_text_content
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from backend.models.database import engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate():
+    """执行迁移"""
+    logger.info("开始迁移：为邮件发件箱添加纯文本内容字段...")
+
+    with engine.connect() as conn:
+        # 检查字段是否已存在
+        result = conn.execute(text("PRAGMA table_info(email_outbox)"))
+        columns = [row[1] for row in result]
+
+        if not columns:
+            logger.info("✓ email_outbox 表不存在，启动服务时会自动创建，跳过")
+        elif 'text_content' not in columns:
+            logger.info("添加 text_content 字段...")
+            conn.execute(text(
+                "ALTER TABLE email_outbox ADD COLUMN text_content TEXT"
+            ))
+            conn.commit()
+            logger.info("✓ text_content 字段添加成功")
+        else:
+            logger.info("✓ text_content 字段已存在，跳过")
+
+    logger.info("✅ 迁移完成！")
+
+
+if __name__ == "__main__":
+    try:
+        migrate()
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,62 @@
+"""
+数据库迁移脚本：添加打卡结果汇总通知相关字段和表
+
+添加字段：
+- users.notify_mode: 打卡结果通知方式（immediate/digest/digest_failures_immediate）
+
+添加表：
+- check_in_digest_items: 汇总模式下待合并发送的打卡结果
+
+运行方式：
+    python -m backend.scripts.migrate_add_notify_mode
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from backend.models.database import engine
+from backend.models import CheckInDigestItem
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate():
+    """执行迁移"""
+    logger.info("开始迁移：添加打卡结果汇总通知...")
+
+    with engine.connect() as conn:
+        # 检查字段是否已存在
+        result = conn.execute(text("PRAGMA table_info(users)"))
+        columns = [row[1] for row in result]
+
+        # 添加 notify_mode 字段
+        if 'notify_mode' not in columns:
+            logger.info("添加 notify_mode 字段...")
+            conn.execute(text(
+                "ALTER TABLE users ADD COLUMN notify_mode VARCHAR(30) DEFAULT 'immediate' NOT NULL"
+            ))
+            conn.commit()
+            logger.info("✓ notify_mode 字段添加成功")
+        else:
+            logger.info("✓ notify_mode 字段已存在，跳过")
+
+    # 创建 check_in_digest_items 表（已存在时跳过）
+    CheckInDigestItem.__table__.create(bind=engine, checkfirst=True)
+    logger.info("✓ check_in_digest_items 表已就绪")
+
+    logger.info("✅ 迁移完成！打卡结果汇总通知已启用")
+
+
+if __name__ == "__main__":
+    try:
+        migrate()
+    except Exception as e:
+        logger.error(f"❌ 迁移失败: {e}")
+        sys.exit(1)
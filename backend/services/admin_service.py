@@ -4,6 +4,7 @@ from typing import List, Dict, Any
 from sqlalchemy.orm import Session
 
 from backend.models import User
+from backend.services.user_cache import user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,7 @@ class AdminService:
         user.is_approved = True
         user.updated_at = datetime.now()
         db.commit()
+        user_cache.invalidate_user(user.id)
 
         logger.info(f"管理员审批通过用户: {user.alias} (ID: {user.id})")
 
@@ -55,6 +57,7 @@ class AdminService:
         alias = user.alias
         db.delete(user)
         db.commit()
+        user_cache.invalidate_user(user_id)
 
         logger.info(f"管理员拒绝用户: {alias} (ID: {user_id})")
 
@@ -76,10 +79,15 @@ class AdminService:
 
         count = len(expired_users)
 
+        expired_user_ids = [user.id for user in expired_users]
+
         for user in expired_users:
             logger.info(f"删除过期未审批用户: {user.alias} (ID: {user.id})")
             db.delete(user)
 
         db.commit()
 
+        for user_id in expired_user_ids:
+            user_cache.invalidate_user(user_id)
+
         return count
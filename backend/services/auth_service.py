@@ -12,6 +12,7 @@ from backend.models import User
 from backend.workers.token_refresher import get_token_headless, get_session_data
 from backend.config import settings
 from backend.utils.jwt import JWTManager
+from backend.services.user_cache import user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -206,6 +207,7 @@ class AuthService:
                 user.updated_at = datetime.now()
                 db.commit()
                 db.refresh(user)
+                user_cache.invalidate_user(user.id)
 
                 logger.info(f"更新已注册用户 {user.alias} 的 Token")
 
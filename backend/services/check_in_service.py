@@ -1,11 +1,15 @@
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 import threading
+import time
 
+from backend.config import settings
 from backend.models import User, CheckInTask, CheckInRecord
-from backend.workers.check_in_worker import perform_check_in
+from backend.services.user_cache import user_cache
+from backend.utils.log_buffer import log_context, bind_log_context
+from backend.utils.metrics import CHECK_IN_OUTCOMES, CHECK_INS_QUEUED, stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -45,13 +49,35 @@ class CheckInService:
             # 标记已发送 Token 过期通知
             user.token_expired_notified = True
             db.commit()
+            user_cache.invalidate_user(user.id)
             logger.info(f"标记用户 {user.alias} 的 token_expired_notified 为 True")
 
         except Exception as e:
             logger.error(f"处理 Token 过期失败: {e}")
 
     @staticmethod
-    def create_pending_check_in_record(task: CheckInTask, trigger_type: str, db: Session) -> int:
+    def save_check_in_timings(record_id: int, timings: Dict[str, int], started_at: float, db: Session) -> None:
+        """
+        写入打卡记录的总耗时和写入耗时（打卡结果写入完成后调用）
+
+        Args:
+            record_id: 打卡记录 ID
+            timings: 分阶段耗时字典（需已包含 persist 阶段）
+            started_at: 计时起点（time.perf_counter()，异步打卡为入队时刻）
+            db: 数据库会话
+        """
+        timings["total"] = int((time.perf_counter() - started_at) * 1000)
+        db.query(CheckInRecord).filter(CheckInRecord.id == record_id).update(
+            CheckInRecord.timing_values({stage: timings.get(stage) for stage in ("persist", "total")})
+        )
+        db.commit()
+
+    @staticmethod
+    def create_pending_check_in_record(
+        task: CheckInTask,
+        trigger_type: str,
+        db: Session
+    ) -> int:
         """
         创建一个待处理的打卡记录并返回 record_id
 
@@ -82,7 +108,80 @@ class CheckInService:
         return record.id
 
     @staticmethod
-    def execute_check_in_async(task_id: int, record_id: int, user_token: str):
+    def schedule_retry(
+        record_id: int,
+        attempt: int,
+        result: Dict[str, Any],
+        db: Session,
+        worker_id: Optional[str] = None,
+        cron_expression: Optional[str] = None
+    ) -> bool:
+        """
+        按重试策略把未成功的打卡作业放回队列（同一条打卡记录，执行次数累加）
+
+        Args:
+            record_id: 打卡记录 ID
+            attempt: 本次是第几次执行
+            result: 本次打卡结果
+            db: 数据库会话
+            worker_id: 当前持有租约的进程标识（不为空时只在仍持有租约时放回）
+            cron_expression: 任务的 cron 表达式（重试不晚于下一次定时触发）
+
+        Returns:
+            是否已放回队列（不符合重试规则、已达到最大执行次数或超出 cron 窗口时返回 False，由调用方记录最终结果）
+        """
+        first_queued_at = db.query(CheckInRecord.check_in_time).filter(CheckInRecord.id == record_id).scalar()
+        if first_queued_at is None:
+            return False
+
+        values = CheckInService._retry_values(record_id, attempt, result, first_queued_at, cron_expression)
+        if values is None:
+            return False
+
+        query = db.query(CheckInRecord).filter(CheckInRecord.id == record_id, CheckInRecord.status == "pending")
+        if worker_id:
+            query = query.filter(CheckInRecord.worker_id == worker_id)
+        requeued = query.update(values, synchronize_session=False)
+        db.commit()
+        return bool(requeued)
+
+    @staticmethod
+    def _retry_values(
+        record_id: int,
+        attempt: int,
+        result: Dict[str, Any],
+        first_queued_at: datetime,
+        cron_expression: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """按重试策略计算放回队列时写入的字段，不重试时返回 None"""
+        from backend.services.retry_policy import RetryPolicy
+
+        retry_at = RetryPolicy.from_settings().next_attempt_at(result, attempt, first_queued_at, cron_expression)
+        if retry_at is None:
+            return None
+
+        delay = int((retry_at - datetime.now(timezone.utc)).total_seconds())
+        logger.warning(
+            f"🔁 打卡未成功，约 {delay} 秒后重试 - Record ID: {record_id}, 第 {attempt} 次, "
+            f"状态: {result['status']}, 错误: {result['error_message']}"
+        )
+        return {
+            "worker_id": None,
+            "lease_expires_at": None,
+            "next_attempt_at": retry_at,
+            "response_text": result.get("response_text", ""),
+            "error_message": f"第 {attempt} 次执行未成功（{result['status']}），约 {delay} 秒后重试: {result['error_message']}"
+        }
+
+    @staticmethod
+    def execute_check_in_async(
+        task_id: int,
+        record_id: int,
+        user_token: str,
+        queued_at: Optional[float] = None,
+        worker_id: Optional[str] = None,
+        attempt: int = 1
+    ):
         """
         在后台线程中执行打卡操作
 
@@ -90,62 +189,213 @@ class CheckInService:
             task_id: 任务 ID
             record_id: 打卡记录 ID
             user_token: 用户 Token
+            queued_at: 入队时刻（time.perf_counter()，用于统计排队等待耗时）
+            worker_id: 认领该记录的进程标识（不为空时只在仍持有租约时写入结果，租约被其他进程接管后放弃本次结果）
+            attempt: 本次是第几次执行（未成功时按重试策略放回队列）
         """
         from backend.models.database import SessionLocal
 
-        # 创建独立的数据库会话
-        db = SessionLocal()
+        started_at = time.perf_counter()
+        timings: Dict[str, int] = {}
+        if queued_at is not None:
+            timings["queue_wait"] = int((started_at - queued_at) * 1000)
 
-        try:
-            logger.info(f"🤖 后台线程开始执行打卡 - Task ID: {task_id}, Record ID: {record_id}")
-
-            # 获取任务对象
-            task = db.query(CheckInTask).filter(CheckInTask.id == task_id).first()
-            if not task:
-                logger.error(f"❌ 任务不存在 - Task ID: {task_id}")
-                # 更新记录状态为失败
-                record = db.query(CheckInRecord).filter(CheckInRecord.id == record_id).first()
-                if record:
-                    db.query(CheckInRecord).filter(CheckInRecord.id == record_id).update({
+        def owned_record(db: Session):
+            query = db.query(CheckInRecord).filter(CheckInRecord.id == record_id)
+            if worker_id:
+                query = query.filter(CheckInRecord.worker_id == worker_id)
+            return query
+
+        with log_context(task_id=task_id, record_id=record_id):
+            # 创建独立的数据库会话
+            db = SessionLocal()
+            cron_expression = None
+
+            try:
+                logger.info(f"🤖 后台线程开始执行打卡 - Task ID: {task_id}, Record ID: {record_id}, 第 {attempt} 次")
+
+                # 获取任务对象
+                task = db.query(CheckInTask).filter(CheckInTask.id == task_id).first()
+                if not task:
+                    logger.error(f"❌ 任务不存在 - Task ID: {task_id}")
+                    # 更新记录状态为失败
+                    owned_record(db).update({
                         "status": "failure",
                         "error_message": "任务不存在"
-                    })
+                    }, synchronize_session=False)
+                    db.commit()
+                    CHECK_IN_OUTCOMES.inc("failure")
+                    return
+
+                cron_expression = task.cron_expression
+                if task.user:
+                    bind_log_context(user=task.user.alias)
+
+                # 执行打卡
+                from backend.workers.check_in_worker import perform_check_in
+                result = perform_check_in(task, user_token)
+                timings.update(result.get("timings", {}))
+
+                # 未成功：按重试策略放回队列（暂时性失败、不在打卡时间、未识别的响应等）
+                if not result["success"] and CheckInService.schedule_retry(
+                    record_id, attempt, result, db, worker_id, task.cron_expression
+                ):
+                    return
+
+                # 如果是 Token 过期导致的失败，处理 Token 过期情况
+                if result["status"] == "token_expired" and task.user:
+                    CheckInService.handle_token_expired(task.user, task, db)
+
+                # 更新记录（连同各阶段耗时）
+                with stage_timer(timings, "persist"):
+                    updated = owned_record(db).update({
+                        "status": result["status"],
+                        "response_text": result["response_text"],
+                        "error_message": result["error_message"],
+                        **CheckInRecord.timing_values(timings)
+                    }, synchronize_session=False)
                     db.commit()
-                return
+                if not updated:
+                    logger.warning(f"⚠️ 认领租约已被其他进程接管，放弃本次结果 - Record ID: {record_id}")
+                    return
+                CheckInService.save_check_in_timings(record_id, timings, queued_at or started_at, db)
 
-            # 执行打卡
-            result = perform_check_in(task, user_token)
+                if result["success"]:
+                    logger.info(f"✅ 后台打卡成功 - Record ID: {record_id}")
+                else:
+                    logger.error(f"❌ 后台打卡失败 - Record ID: {record_id}, 错误: {result['error_message']}")
 
-            # 如果是 Token 过期导致的失败，处理 Token 过期情况
-            if result["status"] == "token_expired" and task.user:
-                CheckInService.handle_token_expired(task.user, task, db)
-
-            # 更新记录
-            db.query(CheckInRecord).filter(CheckInRecord.id == record_id).update({
-                "status": result["status"],
-                "response_text": result["response_text"],
-                "error_message": result["error_message"]
-            })
-            db.commit()
+            except Exception as e:
+                logger.error(f"💥 后台打卡异常 - Task ID: {task_id}, Record ID: {record_id}, 错误: {str(e)}")
+                # 放回队列重试，已达到最大执行次数时记录失败
+                try:
+                    db.rollback()
+                    failure = {"success": False, "status": "failure", "error_message": f"后台执行异常: {str(e)}", "transient": True}
+                    if not CheckInService.schedule_retry(record_id, attempt, failure, db, worker_id, cron_expression):
+                        owned_record(db).update({
+                            "status": "failure",
+                            "error_message": f"后台执行异常: {str(e)}"
+                        }, synchronize_session=False)
+                        db.commit()
+                        CHECK_IN_OUTCOMES.inc("failure")
+                except Exception as inner_e:
+                    logger.error(f"💥 更新记录失败: {str(inner_e)}")
+            finally:
+                db.close()
 
-            if result["success"]:
-                logger.info(f"✅ 后台打卡成功 - Record ID: {record_id}")
-            else:
-                logger.error(f"❌ 后台打卡失败 - Record ID: {record_id}, 错误: {result['error_message']}")
+    @staticmethod
+    def execute_check_in_group(
+        jobs: List[Tuple[int, int, Optional[float], int]],
+        user_token: str,
+        worker_id: Optional[str] = None
+    ):
+        """
+        合并执行同一用户同一时段的多个打卡作业
 
-        except Exception as e:
-            logger.error(f"💥 后台打卡异常 - Task ID: {task_id}, Record ID: {record_id}, 错误: {str(e)}")
-            # 更新记录状态
+        只加载一次任务和用户、获取一次签名、复用一个 HTTP 连接按顺序提交，所有打卡结果在同一个事务中写入
+
+        Args:
+            jobs: [(task_id, record_id, 入队时刻 time.perf_counter(), 第几次执行)]
+            user_token: 用户 Token
+            worker_id: 认领这些记录的进程标识（不为空时只写入仍持有租约的记录）
+        """
+        from sqlalchemy.orm import joinedload
+        from backend.models.database import SessionLocal
+        from backend.workers.check_in_worker import perform_check_ins
+
+        started_at = time.perf_counter()
+        record_ids = [record_id for _, record_id, _, _ in jobs]
+
+        def owned_record(db: Session, record_id: int):
+            query = db.query(CheckInRecord).filter(CheckInRecord.id == record_id)
+            if worker_id:
+                query = query.filter(CheckInRecord.worker_id == worker_id)
+            return query
+
+        with log_context(task_id=jobs[0][0], record_id=record_ids[0]):
+            db = SessionLocal()
             try:
-                db.query(CheckInRecord).filter(CheckInRecord.id == record_id).update({
-                    "status": "failure",
-                    "error_message": f"后台执行异常: {str(e)}"
-                })
-                db.commit()
-            except Exception as inner_e:
-                logger.error(f"💥 更新记录失败: {str(inner_e)}")
-        finally:
-            db.close()
+                tasks = {
+                    task.id: task for task in db.query(CheckInTask).options(joinedload(CheckInTask.user)).filter(
+                        CheckInTask.id.in_([task_id for task_id, _, _, _ in jobs])
+                    ).all()
+                }
+                first_queued = dict(db.query(CheckInRecord.id, CheckInRecord.check_in_time).filter(
+                    CheckInRecord.id.in_(record_ids)
+                ).all())
+                runnable = [job for job in jobs if job[0] in tasks]
+                user = tasks[runnable[0][0]].user if runnable else None
+                if user:
+                    bind_log_context(user=user.alias)
+
+                logger.info(f"🤖 合并执行 {len(jobs)} 个打卡作业 - Record IDs: {record_ids}")
+                results = perform_check_ins([tasks[task_id] for task_id, _, _, _ in runnable], user_token)
+
+                # 同一事务写入全部结果（未成功的按重试策略放回队列）
+                written = []
+                persist: Dict[str, int] = {}
+                with stage_timer(persist, "persist"):
+                    for task_id, record_id, _, _ in jobs:
+                        if task_id not in tasks:
+                            logger.error(f"❌ 任务不存在 - Task ID: {task_id}")
+                            owned_record(db, record_id).update({
+                                "status": "failure",
+                                "error_message": "任务不存在"
+                            }, synchronize_session=False)
+                            CHECK_IN_OUTCOMES.inc("failure")
+
+                    for (task_id, record_id, queued_at, attempt), result in zip(runnable, results):
+                        timings = result["timings"]
+                        if queued_at is not None:
+                            timings["queue_wait"] = int((started_at - queued_at) * 1000)
+
+                        values = None
+                        if not result["success"] and first_queued.get(record_id) is not None:
+                            values = CheckInService._retry_values(
+                                record_id, attempt, result, first_queued[record_id], tasks[task_id].cron_expression
+                            )
+                        if values is None:
+                            values = {
+                                "status": result["status"],
+                                "response_text": result["response_text"],
+                                "error_message": result["error_message"],
+                                **CheckInRecord.timing_values(timings)
+                            }
+                            written.append((record_id, timings, queued_at))
+                        owned_record(db, record_id).update(values, synchronize_session=False)
+                    db.commit()
+
+                for (task_id, _, _, _), result in zip(runnable, results):
+                    if result["status"] == "token_expired" and user:
+                        CheckInService.handle_token_expired(user, tasks[task_id], db)
+                        break
+
+                for record_id, timings, queued_at in written:
+                    timings.update(persist)
+                    CheckInService.save_check_in_timings(record_id, timings, queued_at or started_at, db)
+
+                succeeded = sum(1 for result in results if result["success"])
+                logger.info(f"✅ 合并打卡完成 - 成功 {succeeded}/{len(jobs)}")
+
+            except Exception as e:
+                logger.error(f"💥 合并打卡异常 - Record IDs: {record_ids}, 错误: {str(e)}")
+                try:
+                    db.rollback()
+                    failure = {"success": False, "status": "failure", "error_message": f"后台执行异常: {str(e)}", "transient": True}
+                    for task_id, record_id, _, attempt in jobs:
+                        task = db.query(CheckInTask).filter(CheckInTask.id == task_id).first()
+                        cron_expression = task.cron_expression if task else None
+                        if not CheckInService.schedule_retry(record_id, attempt, failure, db, worker_id, cron_expression):
+                            owned_record(db, record_id).filter(CheckInRecord.status == "pending").update({
+                                "status": "failure",
+                                "error_message": failure["error_message"]
+                            }, synchronize_session=False)
+                            db.commit()
+                            CHECK_IN_OUTCOMES.inc("failure")
+                except Exception as inner_e:
+                    logger.error(f"💥 更新记录失败: {str(inner_e)}")
+            finally:
+                db.close()
 
     @staticmethod
     def start_async_check_in(task: CheckInTask, trigger_type: str, db: Session) -> Dict[str, Any]:
@@ -160,61 +410,70 @@ class CheckInService:
         Returns:
             包含 record_id 的字典
         """
-        logger.info(f"🚀 启动异步打卡 - 任务: {task.name or f'Task-{task.id}'} (ID: {task.id})")
-
-        # 获取用户的打卡 Token
-        user = task.user
-        if not user or not user.authorization:
-            error_msg = f"用户没有有效的打卡 Token"
-            logger.error(f"❌ {error_msg} - Task ID: {task.id}")
-
-            # 创建失败记录
-            record = CheckInRecord(
-                task_id=task.id,
-                status="failure",
-                response_text="",
-                error_message=error_msg,
-                location="{}",
-                trigger_type=trigger_type
-            )
-            db.add(record)
-            db.commit()
-            db.refresh(record)
+        with log_context(task_id=task.id, user=task.user.alias if task.user else None):
+            logger.info(f"🚀 启动异步打卡 - 任务: {task.name or f'Task-{task.id}'} (ID: {task.id})")
+
+            # 获取用户的打卡 Token
+            user = task.user
+            if not user or not user.authorization:
+                error_msg = f"用户没有有效的打卡 Token"
+                logger.error(f"❌ {error_msg} - Task ID: {task.id}")
+
+                # 创建失败记录
+                record = CheckInRecord(
+                    task_id=task.id,
+                    status="failure",
+                    response_text="",
+                    error_message=error_msg,
+                    location="{}",
+                    trigger_type=trigger_type
+                )
+                db.add(record)
+                db.commit()
+                db.refresh(record)
+                CHECK_IN_OUTCOMES.inc(record.status)
 
-            return {
-                "record_id": record.id,
-                "status": "failure",
-                "message": error_msg
-            }
+                return {
+                    "record_id": record.id,
+                    "status": "failure",
+                    "message": error_msg
+                }
 
-        # 不再提前验证 Token，交给统一的打卡逻辑处理
-        # 这样可以确保所有错误（包括 Token 过期）都通过统一的流程处理
+            # 不再提前验证 Token，交给统一的打卡逻辑处理
+            # 这样可以确保所有错误（包括 Token 过期）都通过统一的流程处理
 
-        # 创建待处理记录
-        record_id = CheckInService.create_pending_check_in_record(task, trigger_type, db)
+            # 创建待处理记录（即打卡作业），由 worker 认领执行
+            record_id = CheckInService.create_pending_check_in_record(task, trigger_type, db)
 
-        # 在后台线程中执行打卡
-        import threading
-        thread = threading.Thread(
-            target=CheckInService.execute_check_in_async,
-            args=(task.id, record_id, user.authorization),
-            daemon=True
-        )
-        thread.start()
+            # 队列模式：由独立的 worker 进程认领执行
+            if settings.CHECK_IN_EXECUTION_MODE.lower() == "queue":
+                logger.info(f"📥 打卡作业已入队 - Record ID: {record_id}")
+                return {
+                    "record_id": record_id,
+                    "status": "pending",
+                    "message": "打卡任务已入队，等待后台处理"
+                }
 
-        logger.info(f"✅ 异步打卡任务已启动 - Record ID: {record_id}")
+            # 线程模式：唤醒 API 进程内置的 worker 立即认领
+            from backend.workers.check_in_queue_worker import check_in_queue_worker
+            check_in_queue_worker.notify(coalesce=trigger_type == "scheduled")
 
-        return {
-            "record_id": record_id,
-            "status": "pending",
-            "message": "打卡任务已启动，正在后台处理"
-        }
+            logger.info(f"✅ 异步打卡任务已启动 - Record ID: {record_id}")
+
+            return {
+                "record_id": record_id,
+                "status": "pending",
+                "message": "打卡任务已启动，正在后台处理"
+            }
 
     @staticmethod
     def perform_task_check_in(task: CheckInTask, trigger_type: str, db: Session) -> Dict[str, Any]:
         """
         执行单个任务的打卡
 
+        在调用方进程内同步执行（启动浏览器、提交打卡），不经过打卡队列，没有租约、尝试次数上限和重试；
+        API 接口应使用 start_async_check_in 入队，本方法只用于需要立即在当前进程得到结果的脚本和调试
+
         Args:
             task: 打卡任务对象
             trigger_type: 触发类型 (manual/scheduled/admin)
@@ -223,119 +482,136 @@ class CheckInService:
         Returns:
             打卡结果字典
         """
-        logger.info(f"🎯 开始打卡 - 任务: {task.name or f'Task-{task.id}'} (ID: {task.id}), 触发: {trigger_type}")
-
-        # 获取用户的打卡 Token
-        user = task.user
-        if not user or not user.authorization:
-            error_msg = f"用户没有有效的打卡 Token"
-            logger.error(f"❌ {error_msg} - Task ID: {task.id}, User ID: {user.id if user else 'None'}")
-
-            # 记录失败
-            record = CheckInRecord(
-                task_id=task.id,
-                status="failure",
-                response_text="",
-                error_message=error_msg,
-                location="{}",
-                trigger_type=trigger_type
-            )
-            db.add(record)
-            db.commit()
-            db.refresh(record)
-
-            return {
-                "success": False,
-                "message": error_msg,
-                "record_id": record.id
-            }
-
-        # 使用统一的打卡 Token 验证方法
-        from backend.services.auth_service import AuthService
-        token_result = AuthService.verify_checkin_authorization(user)
-
-        if not token_result["is_valid"]:
-            error_msg = token_result["message"]
-            logger.warning(f"⏰ {error_msg} - 用户: {user.alias}, Task ID: {task.id}")
-
-            # 处理 Token 过期：发送邮件并标记
-            CheckInService.handle_token_expired(user, task, db)
-
-            # 记录失败
-            record = CheckInRecord(
-                task_id=task.id,
-                status="token_expired",  # 使用统一的状态标识
-                response_text="",
-                error_message=error_msg,
-                location="{}",
-                trigger_type=trigger_type
-            )
-            db.add(record)
-            db.commit()
-            db.refresh(record)
+        started_at = time.perf_counter()
+
+        with log_context(task_id=task.id, user=task.user.alias if task.user else None):
+            logger.info(f"🎯 开始打卡 - 任务: {task.name or f'Task-{task.id}'} (ID: {task.id}), 触发: {trigger_type}")
+
+            # 获取用户的打卡 Token
+            user = task.user
+            if not user or not user.authorization:
+                error_msg = f"用户没有有效的打卡 Token"
+                logger.error(f"❌ {error_msg} - Task ID: {task.id}, User ID: {user.id if user else 'None'}")
+
+                # 记录失败
+                record = CheckInRecord(
+                    task_id=task.id,
+                    status="failure",
+                    response_text="",
+                    error_message=error_msg,
+                    location="{}",
+                    trigger_type=trigger_type
+                )
+                db.add(record)
+                db.commit()
+                db.refresh(record)
+                CHECK_IN_OUTCOMES.inc(record.status)
 
-            return {
-                "success": False,
-                "message": f"{error_msg}，请重新扫码登录",
-                "record_id": record.id
-            }
+                return {
+                    "success": False,
+                    "message": error_msg,
+                    "record_id": record.id
+                }
+
+            # 使用统一的打卡 Token 验证方法
+            from backend.services.auth_service import AuthService
+            token_result = AuthService.verify_checkin_authorization(user)
+
+            if not token_result["is_valid"]:
+                error_msg = token_result["message"]
+                logger.warning(f"⏰ {error_msg} - 用户: {user.alias}, Task ID: {task.id}")
+
+                # 处理 Token 过期：发送邮件并标记
+                CheckInService.handle_token_expired(user, task, db)
+
+                # 记录失败
+                record = CheckInRecord(
+                    task_id=task.id,
+                    status="token_expired",  # 使用统一的状态标识
+                    response_text="",
+                    error_message=error_msg,
+                    location="{}",
+                    trigger_type=trigger_type
+                )
+                db.add(record)
+                db.commit()
+                db.refresh(record)
+                CHECK_IN_OUTCOMES.inc(record.status)
 
-        # 执行打卡（传递 task 对象和用户 token）
-        logger.info(f"🤖 调用 Selenium Worker 执行打卡...")
-        result = perform_check_in(task, user.authorization)
+                return {
+                    "success": False,
+                    "message": f"{error_msg}，请重新扫码登录",
+                    "record_id": record.id
+                }
 
-        # 如果是 Token 过期导致的失败，处理 Token 过期情况
-        if result["status"] == "token_expired" and user:
-            CheckInService.handle_token_expired(user, task, db)
+            # 执行打卡（传递 task 对象和用户 token）
+            logger.info(f"🤖 调用 Selenium Worker 执行打卡...")
+            from backend.workers.check_in_worker import perform_check_in
+            result = perform_check_in(task, user.authorization)
 
-        # 保存打卡记录
-        record = CheckInRecord(
-            task_id=task.id,
-            status=result["status"],
-            response_text=result["response_text"],
-            error_message=result["error_message"],
-            location="{}",
-            trigger_type=trigger_type
-        )
-        db.add(record)
-        db.commit()
-        db.refresh(record)
+            # 如果是 Token 过期导致的失败，处理 Token 过期情况
+            if result["status"] == "token_expired" and user:
+                CheckInService.handle_token_expired(user, task, db)
+
+            # 保存打卡记录（连同各阶段耗时）
+            timings = result.get("timings", {})
+            with stage_timer(timings, "persist"):
+                record = CheckInRecord(
+                    task_id=task.id,
+                    status=result["status"],
+                    response_text=result["response_text"],
+                    error_message=result["error_message"],
+                    location="{}",
+                    trigger_type=trigger_type,
+                    **CheckInRecord.timing_values(timings)
+                )
+                db.add(record)
+                db.commit()
+                db.refresh(record)
+            CheckInService.save_check_in_timings(record.id, timings, started_at, db)
 
-        if result["success"]:
-            logger.info(f"✅ 打卡成功 - Record ID: {record.id}")
-        else:
-            logger.error(f"❌ 打卡失败 - {result['error_message']}")
+            if result["success"]:
+                logger.info(f"✅ 打卡成功 - Record ID: {record.id}", extra={"record_id": record.id})
+            else:
+                logger.error(f"❌ 打卡失败 - {result['error_message']}", extra={"record_id": record.id})
 
-        return {
-            "success": result["success"],
-            "message": "打卡成功" if result["success"] else f"打卡失败: {result['error_message']}",
-            "record_id": record.id
-        }
+            return {
+                "success": result["success"],
+                "message": "打卡成功" if result["success"] else f"打卡失败: {result['error_message']}",
+                "record_id": record.id
+            }
 
     @staticmethod
     def batch_check_in_tasks(task_ids: List[int], db: Session) -> Dict[str, Any]:
         """
         批量打卡任务
 
+        与手动打卡相同，经 start_async_check_in 为每个任务创建待处理记录，由 worker 认领执行
+        （queue 模式下为独立 worker 进程），租约、最大尝试次数、重试和同一用户合并与定时打卡一致；
+        接口只负责入队，不等待打卡完成，可按返回的 record_id 查询结果
+
         Args:
             task_ids: 任务 ID 列表
             db: 数据库会话
 
         Returns:
-            批量打卡结果
+            批量入队结果
         """
+        from sqlalchemy.orm import joinedload
+
         logger.info(f"🚀 开始批量打卡，任务数量: {len(task_ids)}")
 
         results = {
             "total": len(task_ids),
-            "success": 0,
+            "queued": 0,
             "failure": 0,
             "skipped": 0,
+            "record_ids": [],
             "details": []
         }
 
-        # 优化：一次性查询所有任务，避免 N+1 查询
-        tasks = db.query(CheckInTask).filter(CheckInTask.id.in_(task_ids)).all()
+        # 一次性查询所有任务及其用户，避免 N+1 查询
+        tasks = db.query(CheckInTask).options(joinedload(CheckInTask.user)).filter(CheckInTask.id.in_(task_ids)).all()
         tasks_dict = {task.id: task for task in tasks}
 
         for task_id in task_ids:
@@ -351,12 +627,13 @@ class CheckInService:
                     })
                     continue
 
-                # 执行打卡（移除 is_active 检查，允许手动打卡）
-                result = CheckInService.perform_task_check_in(task, "admin", db)
+                # 创建待处理记录入队（移除 is_active 检查，允许手动打卡）
+                result = CheckInService.start_async_check_in(task, "admin", db)
+                queued = result["status"] == "pending"
 
-                if result["success"]:
-                    results["success"] += 1
-                    logger.info(f"✅ 任务 {task_id} 批量打卡成功")
+                if queued:
+                    results["queued"] += 1
+                    results["record_ids"].append(result["record_id"])
                 else:
                     results["failure"] += 1
                     logger.error(f"❌ 任务 {task_id} 批量打卡失败: {result['message']}")
@@ -364,13 +641,15 @@ class CheckInService:
                 results["details"].append({
                     "task_id": task_id,
                     "task_name": task.name or f'Task-{task.id}',
-                    "success": result["success"],
+                    "success": queued,
+                    "status": result["status"],
                     "message": result["message"],
-                    "record_id": result.get("record_id")
+                    "record_id": result["record_id"]
                 })
 
             except Exception as e:
-                logger.error(f"💥 任务 {task_id} 处理异常: {str(e)}")
+                logger.error(f"💥 任务 {task_id} 入队异常: {str(e)}")
+                db.rollback()
                 results["failure"] += 1
                 results["details"].append({
                     "task_id": task_id,
@@ -378,7 +657,7 @@ class CheckInService:
                     "message": f"异常: {str(e)}"
                 })
 
-        logger.info(f"📊 批量打卡完成 - 成功: {results['success']}, 失败: {results['failure']}, 跳过: {results['skipped']}")
+        logger.info(f"📊 批量打卡入队完成 - 入队: {results['queued']}, 失败: {results['failure']}, 跳过: {results['skipped']}")
         return results
 
     @staticmethod
@@ -512,6 +791,62 @@ class CheckInService:
 
         return records, total
 
+    @staticmethod
+    def get_timing_percentiles(
+        db: Session,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        status: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        按阶段统计打卡耗时分位数
+
+        只查询耗时列，按 ix_record_status_time / check_in_time 索引筛选时间范围
+
+        Args:
+            db: 数据库会话
+            start: 起始时间（含，可选，不带时区时视为 UTC）
+            end: 结束时间（含，可选，不带时区时视为 UTC）
+            status: 打卡状态过滤（可选）
+
+        Returns:
+            {阶段: {count, avg, p50, p90, p95, p99, max}}，单位毫秒；没有数据的阶段各值为 None
+        """
+        from backend.utils.metrics import nearest_rank_percentile as percentile
+        from backend.utils.time_helpers import to_utc
+
+        columns = [getattr(CheckInRecord, f"{stage}_ms") for stage in CheckInRecord.TIMING_STAGES]
+        query = db.query(*columns).filter(CheckInRecord.total_ms.isnot(None))
+        if status:
+            query = query.filter(CheckInRecord.status == status)
+        if start:
+            query = query.filter(CheckInRecord.check_in_time >= to_utc(start))
+        if end:
+            query = query.filter(CheckInRecord.check_in_time <= to_utc(end))
+
+        samples: Dict[str, List[int]] = {stage: [] for stage in CheckInRecord.TIMING_STAGES}
+        for row in query.yield_per(1000):
+            for stage, value in zip(CheckInRecord.TIMING_STAGES, row):
+                if value is not None:
+                    samples[stage].append(value)
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        for stage, values in samples.items():
+            values.sort()
+            if not values:
+                stats[stage] = {"count": 0, "avg": None, "p50": None, "p90": None, "p95": None, "p99": None, "max": None}
+                continue
+            stats[stage] = {
+                "count": len(values),
+                "avg": round(sum(values) / len(values), 1),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": values[-1],
+            }
+        return stats
+
     @staticmethod
     def enrich_record_with_user_task_info(record: CheckInRecord, db: Session) -> dict:
         """
@@ -555,6 +890,7 @@ class CheckInService:
             'location': record.location,
             'trigger_type': record.trigger_type,
             'check_in_time': record.check_in_time,
+            'timings': record.timings,
             'user_id': user.id if user else None,
             'user_email': user.email if user else None,
             'task_name': task_name,
@@ -562,3 +898,17 @@ class CheckInService:
         }
 
         return record_dict
+
+
+def _count_pending_records() -> int:
+    """统计等待处理的打卡记录数（/metrics 导出时调用）"""
+    from backend.models.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return db.query(CheckInRecord).filter(CheckInRecord.status == "pending").count()
+    finally:
+        db.close()
+
+
+CHECK_INS_QUEUED.set_callback(_count_pending_records)
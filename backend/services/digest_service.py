@@ -0,0 +1,149 @@
+"""
+打卡结果汇总服务
+
+职能：汇总模式下缓冲用户的打卡结果，窗口结束后合并为一封汇总邮件
+- 结果写入 check_in_digest_items 表（进程重启不丢失）
+- 窗口从用户第一条未发送结果开始计时，覆盖同一时段内的密集打卡
+- 由调度器定时调用 flush_due 发送到期的汇总
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from backend.config import settings
+from backend.models import User, CheckInDigestItem
+
+logger = logging.getLogger(__name__)
+
+# 打卡结果通知方式
+NOTIFY_MODE_IMMEDIATE = "immediate"  # 每次打卡立即发送
+NOTIFY_MODE_DIGEST = "digest"  # 全部结果合并为汇总邮件
+NOTIFY_MODE_DIGEST_FAILURES_IMMEDIATE = "digest_failures_immediate"  # 失败立即发送，成功合并为汇总邮件
+
+NOTIFY_MODES = (NOTIFY_MODE_IMMEDIATE, NOTIFY_MODE_DIGEST, NOTIFY_MODE_DIGEST_FAILURES_IMMEDIATE)
+
+
+class DigestService:
+    """打卡结果汇总服务"""
+
+    @staticmethod
+    def should_buffer(user: User, success: bool) -> bool:
+        """
+        根据用户偏好判断打卡结果是否进入汇总
+
+        Args:
+            user: 用户对象
+            success: 打卡是否成功
+
+        Returns:
+            True 表示缓冲到汇总邮件，False 表示立即发送
+        """
+        mode = getattr(user, "notify_mode", None) or NOTIFY_MODE_IMMEDIATE
+
+        if mode == NOTIFY_MODE_DIGEST:
+            return True
+        if mode == NOTIFY_MODE_DIGEST_FAILURES_IMMEDIATE:
+            return success
+        return False
+
+    @staticmethod
+    def buffer_result(user: User, task_info: dict, success: bool, message: str = "") -> bool:
+        """
+        缓冲一条打卡结果
+
+        Args:
+            user: 用户对象
+            task_info: 打卡任务信息（包含 thread_id, name）
+            success: 打卡是否成功
+            message: 结果消息
+
+        Returns:
+            是否缓冲成功
+        """
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.add(CheckInDigestItem(
+                user_id=user.id,
+                task_name=str(task_info.get('name') or '')[:100],
+                thread_id=str(task_info.get('thread_id') or '')[:100],
+                success=success,
+                message=message or "",
+            ))
+            db.commit()
+            logger.debug(f"用户 {user.alias} 的打卡结果已加入汇总")
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"缓冲打卡结果失败: {e}")
+            return False
+        finally:
+            db.close()
+
+    @staticmethod
+    def flush_due(force: bool = False) -> int:
+        """
+        发送所有窗口已结束的汇总邮件
+
+        Args:
+            force: 是否忽略窗口立即发送全部缓冲结果
+
+        Returns:
+            发送的汇总邮件数
+        """
+        from backend.models.database import SessionLocal
+        from backend.services.email_service import EmailService
+
+        db = SessionLocal()
+        try:
+            items = db.query(CheckInDigestItem).order_by(
+                CheckInDigestItem.user_id, CheckInDigestItem.created_at
+            ).all()
+            if not items:
+                return 0
+
+            grouped: Dict[int, List[CheckInDigestItem]] = {}
+            for item in items:
+                grouped.setdefault(item.user_id, []).append(item)
+
+            cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.EMAIL_DIGEST_WINDOW_MINUTES)
+            users = {
+                user.id: user for user in db.query(User).filter(User.id.in_(list(grouped.keys()))).all()
+            }
+
+            sent_count = 0
+            for user_id, user_items in grouped.items():
+                # 窗口从第一条结果开始计时
+                if not force and user_items[0].created_at > cutoff:
+                    continue
+
+                user = users.get(user_id)
+                if user and user.email:
+                    results = [
+                        {
+                            'name': item.task_name,
+                            'thread_id': item.thread_id,
+                            'success': bool(item.success),
+                            'message': item.message or "",
+                            'created_at': item.created_at,
+                        }
+                        for item in user_items
+                    ]
+                    if not EmailService.notify_check_in_digest(user, results):
+                        # 入队失败（如邮件未配置），保留结果等待下次发送
+                        continue
+                    sent_count += 1
+
+                # 用户已删除或未设置邮箱时直接丢弃
+                for item in user_items:
+                    db.delete(item)
+                db.commit()
+
+            return sent_count
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,243 @@
+"""
+邮件模板引擎
+
+职能：渲染 backend/templates/email 下的邮件模板
+- 模板在首次使用（或启动时）一次性加载并编译，之后只做变量替换
+- 所有邮件共享 base.html 布局和 base.css 样式，样式在加载时预先嵌入布局
+- 变量默认进行 HTML 转义，已渲染的片段用 SafeHTML 包装后原样插入
+- 纯文本版本在加载时由 HTML 模板派生并一同编译，渲染时无需再解析 HTML
+"""
+
+import html
+import re
+import threading
+import logging
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+# 模板变量语法：$name
+_VARIABLE_PATTERN = re.compile(r"\$([_a-zA-Z][_a-zA-Z0-9]*)")
+
+# 编译后的模板: (HTML 格式串, 纯文本格式串)
+CompiledTemplate = Tuple[str, str]
+
+
+class SafeHTML(str):
+    """已渲染的 HTML 片段，插入模板时不再转义（text 为对应的纯文本）"""
+
+    def __new__(cls, value: str = "", text: Optional[str] = None):
+        obj = super().__new__(cls, value)
+        obj.text = value if text is None else text
+        return obj
+
+
+class _TextExtractor(HTMLParser):
+    """将邮件 HTML 转换为纯文本"""
+
+    BLOCK_TAGS = {"p", "div", "br", "tr", "h1", "h2", "h3", "ul", "ol", "table"}
+    SKIP_TAGS = {"style", "head", "title", "script"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._parts: List[str] = []
+        self._skip_depth = 0
+        self._href: Optional[str] = None
+        self._list_stack: List[list] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._parts.append("\n")
+            if tag == "ul":
+                self._list_stack.append(["ul", 0])
+            elif tag == "ol":
+                self._list_stack.append(["ol", 0])
+        elif tag == "li":
+            if self._list_stack and self._list_stack[-1][0] == "ol":
+                self._list_stack[-1][1] += 1
+                self._parts.append(f"\n{self._list_stack[-1][1]}. ")
+            else:
+                self._parts.append("\n- ")
+        elif tag in ("td", "th"):
+            self._parts.append("  ")
+        elif tag == "a":
+            self._href = dict(attrs).get("href")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in ("ul", "ol"):
+            if self._list_stack:
+                self._list_stack.pop()
+            self._parts.append("\n")
+        elif tag in self.BLOCK_TAGS:
+            self._parts.append("\n")
+        elif tag == "a" and self._href:
+            self._parts.append(f" ({self._href})")
+            self._href = None
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        # 折叠 HTML 源码中的缩进和换行
+        text = re.sub(r"\s+", " ", data)
+        if text.strip():
+            self._parts.append(text)
+
+    def get_text(self) -> str:
+        lines = [line.strip() for line in "".join(self._parts).splitlines()]
+        text = "\n".join(lines)
+        return re.sub(r"\n{3,}", "\n\n", text).strip() + "\n"
+
+
+class EmailTemplateEngine:
+    """邮件模板引擎（预编译 + 缓存）"""
+
+    def __init__(self, template_dir: Path = TEMPLATE_DIR):
+        self._template_dir = template_dir
+
+        # {模板名: (HTML 格式串, 纯文本格式串)}
+        self._templates: Dict[str, CompiledTemplate] = {}
+        self._layout: Optional[CompiledTemplate] = None
+
+        # 不含变量的片段渲染结果缓存
+        self._static_fragments: Dict[str, SafeHTML] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _to_format(source: str) -> str:
+        """将 $name 语法转换为 str.format_map 格式串（渲染时由 C 实现完成替换）"""
+        escaped = source.replace("{", "{{").replace("}", "}}")
+        return _VARIABLE_PATTERN.sub(r"{\1}", escaped)
+
+    @classmethod
+    def _compile(cls, source: str) -> CompiledTemplate:
+        """编译 HTML 模板，并由其源码派生纯文本模板（$变量在转换中原样保留）"""
+        return cls._to_format(source), cls._to_format(cls.html_to_text(source).strip())
+
+    def load(self) -> None:
+        """加载并编译全部模板（重复调用无副作用）"""
+        if self._layout is not None:
+            return
+
+        with self._lock:
+            if self._layout is not None:
+                return
+
+            sources = {
+                path.stem: path.read_text(encoding="utf-8")
+                for path in self._template_dir.glob("*.html")
+            }
+            styles = (self._template_dir / "base.css").read_text(encoding="utf-8")
+
+            # 样式是静态的，加载时一次性嵌入布局
+            base = sources.pop("base").replace("$styles", styles)
+
+            self._templates = {name: self._compile(source) for name, source in sources.items()}
+            self._layout = self._compile(base)
+            logger.info(f"邮件模板已加载: {len(self._templates)} 个")
+
+    def _get(self, template: str) -> CompiledTemplate:
+        self.load()
+        compiled = self._templates.get(template)
+        if compiled is None:
+            raise KeyError(f"邮件模板不存在: {template}")
+        return compiled
+
+    @staticmethod
+    def _substitute(compiled: CompiledTemplate, context: Dict[str, object]) -> SafeHTML:
+        """替换变量，HTML 版本转义普通值，纯文本版本使用原始值"""
+        html_context = {}
+        text_context = {}
+        for key, value in context.items():
+            if isinstance(value, SafeHTML):
+                html_context[key] = value
+                text_context[key] = value.text
+            else:
+                value = str(value)
+                html_context[key] = html.escape(value, quote=True)
+                text_context[key] = value
+
+        html_format, text_format = compiled
+        return SafeHTML(
+            html_format.format_map(html_context).strip(),
+            text_format.format_map(text_context),
+        )
+
+    def render_fragment(self, template: str, **context) -> SafeHTML:
+        """
+        渲染片段模板（用于拼接到其他模板中）
+
+        Args:
+            template: 模板名（不含扩展名）
+            **context: 模板变量
+
+        Returns:
+            渲染后的 HTML 片段（附带纯文本版本）
+        """
+        if not context:
+            cached = self._static_fragments.get(template)
+            if cached is None:
+                cached = self._substitute(self._get(template), {})
+                self._static_fragments[template] = cached
+            return cached
+
+        return self._substitute(self._get(template), context)
+
+    @staticmethod
+    def join(fragments: List[SafeHTML], separator: str = "\n") -> SafeHTML:
+        """拼接多个片段"""
+        return SafeHTML(
+            separator.join(fragments),
+            separator.join(fragment.text for fragment in fragments),
+        )
+
+    def render(self, template: str, title: str, header_color: str, **context) -> Tuple[str, str]:
+        """
+        渲染完整邮件
+
+        Args:
+            template: 正文模板名（不含扩展名）
+            title: 邮件标题栏文字
+            header_color: 标题栏背景色
+            **context: 正文模板变量
+
+        Returns:
+            (HTML 内容, 纯文本内容)
+        """
+        content = self.render_fragment(template, **context)
+        self.load()
+        rendered = self._substitute(self._layout, {
+            "title": title,
+            "header_color": header_color,
+            "content": content,
+            "year": datetime.now().year,
+        })
+        return str(rendered), rendered.text + "\n"
+
+    @staticmethod
+    def html_to_text(body_html: str) -> str:
+        """
+        根据 HTML 生成纯文本版本
+
+        Args:
+            body_html: HTML 内容
+
+        Returns:
+            纯文本内容
+        """
+        parser = _TextExtractor()
+        parser.feed(body_html)
+        parser.close()
+        return parser.get_text()
+
+
+# 全局单例
+email_templates = EmailTemplateEngine()
@@ -0,0 +1,200 @@
+"""
+模板 payload 组装计划
+
+将合并后的模板字段配置编译为扁平的组装步骤列表：
+- 字段类型识别（普通字段 / 数组 / 对象字段 / 原值）只在编译时进行一次
+- 隐藏字段、数组元素等不受用户输入影响的值在编译时完成校验和类型转换
+- 组装 payload 时只需线性执行一遍步骤
+编译结果随模板解析结果一起缓存（见 template_cache）
+"""
+import copy
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+# 步骤类型
+STEP_DICT = 0  # 创建空对象容器
+STEP_LIST = 1  # 创建空数组容器
+STEP_INPUT = 2  # 用户可填写的字段：有输入则转换输入值，否则使用预先转换好的默认值
+STEP_FIXED = 3  # 编译时已确定的值（不可变）
+STEP_CONST = 4  # 原样输出的配置值（可变对象，组装时复制）
+
+# 默认值无法预先转换时的占位（组装时再转换，保持原有的报错时机）
+_UNCONVERTED = object()
+
+# 组装步骤: (父容器序号, 键名（None 表示追加到数组）, 步骤类型, 参数1, 参数2)
+Step = Tuple[int, Optional[str], int, Any, Any]
+
+
+class PayloadPlan:
+    """编译后的 payload 组装计划"""
+
+    __slots__ = ("steps", "_convert")
+
+    def __init__(self, steps: List[Step], convert: Callable[[Any, str, str], Any]):
+        self.steps = steps
+
+        # 值类型转换函数（TemplateService._validate_and_convert_value）
+        self._convert = convert
+
+    def build(self, thread_id: str, field_values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        按计划组装 payload
+
+        Args:
+            thread_id: 接龙项目 ID
+            field_values: 用户填写的字段值
+
+        Returns:
+            完整的 payload
+        """
+        convert = self._convert
+        payload: Dict[str, Any] = {"ThreadId": thread_id}
+        containers: List[Any] = [payload]
+
+        for parent, key, kind, arg1, arg2 in self.steps:
+            if kind == STEP_INPUT:
+                # arg1: (字段名, 值类型)，arg2: 预先转换好的默认值
+                field_name, value_type = arg1
+                if field_name in field_values:
+                    value = convert(field_values[field_name], value_type, field_name)
+                elif arg2[1] is _UNCONVERTED:
+                    value = convert(arg2[0], value_type, field_name)
+                else:
+                    value = arg2[1]
+            elif kind == STEP_FIXED:
+                value = arg1
+            elif kind == STEP_DICT:
+                value = {}
+                containers.append(value)
+            elif kind == STEP_LIST:
+                value = []
+                containers.append(value)
+            else:
+                value = copy.deepcopy(arg1)
+
+            target = containers[parent]
+            if key is None:
+                target.append(value)
+            else:
+                target[key] = value
+
+        return payload
+
+
+class _PlanCompiler:
+    """把字段配置编译为组装步骤"""
+
+    def __init__(self):
+        self.steps: List[Step] = []
+        self._container_count = 1  # 0 号容器为 payload 本身
+
+    def _new_container(self, parent: int, key: Optional[str], kind: int) -> int:
+        self.steps.append((parent, key, kind, None, None))
+        index = self._container_count
+        self._container_count += 1
+        return index
+
+    def _emit_value(self, parent: int, key: Optional[str], value: Any) -> None:
+        if isinstance(value, (dict, list)):
+            self.steps.append((parent, key, STEP_CONST, value, None))
+        else:
+            self.steps.append((parent, key, STEP_FIXED, value, None))
+
+    def compile_field(self, parent: int, slot: Optional[str], key: str, config: Any) -> None:
+        """
+        编译单个字段（递归识别字段类型，生成对应的组装步骤）
+
+        Args:
+            parent: 父容器序号
+            slot: 写入父容器的键名（None 表示追加到数组）
+            key: 字段名（用于读取用户输入和报错）
+            config: 字段配置
+        """
+        from backend.services.template_service import TemplateService
+
+        # 1. 普通字段配置
+        if TemplateService._is_field_config(config):
+            value_type = config.get('value_type', 'string')
+            default_value = config.get('default_value', '')
+
+            if config.get('hidden', False):
+                converted = TemplateService._validate_and_convert_value(default_value, value_type, key)
+                self._emit_value(parent, slot, converted)
+                return
+
+            try:
+                converted = TemplateService._validate_and_convert_value(default_value, value_type, key)
+            except HTTPException:
+                converted = _UNCONVERTED
+            self.steps.append((parent, slot, STEP_INPUT, (key, value_type), (default_value, converted)))
+            return
+
+        # 2. 数组字段
+        if isinstance(config, list):
+            array_index = self._new_container(parent, slot, STEP_LIST)
+            for item_config in config:
+                if TemplateService._is_field_config(item_config):
+                    # 数组元素是字段配置对象：只使用默认值，编译时完成校验和序列化
+                    value = item_config.get('default_value', '')
+                    value_type = item_config.get('value_type', 'string')
+                    if value_type == 'json':
+                        if isinstance(value, str):
+                            try:
+                                json.loads(value)
+                            except json.JSONDecodeError as e:
+                                error_detail = f"数组元素的默认值不是有效的 JSON: {value}\n"
+                                error_detail += f"JSON 解析错误: {str(e)}\n"
+                                error_detail += "常见问题: 数字不能有前导零（如 00.00 应改为 0.0）"
+                                raise HTTPException(
+                                    status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail=error_detail
+                                )
+                            self._emit_value(array_index, None, value)
+                        else:
+                            self._emit_value(array_index, None, json.dumps(value, ensure_ascii=False))
+                    else:
+                        self._emit_value(
+                            array_index, None,
+                            TemplateService._validate_and_convert_value(value, value_type, key)
+                        )
+                elif isinstance(item_config, dict):
+                    # 数组元素是普通对象，逐个键编译
+                    item_index = self._new_container(array_index, None, STEP_DICT)
+                    for item_key, item_value in item_config.items():
+                        self.compile_field(item_index, item_key, item_key, item_value)
+                else:
+                    self._emit_value(array_index, None, item_config)
+            return
+
+        # 3. 对象字段（包含多个子字段）
+        if TemplateService._is_object_field(config):
+            object_index = self._new_container(parent, slot, STEP_DICT)
+            for sub_key, sub_config in config.items():
+                self.compile_field(object_index, sub_key, sub_key, sub_config)
+            return
+
+        # 4. 其他情况，原样输出
+        self._emit_value(parent, slot, config)
+
+
+def compile_payload_plan(field_config: Dict[str, Any]) -> PayloadPlan:
+    """
+    将合并后的字段配置编译为组装计划
+
+    Args:
+        field_config: 合并后的完整字段配置
+
+    Returns:
+        组装计划
+
+    Raises:
+        HTTPException: 隐藏字段或数组元素的默认值无效
+    """
+    from backend.services.template_service import TemplateService
+
+    compiler = _PlanCompiler()
+    for key, config in field_config.items():
+        compiler.compile_field(0, key, key, config)
+    return PayloadPlan(compiler.steps, TemplateService._validate_and_convert_value)
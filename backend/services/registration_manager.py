@@ -1,30 +1,228 @@
 """
 用户名预占和注册限流管理器
+
+记录存储由 REGISTRATION_STORE 选择：
+- memory: 进程内存储（单进程部署），按过期时间的最小堆在每次读写时淘汰过期记录（O(log n)），不需要后台清理线程
+- database: 写入数据库 registration_reservations 表（多进程部署），用户名预占依赖 (kind, key) 唯一约束原子完成
 """
 import time
 import threading
 import logging
-from typing import Optional, Dict
-from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Tuple
+
+from backend.config import settings
+from backend.utils.ttl_map import TTLMap
 
 logger = logging.getLogger(__name__)
 
+KIND_ALIAS = "alias"
+KIND_COOKIE = "cookie"
 
-class RegistrationManager:
-    """用户注册管理器 - 处理用户名预占和注册限流"""
+
+class MemoryRegistrationStore:
+    """进程内注册记录存储"""
 
     def __init__(self):
-        # 用户名预占记录: {alias: {session_id: str, expire_time: float}}
-        self._reserved_aliases: Dict[str, Dict] = {}
+        # 用户名预占记录: alias -> session_id
+        self._aliases: TTLMap[str] = TTLMap()
+
+        # Cookie 注册限流记录: cookie_value -> None（只关心过期时间）
+        self._cookies: TTLMap[None] = TTLMap()
+
+        self._lock = threading.Lock()
+
+    def reserve_alias(self, alias: str, session_id: str, expire_at: float, now: float) -> Tuple[bool, Optional[str]]:
+        """预占用户名，返回 (是否成功, 当前持有者 session_id)"""
+        with self._lock:
+            entry = self._aliases.get(alias, now)
+            if entry is not None and entry[0] != session_id:
+                return False, entry[0]
+            self._aliases.set(alias, session_id, expire_at)
+            return True, session_id
+
+    def release_alias(self, alias: str, session_id: Optional[str], now: float) -> Optional[bool]:
+        """释放用户名预占，返回 True 已释放 / False session 不匹配 / None 未预占"""
+        with self._lock:
+            entry = self._aliases.get(alias, now)
+            if entry is None:
+                return None
+            if session_id and entry[0] != session_id:
+                return False
+            self._aliases.pop(alias)
+            return True
+
+    def is_alias_reserved(self, alias: str, now: float) -> bool:
+        with self._lock:
+            return self._aliases.get(alias, now) is not None
+
+    def cookie_expire_at(self, cookie_value: str, now: float) -> Optional[float]:
+        """注册冷却的结束时间，不在冷却期时返回 None"""
+        with self._lock:
+            entry = self._cookies.get(cookie_value, now)
+            return entry[1] if entry else None
+
+    def record_cookie(self, cookie_value: str, expire_at: float, now: float) -> None:
+        with self._lock:
+            self._cookies.expire(now)
+            self._cookies.set(cookie_value, None, expire_at)
+
+    def stats(self, now: float) -> Tuple[List[str], int]:
+        """返回 (预占中的用户名列表, 冷却中的 Cookie 数)"""
+        with self._lock:
+            self._cookies.expire(now)
+            return self._aliases.keys(now), len(self._cookies)
+
+
+class DatabaseRegistrationStore:
+    """数据库注册记录存储（多进程共享）"""
+
+    def __init__(self, purge_interval: float = 60):
+        """
+        Args:
+            purge_interval: 清理过期记录的间隔（秒，写入时顺带执行）
+        """
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+
+    def _purge_expired(self, db, now: float) -> None:
+        from backend.models import RegistrationReservation
+
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        db.query(RegistrationReservation).filter(
+            RegistrationReservation.expires_at <= now
+        ).delete(synchronize_session=False)
+
+    def _upsert(self, db, kind: str, key: str, session_id: Optional[str], expire_at: float, now: float):
+        """
+        写入记录（单条 UPSERT）
+
+        用户名预占只覆盖已过期或属于同一会话的记录，Cookie 冷却直接覆盖
+
+        Returns:
+            是否写入
+        """
+        from backend.models import RegistrationReservation
+        from backend.models.database import engine
+
+        if engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        table = RegistrationReservation.__table__
+        stmt = insert(table).values(kind=kind, key=key, session_id=session_id, expires_at=expire_at)
+        where = None
+        if kind == KIND_ALIAS:
+            where = (table.c.expires_at <= now) | (table.c.session_id == stmt.excluded.session_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.kind, table.c.key],
+            set_={"session_id": stmt.excluded.session_id, "expires_at": stmt.excluded.expires_at},
+            where=where
+        ).returning(table.c.id)
+        return db.execute(stmt).first() is not None
+
+    def _holder(self, db, kind: str, key: str, now: float):
+        from backend.models import RegistrationReservation
+
+        return db.query(RegistrationReservation).filter(
+            RegistrationReservation.kind == kind,
+            RegistrationReservation.key == key,
+            RegistrationReservation.expires_at > now
+        ).first()
+
+    def reserve_alias(self, alias: str, session_id: str, expire_at: float, now: float) -> Tuple[bool, Optional[str]]:
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            reserved = self._upsert(db, KIND_ALIAS, alias, session_id, expire_at, now)
+            holder = None if reserved else self._holder(db, KIND_ALIAS, alias, now)
+            if reserved:
+                self._purge_expired(db, now)
+            db.commit()
+            return reserved, session_id if reserved else (holder.session_id if holder else None)
+        finally:
+            db.close()
+
+    def release_alias(self, alias: str, session_id: Optional[str], now: float) -> Optional[bool]:
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            holder = self._holder(db, KIND_ALIAS, alias, now)
+            if holder is None:
+                return None
+            if session_id and holder.session_id != session_id:
+                return False
+            db.delete(holder)
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def is_alias_reserved(self, alias: str, now: float) -> bool:
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return self._holder(db, KIND_ALIAS, alias, now) is not None
+        finally:
+            db.close()
+
+    def cookie_expire_at(self, cookie_value: str, now: float) -> Optional[float]:
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            record = self._holder(db, KIND_COOKIE, cookie_value, now)
+            return record.expires_at if record else None
+        finally:
+            db.close()
+
+    def record_cookie(self, cookie_value: str, expire_at: float, now: float) -> None:
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            self._upsert(db, KIND_COOKIE, cookie_value, None, expire_at, now)
+            self._purge_expired(db, now)
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self, now: float) -> Tuple[List[str], int]:
+        from backend.models import RegistrationReservation
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            active = db.query(RegistrationReservation.kind, RegistrationReservation.key).filter(
+                RegistrationReservation.expires_at > now
+            ).all()
+            aliases = [key for kind, key in active if kind == KIND_ALIAS]
+            return aliases, len(active) - len(aliases)
+        finally:
+            db.close()
+
+
+def _create_store():
+    """按 REGISTRATION_STORE 创建记录存储"""
+    if settings.REGISTRATION_STORE.lower() == "database":
+        return DatabaseRegistrationStore()
+    return MemoryRegistrationStore()
 
-        # Cookie 注册限流记录: {cookie_value: expire_time}
-        self._registration_cookies: Dict[str, float] = {}
 
-        # 线程锁
-        self._lock = threading.RLock()
+class RegistrationManager:
+    """用户注册管理器 - 处理用户名预占和注册限流"""
 
-        # 启动清理线程
-        self._start_cleanup_thread()
+    def __init__(self, store=None):
+        """
+        Args:
+            store: 记录存储（默认按 REGISTRATION_STORE 创建）
+        """
+        self._store = store or _create_store()
 
     def reserve_alias(self, alias: str, session_id: str, timeout_seconds: int = 120) -> bool:
         """
@@ -38,34 +236,15 @@ class RegistrationManager:
         Returns:
             是否预占成功
         """
-        with self._lock:
-            current_time = time.time()
-            expire_time = current_time + timeout_seconds
-
-            # 检查用户名是否已被预占
-            if alias in self._reserved_aliases:
-                reservation = self._reserved_aliases[alias]
-
-                # 检查是否过期
-                if reservation['expire_time'] > current_time:
-                    # 未过期，检查是否是同一个 session
-                    if reservation['session_id'] == session_id:
-                        # 同一个 session，更新过期时间
-                        reservation['expire_time'] = expire_time
-                        logger.info(f"用户名 {alias} 预占时间已更新（session: {session_id}）")
-                        return True
-                    else:
-                        # 不同 session，预占失败
-                        logger.warning(f"用户名 {alias} 已被占用（session: {reservation['session_id']}）")
-                        return False
-
-            # 预占用户名
-            self._reserved_aliases[alias] = {
-                'session_id': session_id,
-                'expire_time': expire_time
-            }
-            logger.info(f"用户名 {alias} 已预占（session: {session_id}, 超时: {timeout_seconds}s）")
-            return True
+        current_time = time.time()
+        reserved, holder = self._store.reserve_alias(alias, session_id, current_time + timeout_seconds, current_time)
+        if not reserved:
+            # 不同 session，预占失败
+            logger.warning(f"用户名 {alias} 已被占用（session: {holder}）")
+            return False
+
+        logger.info(f"用户名 {alias} 已预占（session: {session_id}, 超时: {timeout_seconds}s）")
+        return True
 
     def release_alias(self, alias: str, session_id: Optional[str] = None) -> bool:
         """
@@ -78,20 +257,15 @@ class RegistrationManager:
         Returns:
             是否释放成功
         """
-        with self._lock:
-            if alias not in self._reserved_aliases:
-                return False
+        released = self._store.release_alias(alias, session_id, time.time())
+        if released is None:
+            return False
+        if not released:
+            logger.warning(f"尝试释放用户名 {alias}，但 session 不匹配")
+            return False
 
-            reservation = self._reserved_aliases[alias]
-
-            # 如果指定了 session_id，则只释放匹配的
-            if session_id and reservation['session_id'] != session_id:
-                logger.warning(f"尝试释放用户名 {alias}，但 session 不匹配")
-                return False
-
-            del self._reserved_aliases[alias]
-            logger.info(f"用户名 {alias} 预占已释放")
-            return True
+        logger.info(f"用户名 {alias} 预占已释放")
+        return True
 
     def is_alias_reserved(self, alias: str) -> bool:
         """
@@ -103,20 +277,7 @@ class RegistrationManager:
         Returns:
             是否被预占
         """
-        with self._lock:
-            if alias not in self._reserved_aliases:
-                return False
-
-            reservation = self._reserved_aliases[alias]
-            current_time = time.time()
-
-            # 检查是否过期
-            if reservation['expire_time'] <= current_time:
-                # 已过期，自动释放
-                del self._reserved_aliases[alias]
-                return False
-
-            return True
+        return self._store.is_alias_reserved(alias, time.time())
 
     def check_registration_cookie(self, cookie_value: str) -> bool:
         """
@@ -128,23 +289,14 @@ class RegistrationManager:
         Returns:
             True 表示可以注册，False 表示在限流期内
         """
-        with self._lock:
-            current_time = time.time()
+        current_time = time.time()
+        expire_time = self._store.cookie_expire_at(cookie_value, current_time)
+        if expire_time is not None:
+            remaining = int(expire_time - current_time)
+            logger.warning(f"Cookie {cookie_value[:8]}... 在限流期内（剩余 {remaining} 秒）")
+            return False
 
-            # 检查 Cookie 是否存在
-            if cookie_value in self._registration_cookies:
-                expire_time = self._registration_cookies[cookie_value]
-
-                # 检查是否过期
-                if expire_time > current_time:
-                    remaining = int(expire_time - current_time)
-                    logger.warning(f"Cookie {cookie_value[:8]}... 在限流期内（剩余 {remaining} 秒）")
-                    return False
-                else:
-                    # 已过期，移除记录
-                    del self._registration_cookies[cookie_value]
-
-            return True
+        return True
 
     def record_registration(self, cookie_value: str, cooldown_seconds: int = 600) -> None:
         """
@@ -154,63 +306,18 @@ class RegistrationManager:
             cookie_value: Cookie 值
             cooldown_seconds: 冷却时间（秒），默认 600 秒（10 分钟）
         """
-        with self._lock:
-            current_time = time.time()
-            expire_time = current_time + cooldown_seconds
-
-            self._registration_cookies[cookie_value] = expire_time
-            logger.info(f"Cookie {cookie_value[:8]}... 已记录注册（冷却 {cooldown_seconds} 秒）")
-
-    def _cleanup_expired_records(self) -> None:
-        """清理过期的预占记录和限流记录"""
-        with self._lock:
-            current_time = time.time()
-
-            # 清理过期的用户名预占
-            expired_aliases = [
-                alias for alias, reservation in self._reserved_aliases.items()
-                if reservation['expire_time'] <= current_time
-            ]
-
-            for alias in expired_aliases:
-                del self._reserved_aliases[alias]
-                logger.debug(f"用户名 {alias} 预占已过期，自动释放")
-
-            # 清理过期的注册限流记录
-            expired_cookies = [
-                cookie for cookie, expire_time in self._registration_cookies.items()
-                if expire_time <= current_time
-            ]
-
-            for cookie in expired_cookies:
-                del self._registration_cookies[cookie]
-                logger.debug(f"Cookie {cookie[:8]}... 限流记录已过期，自动清理")
-
-            if expired_aliases or expired_cookies:
-                logger.info(f"清理完成：{len(expired_aliases)} 个用户名，{len(expired_cookies)} 个 Cookie")
-
-    def _start_cleanup_thread(self) -> None:
-        """启动定期清理线程"""
-        def cleanup_loop():
-            while True:
-                try:
-                    time.sleep(60)  # 每 60 秒清理一次
-                    self._cleanup_expired_records()
-                except Exception as e:
-                    logger.error(f"清理线程异常: {e}")
-
-        thread = threading.Thread(target=cleanup_loop, daemon=True)
-        thread.start()
-        logger.info("注册管理器清理线程已启动")
+        current_time = time.time()
+        self._store.record_cookie(cookie_value, current_time + cooldown_seconds, current_time)
+        logger.info(f"Cookie {cookie_value[:8]}... 已记录注册（冷却 {cooldown_seconds} 秒）")
 
     def get_stats(self) -> Dict:
         """获取当前状态统计"""
-        with self._lock:
-            return {
-                'reserved_aliases_count': len(self._reserved_aliases),
-                'rate_limited_cookies_count': len(self._registration_cookies),
-                'reserved_aliases': list(self._reserved_aliases.keys()),
-            }
+        aliases, cookie_count = self._store.stats(time.time())
+        return {
+            'reserved_aliases_count': len(aliases),
+            'rate_limited_cookies_count': cookie_count,
+            'reserved_aliases': aliases,
+        }
 
 
 # 全局单例
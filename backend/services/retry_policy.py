@@ -0,0 +1,182 @@
+"""
+打卡重试策略
+
+按打卡结果决定是否重试、何时重试：
+- 每种结果一条规则（最多执行次数、退避基数），由 CHECK_IN_RETRY_RULES 配置
+  暂时性失败（网络错误、上游 429/5xx、签名获取失败）统一按 transient 规则处理，其余按结果状态匹配
+- 指数退避加随机抖动，同一时刻失败的大量打卡不会在同一时刻重试
+- 重试时间限制在任务的 cron 窗口内：早于任务的下一次定时触发，且距首次入队不超过 CHECK_IN_RETRY_WINDOW_MINUTES
+重试的打卡作业放回作业队列（见 check_in_queue_worker），与首次执行共用同一组执行槽
+"""
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 暂时性失败的规则名
+TRANSIENT = "transient"
+
+
+class RetryRule:
+    """单条重试规则"""
+
+    __slots__ = ("name", "max_attempts", "base_seconds")
+
+    def __init__(self, name: str, max_attempts: int, base_seconds: float):
+        self.name = name
+        self.max_attempts = max_attempts  # 最多执行次数（含首次）
+        self.base_seconds = base_seconds  # 第一次重试前的等待时间，之后每次翻倍
+
+    def __repr__(self) -> str:
+        return f"RetryRule({self.name}:{self.max_attempts}:{self.base_seconds:g})"
+
+
+def parse_retry_rules(spec: str) -> Dict[str, RetryRule]:
+    """
+    解析重试规则配置
+
+    Args:
+        spec: 形如 "transient:3:30,out_of_time:3:120" 的配置（规则名:最多执行次数:退避基数秒）
+
+    Returns:
+        {规则名: RetryRule}
+
+    Raises:
+        ValueError: 配置格式错误
+    """
+    rules: Dict[str, RetryRule] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        parts = item.split(":")
+        if len(parts) != 3:
+            raise ValueError(f"重试规则格式错误: {item}（应为 规则名:最多执行次数:退避基数秒）")
+        name, max_attempts, base_seconds = parts[0].strip(), int(parts[1]), float(parts[2])
+        if max_attempts < 1 or base_seconds < 0:
+            raise ValueError(f"重试规则取值错误: {item}")
+        rules[name] = RetryRule(name, max_attempts, base_seconds)
+    return rules
+
+
+class RetryPolicy:
+    """打卡重试策略"""
+
+    def __init__(
+        self,
+        rules: Dict[str, RetryRule],
+        jitter: float = 0.2,
+        window_minutes: float = 60,
+        max_attempts: Optional[int] = None
+    ):
+        """
+        Args:
+            rules: {规则名: RetryRule}
+            jitter: 抖动比例（实际等待时间在 退避时间 × (1 ± jitter) 之间随机）
+            window_minutes: 距首次入队的最长重试窗口（分钟）
+            max_attempts: 全局最多执行次数（规则的执行次数不超过该值）
+        """
+        self.rules = rules
+        self.jitter = max(0.0, min(jitter, 1.0))
+        self.window = timedelta(minutes=window_minutes)
+        self.max_attempts = max_attempts
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        """按当前配置创建重试策略"""
+        return cls(
+            parse_retry_rules(settings.CHECK_IN_RETRY_RULES),
+            jitter=settings.CHECK_IN_RETRY_JITTER,
+            window_minutes=settings.CHECK_IN_RETRY_WINDOW_MINUTES,
+            max_attempts=settings.CHECK_IN_MAX_ATTEMPTS
+        )
+
+    def rule_for(self, result: Dict[str, Any]) -> Optional[RetryRule]:
+        """
+        查找打卡结果对应的重试规则
+
+        Args:
+            result: 打卡结果（perform_check_in 的返回值）
+
+        Returns:
+            匹配的规则，不重试时返回 None
+        """
+        if result.get("success"):
+            return None
+        if result.get("transient"):
+            return self.rules.get(TRANSIENT)
+        return self.rules.get(result.get("status", ""))
+
+    def window_end(self, first_queued_at: datetime, cron_expression: Optional[str] = None) -> datetime:
+        """
+        计算重试窗口的结束时间
+
+        Args:
+            first_queued_at: 首次入队时间（UTC）
+            cron_expression: 任务的 cron 表达式（有效时窗口不超过下一次定时触发）
+
+        Returns:
+            窗口结束时间（UTC）
+        """
+        end = first_queued_at + self.window
+        if cron_expression:
+            from croniter import croniter
+
+            if croniter.is_valid(cron_expression):
+                from backend.services.scheduler_service import build_cron_trigger
+
+                # 使用与调度器中任务相同的触发器，取严格晚于首次入队时间的下一次触发
+                next_fire = build_cron_trigger(cron_expression).get_next_fire_time(first_queued_at, first_queued_at)
+                if next_fire is not None:
+                    end = min(end, next_fire.astimezone(timezone.utc))
+        return end
+
+    def next_attempt_at(
+        self,
+        result: Dict[str, Any],
+        attempt: int,
+        first_queued_at: datetime,
+        cron_expression: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """
+        计算下一次执行时间
+
+        Args:
+            result: 本次打卡结果
+            attempt: 本次是第几次执行
+            first_queued_at: 首次入队时间（UTC）
+            cron_expression: 任务的 cron 表达式
+            now: 当前时间（UTC，默认取系统时间）
+
+        Returns:
+            下一次执行时间（UTC），不重试时返回 None
+        """
+        rule = self.rule_for(result)
+        if rule is None:
+            return None
+
+        max_attempts = rule.max_attempts
+        if self.max_attempts:
+            max_attempts = min(max_attempts, self.max_attempts)
+        if attempt >= max_attempts:
+            return None
+
+        now = now or datetime.now(timezone.utc)
+        if first_queued_at.tzinfo is None:
+            first_queued_at = first_queued_at.replace(tzinfo=timezone.utc)
+
+        delay = rule.base_seconds * (2 ** (attempt - 1))
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        retry_at = now + timedelta(seconds=delay)
+
+        window_end = self.window_end(first_queued_at, cron_expression)
+        if retry_at >= window_end:
+            logger.info(f"重试时间 {retry_at.isoformat()} 超出 cron 窗口（{window_end.isoformat()}），不再重试")
+            return None
+        return retry_at
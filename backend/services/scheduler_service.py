@@ -1,7 +1,11 @@
 import logging
 import os
+import threading
 import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Dict, List
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from filelock import FileLock
@@ -12,6 +16,9 @@ from backend.config import settings
 from backend.models import get_db, User, CheckInTask
 from backend.services.check_in_service import CheckInService
 from backend.services.admin_service import AdminService
+from backend.services.user_cache import user_cache
+from backend.utils.log_buffer import log_context
+from backend.utils.metrics import SCHEDULER_JOBS
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +26,26 @@ logger = logging.getLogger(__name__)
 scheduler = None
 scheduler_lock = None
 
+# 调度器启动状态（pending: 未启动 / loading: 正在加载任务 / running: 已启动 / standby: 其他进程持有调度器锁 / failed: 启动失败）
+scheduler_state = {"status": "pending", "tasks": None}
+scheduler_ready = threading.Event()
+
+# 已预热的 cron 时刻（避免每分钟重复预热同一时刻）
+_prewarmed_slots = set()
+
+# 调度器任务数（未持有调度器锁的进程为 0）
+SCHEDULER_JOBS.set_callback(lambda: len(scheduler.get_jobs()) if scheduler else 0)
+
+
+def build_cron_trigger(cron_str: str) -> CronTrigger:
+    """
+    创建任务的 cron 触发器（按 SCHEDULER_TIMEZONE 解释 cron 表达式）
+
+    from_crontab 不指定时区时使用主机本地时区，不受调度器 timezone 参数影响，
+    UTC 主机上任务的触发时间和重试窗口会与预期相差一个时区偏移
+    """
+    return CronTrigger.from_crontab(cron_str, timezone=settings.SCHEDULER_TIMEZONE)
+
 
 def load_scheduled_tasks(db: Session, scheduler_instance):
     """
@@ -72,7 +99,7 @@ def load_scheduled_tasks(db: Session, scheduler_instance):
             # 添加任务到调度器
             scheduler_instance.add_job(
                 func=scheduled_check_in_task,
-                trigger=CronTrigger.from_crontab(cron_str),
+                trigger=build_cron_trigger(cron_str),
                 id=job_id,
                 name=f"CheckIn-Task-{task.id}",
                 args=[task.id],
@@ -108,22 +135,23 @@ def scheduled_check_in_task(task_id: int):
 
     db = SessionLocal()
     try:
-        task = db.query(CheckInTask).filter(CheckInTask.id == task_id).first()
-        if not task:
-            logger.error(f"任务 {task_id} 不存在")
-            return
+        with log_context(task_id=task_id):
+            task = db.query(CheckInTask).filter(CheckInTask.id == task_id).first()
+            if not task:
+                logger.error(f"任务 {task_id} 不存在")
+                return
 
-        if not task.is_scheduled_enabled:
-            logger.info(f"任务 {task_id} 未启用定时打卡 (is_active={task.is_active}, cron={task.cron_expression})")
-            return
+            if not task.is_scheduled_enabled:
+                logger.info(f"任务 {task_id} 未启用定时打卡 (is_active={task.is_active}, cron={task.cron_expression})")
+                return
 
-        logger.info(f"🤖 执行定时打卡任务 {task_id}")
+            logger.info(f"🤖 执行定时打卡任务 {task_id}")
 
-        # 开始异步打卡
-        CheckInService.start_async_check_in(task, "scheduled", db)
+            # 开始异步打卡
+            CheckInService.start_async_check_in(task, "scheduled", db)
 
     except Exception as e:
-        logger.error(f"执行定时打卡任务 {task_id} 时出错: {str(e)}", exc_info=True)
+        logger.error(f"执行定时打卡任务 {task_id} 时出错: {str(e)}", exc_info=True, extra={"task_id": task_id})
     finally:
         db.close()
 
@@ -200,6 +228,7 @@ def check_token_expiration():
                         if success:
                             user.token_expiring_notified = True
                             db.commit()
+                            user_cache.invalidate_user(user.id)
                             notified_count += 1
                             logger.info(f"用户 {user.alias} 的打卡 Token 即将过期邮件已发送并标记")
                         else:
@@ -221,6 +250,7 @@ def check_token_expiration():
                         if success:
                             user.token_expired_notified = True
                             db.commit()
+                            user_cache.invalidate_user(user.id)
                             notified_count += 1
                             logger.info(f"用户 {user.alias} 的打卡 Token 已过期邮件已发送并标记")
                         else:
@@ -234,6 +264,7 @@ def check_token_expiration():
                         user.token_expiring_notified = False
                         user.token_expired_notified = False
                         db.commit()
+                        user_cache.invalidate_user(user.id)
                         logger.info(f"用户 {user.alias} 的打卡 Token 已刷新，重置所有提醒标志")
 
             logger.info(f"Scheduler: 打卡 Token 过期检查完成，共发送 {notified_count} 封提醒邮件")
@@ -292,6 +323,94 @@ def cleanup_old_sessions():
         logger.error(f"Scheduler: 清理会话文件任务发生错误: {e}", exc_info=True)
 
 
+def cleanup_sent_emails():
+    """定时清理超过保留期的已发送邮件"""
+    logger.info("Scheduler: 正在清理已发送邮件...")
+
+    try:
+        from backend.workers.email_outbox_worker import email_outbox_worker
+
+        count = email_outbox_worker.purge_sent()
+        logger.info(f"Scheduler: 已删除 {count} 封过期的已发送邮件")
+
+    except Exception as e:
+        logger.error(f"Scheduler: 清理已发送邮件任务发生错误: {e}", exc_info=True)
+
+
+def flush_check_in_digests():
+    """定时发送窗口已结束的打卡结果汇总邮件"""
+    try:
+        from backend.services.digest_service import DigestService
+
+        count = DigestService.flush_due()
+        if count:
+            logger.info(f"Scheduler: 已发送 {count} 封打卡汇总邮件")
+
+    except Exception as e:
+        logger.error(f"Scheduler: 发送打卡汇总邮件任务发生错误: {e}", exc_info=True)
+
+
+def find_dense_slots(scheduler_instance, until: datetime, min_tasks: int) -> Dict[datetime, List[int]]:
+    """
+    按下一次触发时间对定时打卡任务分组，找出密集的 cron 时刻
+
+    Args:
+        scheduler_instance: 调度器实例
+        until: 只统计在该时间之前触发的任务
+        min_tasks: 同一时刻至少有多少个任务才算密集
+
+    Returns:
+        {触发时间: [任务 ID]}
+    """
+    slots: Dict[datetime, List[int]] = defaultdict(list)
+    for job in scheduler_instance.get_jobs():
+        if not job.id.startswith("task_") or job.next_run_time is None:
+            continue
+        if job.next_run_time <= until:
+            slots[job.next_run_time].append(job.args[0])
+    return {slot: task_ids for slot, task_ids in slots.items() if len(task_ids) >= min_tasks}
+
+
+def prewarm_dense_slots():
+    """在密集的 cron 时刻前 SIGNATURE_PREWARM_MINUTES 分钟校验 Token、预热签名"""
+    if scheduler is None:
+        return
+
+    try:
+        from sqlalchemy.orm import joinedload
+        from backend.models.database import SessionLocal
+        from backend.services.signature_cache import SignatureCache
+
+        horizon = datetime.now(timezone.utc) + timedelta(minutes=settings.SIGNATURE_PREWARM_MINUTES)
+        slots = find_dense_slots(scheduler, horizon, settings.SIGNATURE_PREWARM_MIN_TASKS)
+
+        # 已触发的时刻不再出现在 slots 中，同时从已预热集合中移除
+        _prewarmed_slots.intersection_update(slots.keys())
+
+        for slot, task_ids in sorted(slots.items()):
+            if slot in _prewarmed_slots:
+                continue
+            _prewarmed_slots.add(slot)
+
+            db = SessionLocal()
+            try:
+                tasks = db.query(CheckInTask).options(joinedload(CheckInTask.user)).filter(
+                    CheckInTask.id.in_(task_ids)
+                ).all()
+                users = [task.user for task in tasks if task.is_scheduled_enabled and task.user]
+            finally:
+                db.close()
+
+            logger.info(f"Scheduler: {slot.isoformat()} 有 {len(task_ids)} 个定时任务，开始为 {len(users)} 个用户预热签名")
+            stats = SignatureCache.prewarm_users(users)
+            logger.info(f"Scheduler: {slot.isoformat()} 签名预热完成: {stats}")
+
+        SignatureCache.purge_expired()
+
+    except Exception as e:
+        logger.error(f"Scheduler: 签名预热任务发生错误: {e}", exc_info=True)
+
+
 def start_scheduler():
     """
     启动调度器
@@ -307,11 +426,20 @@ def start_scheduler():
     try:
         # 尝试获取锁
         scheduler_lock.acquire(blocking=False)
+    except Exception as e:
+        logger.warning(f"无法获取调度器锁: {e}")
+        logger.info("可能其他进程已经在运行调度器，跳过启动")
+        scheduler_lock = None
+        scheduler_state["status"] = "standby"
+        scheduler_ready.set()
+        return
 
+    try:
         logger.info("成功获取调度器锁，启动调度器...")
+        scheduler_state["status"] = "loading"
 
         # 创建后台调度器
-        scheduler = BackgroundScheduler(timezone="Asia/Shanghai")
+        scheduler = BackgroundScheduler(timezone=settings.SCHEDULER_TIMEZONE)
 
         # 添加 Token 过期检查任务（每隔指定分钟）
         scheduler.add_job(
@@ -350,21 +478,57 @@ def start_scheduler():
         )
         logger.info("已添加清理过期未审批用户任务: 每 1 小时")
 
-        # 新增：从数据库加载动态任务
+        # 添加已发送邮件清理任务（每天执行一次）
+        scheduler.add_job(
+            cleanup_sent_emails,
+            trigger="interval",
+            hours=24,
+            id="cleanup_sent_emails",
+            name="清理已发送邮件任务",
+            replace_existing=True
+        )
+        logger.info("已添加已发送邮件清理任务: 每 24 小时")
+
+        # 添加打卡汇总邮件发送任务（每分钟检查一次）
+        scheduler.add_job(
+            flush_check_in_digests,
+            trigger="interval",
+            minutes=1,
+            id="flush_check_in_digests",
+            name="打卡汇总邮件发送任务",
+            replace_existing=True
+        )
+        logger.info("已添加打卡汇总邮件发送任务: 每 1 分钟")
+
+        # 添加签名预热任务（每分钟检查即将到来的密集 cron 时刻）
+        if settings.SIGNATURE_PREWARM_MINUTES > 0:
+            scheduler.add_job(
+                prewarm_dense_slots,
+                trigger="interval",
+                minutes=1,
+                id="prewarm_dense_slots",
+                name="签名预热任务",
+                replace_existing=True
+            )
+            logger.info(f"已添加签名预热任务: 密集 cron 时刻前 {settings.SIGNATURE_PREWARM_MINUTES} 分钟")
+
+        # 先启动调度器再加载动态任务：加载期间创建或修改的任务由 TaskService 直接写入运行中的调度器
+        scheduler.start()
+        logger.info("调度器已启动")
+
+        # 从数据库加载动态任务
         db = next(get_db())
         try:
-            load_scheduled_tasks(db, scheduler)
+            scheduler_state["tasks"] = load_scheduled_tasks(db, scheduler)
         finally:
             db.close()
 
-        # 启动调度器
-        scheduler.start()
-        logger.info("调度器已启动")
+        scheduler_state["status"] = "running"
+        scheduler_ready.set()
 
     except Exception as e:
-        logger.warning(f"无法获取调度器锁或启动失败: {e}")
-        logger.info("可能其他进程已经在运行调度器，跳过启动")
-        scheduler_lock = None
+        logger.error(f"调度器启动失败: {e}", exc_info=True)
+        scheduler_state["status"] = "failed"
 
 
 def stop_scheduler():
@@ -373,7 +537,7 @@ def stop_scheduler():
     """
     global scheduler, scheduler_lock
 
-    if scheduler:
+    if scheduler and scheduler.running:
         logger.info("正在停止调度器...")
         scheduler.shutdown()
         logger.info("调度器已停止")
@@ -0,0 +1,176 @@
+"""
+签名预热服务
+
+职能：在定时打卡高峰前提前获取签名，高峰时刻的打卡只需发送 EditRecord 请求
+- 签名按打卡 Token 的哈希写入 prewarmed_signatures 表（worker 进程和 API 进程共用）
+- 打卡时优先使用未过期的预热签名，打卡未成功时作废，重试会重新获取
+- 由调度器在密集的 cron 时刻前调用 prewarm_users（见 scheduler_service.prewarm_dense_slots）
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from backend.config import settings
+from backend.models import User, PrewarmedSignature
+
+logger = logging.getLogger(__name__)
+
+
+def _token_hash(auth_token: str) -> str:
+    return hashlib.sha256(auth_token.encode("utf-8")).hexdigest()
+
+
+class SignatureCache:
+    """预热签名缓存"""
+
+    @staticmethod
+    def get(auth_token: str) -> Optional[str]:
+        """
+        读取未过期的预热签名
+
+        Args:
+            auth_token: 用户的打卡 Token
+
+        Returns:
+            签名，没有可用的预热签名时返回 None
+        """
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return db.query(PrewarmedSignature.signature).filter(
+                PrewarmedSignature.token_hash == _token_hash(auth_token),
+                PrewarmedSignature.expires_at > datetime.now(timezone.utc)
+            ).scalar()
+        finally:
+            db.close()
+
+    @staticmethod
+    def store(auth_token: str, signature: str, ttl_seconds: Optional[int] = None) -> None:
+        """
+        写入（或覆盖）预热签名
+
+        Args:
+            auth_token: 用户的打卡 Token
+            signature: x-api-request-payload 签名
+            ttl_seconds: 有效期（秒，默认 SIGNATURE_CACHE_TTL_SECONDS）
+        """
+        from backend.models.database import SessionLocal
+
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=ttl_seconds or settings.SIGNATURE_CACHE_TTL_SECONDS)
+        token_hash = _token_hash(auth_token)
+
+        db = SessionLocal()
+        try:
+            updated = db.query(PrewarmedSignature).filter(
+                PrewarmedSignature.token_hash == token_hash
+            ).update({
+                "signature": signature,
+                "captured_at": now,
+                "expires_at": expires_at
+            }, synchronize_session=False)
+            if not updated:
+                db.add(PrewarmedSignature(
+                    token_hash=token_hash,
+                    signature=signature,
+                    captured_at=now,
+                    expires_at=expires_at
+                ))
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def invalidate(auth_token: str) -> None:
+        """
+        作废预热签名（使用预热签名的打卡未成功时调用）
+
+        Args:
+            auth_token: 用户的打卡 Token
+        """
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.query(PrewarmedSignature).filter(
+                PrewarmedSignature.token_hash == _token_hash(auth_token)
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def purge_expired() -> int:
+        """
+        删除已过期的预热签名
+
+        Returns:
+            删除的数量
+        """
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            count = db.query(PrewarmedSignature).filter(
+                PrewarmedSignature.expires_at <= datetime.now(timezone.utc)
+            ).delete(synchronize_session=False)
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    @staticmethod
+    def prewarm_users(users: List[User], concurrency: Optional[int] = None) -> Dict[str, int]:
+        """
+        为即将打卡的用户校验 Token 并获取签名
+
+        Args:
+            users: 用户列表（同一用户只获取一次）
+            concurrency: 同时获取签名的数量（每个占用一个浏览器，默认 SIGNATURE_PREWARM_CONCURRENCY）
+
+        Returns:
+            统计 {warmed, cached, invalid_token, failed}
+        """
+        from backend.services.auth_service import AuthService
+        from backend.workers.signature_provider import get_signature_provider
+
+        stats = {"warmed": 0, "cached": 0, "invalid_token": 0, "failed": 0}
+        tokens: List[str] = []
+        seen = set()
+        for user in users:
+            token = user.authorization
+            if not token or token in seen:
+                continue
+            seen.add(token)
+
+            # Token 已失效的用户不预热，打卡时按原流程处理 Token 过期
+            if not AuthService.verify_checkin_authorization(user).get("is_valid"):
+                stats["invalid_token"] += 1
+                continue
+            if SignatureCache.get(token):
+                stats["cached"] += 1
+                continue
+            tokens.append(token)
+
+        def warm(token: str) -> bool:
+            try:
+                signature = get_signature_provider().get_signature(token)
+                if not signature:
+                    return False
+                SignatureCache.store(token, signature)
+                return True
+            except Exception as e:
+                logger.error(f"预热签名失败: {e}")
+                return False
+
+        if tokens:
+            workers = max(1, concurrency or settings.SIGNATURE_PREWARM_CONCURRENCY)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="signature-prewarm") as executor:
+                for ok in executor.map(warm, tokens):
+                    stats["warmed" if ok else "failed"] += 1
+
+        return stats
@@ -1,7 +1,7 @@
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, update, delete, func
 
 from backend.models import User, CheckInTask, CheckInRecord
 from backend.schemas.task import TaskCreate, TaskUpdate
@@ -263,6 +263,116 @@ class TaskService:
 
         return task
 
+    @staticmethod
+    def _bulk_update_tasks(task_ids: List[int], values: Dict[str, Any], db: Session) -> List[CheckInTask]:
+        """
+        以单条 UPDATE ... WHERE id IN (...) RETURNING 批量更新任务，并一次性同步调度器
+
+        Args:
+            task_ids: 任务 ID 列表
+            values: 要更新的字段
+            db: 数据库会话
+
+        Returns:
+            实际更新的任务列表
+        """
+        if not task_ids:
+            return []
+
+        stmt = (
+            update(CheckInTask)
+            .where(CheckInTask.id.in_(set(task_ids)))
+            .values(**values, updated_at=func.now())
+            .returning(CheckInTask.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            updated_ids = list(db.scalars(stmt).all())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        # 提交后一次性加载更新后的任务（避免逐个刷新过期对象）
+        tasks = db.query(CheckInTask).filter(CheckInTask.id.in_(updated_ids)).all() if updated_ids else []
+
+        TaskService._sync_scheduler_for_tasks(tasks)
+        return tasks
+
+    @staticmethod
+    def bulk_toggle_tasks(task_ids: List[int], is_active: bool, db: Session) -> List[CheckInTask]:
+        """
+        批量启用或禁用任务
+
+        Args:
+            task_ids: 任务 ID 列表
+            is_active: 目标启用状态
+            db: 数据库会话
+
+        Returns:
+            实际更新的任务列表
+        """
+        tasks = TaskService._bulk_update_tasks(task_ids, {'is_active': is_active}, db)
+        logger.info(f"已批量{'启用' if is_active else '禁用'} {len(tasks)} 个任务")
+        return tasks
+
+    @staticmethod
+    def bulk_update_cron(task_ids: List[int], cron_expression: Optional[str], db: Session) -> List[CheckInTask]:
+        """
+        批量修改任务的 Cron 表达式
+
+        Args:
+            task_ids: 任务 ID 列表
+            cron_expression: 新的 Cron 表达式（None 表示禁用定时打卡）
+            db: 数据库会话
+
+        Returns:
+            实际更新的任务列表
+        """
+        tasks = TaskService._bulk_update_tasks(task_ids, {'cron_expression': cron_expression}, db)
+        logger.info(f"已批量修改 {len(tasks)} 个任务的 cron 表达式: {cron_expression}")
+        return tasks
+
+    @staticmethod
+    def bulk_delete_tasks(task_ids: List[int], db: Session) -> List[int]:
+        """
+        批量删除任务及其打卡记录，并一次性从调度器移除
+
+        Args:
+            task_ids: 任务 ID 列表
+            db: 数据库会话
+
+        Returns:
+            实际删除的任务 ID 列表
+        """
+        if not task_ids:
+            return []
+
+        ids = set(task_ids)
+        try:
+            # SQLite 未启用外键级联，手动删除打卡记录
+            db.execute(
+                delete(CheckInRecord)
+                .where(CheckInRecord.task_id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            deleted_ids = list(db.scalars(
+                delete(CheckInTask)
+                .where(CheckInTask.id.in_(ids))
+                .returning(CheckInTask.id)
+                .execution_options(synchronize_session=False)
+            ).all())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"已批量删除 {len(deleted_ids)} 个任务")
+
+        TaskService._sync_scheduler_for_tasks([], removed_task_ids=deleted_ids)
+        return deleted_ids
+
     @staticmethod
     def get_task_records(task_id: int, db: Session, limit: int = 50) -> List[CheckInRecord]:
         """
@@ -314,8 +424,7 @@ class TaskService:
             db: 数据库会话
         """
         try:
-            from backend.services.scheduler_service import scheduler
-            from apscheduler.triggers.cron import CronTrigger
+            from backend.services.scheduler_service import scheduler, build_cron_trigger
             from croniter import croniter
 
             if not scheduler:
@@ -338,7 +447,7 @@ class TaskService:
 
                     scheduler.add_job(
                         func=scheduled_check_in_task,
-                        trigger=CronTrigger.from_crontab(cron_str),
+                        trigger=build_cron_trigger(cron_str),
                         id=job_id,
                         name=f"CheckIn-Task-{task.id}",
                         args=[task.id],
@@ -353,6 +462,89 @@ class TaskService:
         except Exception as e:
             logger.error(f"重新加载任务 {task.id} 到调度器失败: {str(e)}")
 
+    @staticmethod
+    def _sync_scheduler_for_tasks(
+        tasks: List[CheckInTask],
+        removed_task_ids: Iterable[int] = ()
+    ) -> Dict[str, int]:
+        """
+        批量同步多个任务到调度器（一次协调，替代逐个 _reload_scheduler_for_task）
+
+        - 同一 cron 表达式只解析一次，触发器在任务间共享
+        - 调度器在同步期间暂停，结束后只唤醒一次
+
+        Args:
+            tasks: 需要按当前状态同步的任务列表
+            removed_task_ids: 已删除、需要从调度器移除的任务 ID
+
+        Returns:
+            同步统计 {'scheduled': 已调度数, 'removed': 移除数, 'invalid': cron 无效数}
+        """
+        result = {'scheduled': 0, 'removed': 0, 'invalid': 0}
+        removed_task_ids = list(removed_task_ids)
+        if not tasks and not removed_task_ids:
+            return result
+
+        try:
+            from backend.services.scheduler_service import scheduler, scheduled_check_in_task, build_cron_trigger
+            from croniter import croniter
+
+            if not scheduler:
+                logger.warning(f"调度器未启动，无法同步 {len(tasks) + len(removed_task_ids)} 个任务")
+                return result
+
+            existing_ids = {job.id for job in scheduler.get_jobs()}
+            triggers: Dict[str, Any] = {}
+
+            scheduler.pause()
+            try:
+                for task_id in removed_task_ids:
+                    job_id = f"task_{task_id}"
+                    if job_id in existing_ids:
+                        scheduler.remove_job(job_id)
+                        result['removed'] += 1
+
+                for task in tasks:
+                    job_id = f"task_{task.id}"
+
+                    if not task.is_scheduled_enabled:
+                        if job_id in existing_ids:
+                            scheduler.remove_job(job_id)
+                            result['removed'] += 1
+                        continue
+
+                    cron_str = str(task.cron_expression)
+                    trigger = triggers.get(cron_str)
+                    if trigger is None:
+                        if not croniter.is_valid(cron_str):
+                            logger.warning(f"任务 {task.id} 的 cron 表达式无效: {cron_str}")
+                            if job_id in existing_ids:
+                                scheduler.remove_job(job_id)
+                                result['removed'] += 1
+                            result['invalid'] += 1
+                            continue
+                        trigger = build_cron_trigger(cron_str)
+                        triggers[cron_str] = trigger
+
+                    scheduler.add_job(
+                        func=scheduled_check_in_task,
+                        trigger=trigger,
+                        id=job_id,
+                        name=f"CheckIn-Task-{task.id}",
+                        args=[task.id],
+                        replace_existing=True
+                    )
+                    result['scheduled'] += 1
+            finally:
+                scheduler.resume()
+
+            logger.info(f"✅ 已批量同步 {len(tasks) + len(removed_task_ids)} 个任务到调度器: {result}")
+
+        except Exception as e:
+            logger.error(f"批量同步任务到调度器失败: {str(e)}")
+
+        return result
+
     @staticmethod
     def _remove_task_from_scheduler(task_id: int):
         """
@@ -0,0 +1,125 @@
+"""
+模板解析结果缓存
+
+为 TemplateService.merge_parent_config 提供进程内缓存，避免每次预览、创建任务、组装 payload
+都逐级查询父模板并重新解析、深度合并 field_config：
+- 缓存键为 (模板 ID, 继承链上每个模板的 (id, updated_at))，任一祖先被修改后键自然失效
+- update_template / delete_template 显式失效该模板及所有以它为祖先的缓存项
+- 缓存项同时保存编译后的 payload 组装计划，与配置一同失效
+- 返回的配置对象在多个请求间共享，调用方不得修改
+"""
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 继承链键: ((模板 ID, updated_at), ...)，从当前模板到根模板
+ChainKey = Tuple[Tuple[int, Any], ...]
+
+
+class ResolvedTemplate:
+    """单个模板的解析结果"""
+
+    __slots__ = ("chain_key", "chain_ids", "config", "plan")
+
+    def __init__(self, chain_key: ChainKey, config: Dict[str, Any]):
+        self.chain_key = chain_key
+        self.chain_ids = frozenset(template_id for template_id, _ in chain_key)
+        self.config = config
+
+        # 编译后的 payload 组装计划（首次组装时生成，见 payload_plan）
+        self.plan = None
+
+
+class TemplateCache:
+    """模板解析结果缓存（LRU）"""
+
+    def __init__(self, max_templates: int = 256):
+        self._max_templates = max_templates
+
+        # {模板 ID: 解析结果}
+        self._entries: "OrderedDict[int, ResolvedTemplate]" = OrderedDict()
+
+        # 线程锁（同步端点运行在线程池中）
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, template_id: int, chain_key: ChainKey) -> Optional[ResolvedTemplate]:
+        """
+        获取缓存的解析结果（继承链版本不一致时视为未命中）
+
+        Args:
+            template_id: 模板 ID
+            chain_key: 当前数据库中的继承链键
+
+        Returns:
+            解析结果或 None
+        """
+        with self._lock:
+            entry = self._entries.get(template_id)
+            if entry is None or entry.chain_key != chain_key:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(template_id)
+            self._hits += 1
+            return entry
+
+    def put(self, template_id: int, chain_key: ChainKey, config: Dict[str, Any]) -> ResolvedTemplate:
+        """
+        缓存解析结果
+
+        Args:
+            template_id: 模板 ID
+            chain_key: 继承链键
+            config: 合并后的完整字段配置
+
+        Returns:
+            新的缓存项
+        """
+        entry = ResolvedTemplate(chain_key, config)
+
+        with self._lock:
+            self._entries[template_id] = entry
+            self._entries.move_to_end(template_id)
+            while len(self._entries) > self._max_templates:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def invalidate(self, template_id: int) -> None:
+        """
+        使模板及其所有子孙模板的缓存失效（模板被修改或删除时调用）
+
+        Args:
+            template_id: 模板 ID
+        """
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if template_id in entry.chain_ids]
+            for key in stale:
+                del self._entries[key]
+
+        if stale:
+            logger.debug(f"模板 {template_id} 相关的 {len(stale)} 个解析缓存已失效")
+
+    def clear(self) -> None:
+        """清空所有缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """获取当前状态统计"""
+        with self._lock:
+            return {
+                'cached_templates_count': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+            }
+
+
+# 全局单例
+template_cache = TemplateCache()
@@ -1,14 +1,56 @@
 import logging
 import json
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select, literal, bindparam
+from sqlalchemy.orm import Session, aliased
 from fastapi import HTTPException, status
 
 from backend.models import TaskTemplate, CheckInTask
 from backend.schemas.template import TemplateCreate, TemplateUpdate
+from backend.services.template_cache import template_cache, ResolvedTemplate
+from backend.services.payload_plan import PayloadPlan, compile_payload_plan
 
 logger = logging.getLogger(__name__)
 
+# 模板继承链最大深度
+MAX_INHERITANCE_DEPTH = 32
+
+# 继承链查询语句（构造开销较大，只构造一次）
+_ANCESTOR_CHAIN_QUERY = None
+
+
+def _ancestor_chain_query():
+    """构造加载模板及其全部祖先的递归 CTE 查询（模板 ID 通过 template_id 参数传入）"""
+    global _ANCESTOR_CHAIN_QUERY
+    if _ANCESTOR_CHAIN_QUERY is not None:
+        return _ANCESTOR_CHAIN_QUERY
+
+    ancestors = select(
+        TaskTemplate.id,
+        TaskTemplate.parent_id,
+        TaskTemplate.updated_at,
+        TaskTemplate.field_config,
+        literal(0).label("depth"),
+    ).where(TaskTemplate.id == bindparam("template_id")).cte("ancestors", recursive=True)
+
+    parent = aliased(TaskTemplate)
+    ancestors = ancestors.union_all(
+        select(
+            parent.id,
+            parent.parent_id,
+            parent.updated_at,
+            parent.field_config,
+            ancestors.c.depth + 1,
+        ).where(
+            parent.id == ancestors.c.parent_id,
+            ancestors.c.depth < MAX_INHERITANCE_DEPTH
+        )
+    )
+
+    _ANCESTOR_CHAIN_QUERY = select(ancestors).order_by(ancestors.c.depth)
+    return _ANCESTOR_CHAIN_QUERY
+
 
 class TemplateService:
     """模板服务"""
@@ -65,11 +107,70 @@ class TemplateService:
 
         return child
 
+    @staticmethod
+    def _load_ancestor_chain(template_id: int, db: Session) -> List[Any]:
+        """
+        用一条递归 CTE 查询加载模板及其全部祖先
+
+        Args:
+            template_id: 模板 ID
+            db: 数据库会话
+
+        Returns:
+            (id, parent_id, updated_at, field_config, depth) 行列表，从当前模板到根模板排序
+        """
+        return list(db.execute(_ancestor_chain_query(), {"template_id": template_id}).all())
+
+    @staticmethod
+    def _resolve_template(template: TaskTemplate, db: Session) -> ResolvedTemplate:
+        """
+        获取模板的解析结果（合并后的配置及组装计划），按继承链版本缓存
+
+        Args:
+            template: 当前模板对象
+            db: 数据库会话
+
+        Returns:
+            解析结果
+        """
+        chain = TemplateService._load_ancestor_chain(template.id, db)
+
+        # 模板尚未持久化，直接解析当前配置（不缓存）
+        if not chain:
+            return ResolvedTemplate((), json.loads(str(template.field_config)))
+
+        # parent_id 成环时截断到第一次重复之前
+        seen = set()
+        for index, row in enumerate(chain):
+            if row.id in seen:
+                logger.warning(f"模板 {template.id} 的继承链存在循环引用（模板 {row.id}）")
+                chain = chain[:index]
+                break
+            seen.add(row.id)
+
+        chain_key = tuple((row.id, row.updated_at) for row in chain)
+        cached = template_cache.get(template.id, chain_key)
+        if cached:
+            return cached
+
+        root = chain[-1]
+        if root.parent_id is not None and root.parent_id not in seen:
+            logger.warning(f"模板 {root.id} 的父模板 {root.parent_id} 不存在")
+
+        # 从根模板开始逐级深度合并：子模板的配置会覆盖父模板的同名字段
+        merged = json.loads(str(root.field_config))
+        for row in reversed(chain[:-1]):
+            merged = TemplateService._deep_merge(merged, json.loads(str(row.field_config)))
+
+        return template_cache.put(template.id, chain_key, merged)
+
     @staticmethod
     def merge_parent_config(template: TaskTemplate, db: Session) -> Dict[str, Any]:
         """
         合并父模板的字段配置到当前模板
 
+        结果按继承链版本缓存，返回的配置在多个请求间共享，调用方不得修改
+
         Args:
             template: 当前模板对象
             db: 数据库会话
@@ -77,26 +178,24 @@ class TemplateService:
         Returns:
             合并后的完整字段配置
         """
-        # 解析当前模板配置
-        current_config = json.loads(str(template.field_config))
+        return TemplateService._resolve_template(template, db).config
 
-        # 如果没有父模板，直接返回当前配置
-        if template.parent_id is None:
-            return current_config
-
-        # 获取父模板
-        parent = db.query(TaskTemplate).filter(TaskTemplate.id == template.parent_id).first()
-        if not parent:
-            logger.warning(f"模板 {template.id} 的父模板 {template.parent_id} 不存在")
-            return current_config
-
-        # 递归获取父模板的完整配置（支持多层继承）
-        parent_config = TemplateService.merge_parent_config(parent, db)
+    @staticmethod
+    def get_payload_plan(template: TaskTemplate, db: Session) -> PayloadPlan:
+        """
+        获取模板编译后的 payload 组装计划（随模板解析结果缓存）
 
-        # 深度合并配置：子模板的配置会覆盖父模板的同名字段
-        merged = TemplateService._deep_merge(parent_config, current_config)
+        Args:
+            template: 模板对象
+            db: 数据库会话
 
-        return merged
+        Returns:
+            组装计划
+        """
+        resolved = TemplateService._resolve_template(template, db)
+        if resolved.plan is None:
+            resolved.plan = compile_payload_plan(resolved.config)
+        return resolved.plan
 
     @staticmethod
     def create_template(template_data: TemplateCreate, db: Session) -> TaskTemplate:
@@ -218,8 +317,12 @@ class TemplateService:
             for field, value in update_data.items():
                 setattr(template, field, value)
 
+            # 显式写入带微秒的更新时间，作为解析缓存的版本号（其他进程据此发现变更）
+            template.updated_at = datetime.now(timezone.utc)
+
             db.commit()
             db.refresh(template)
+            template_cache.invalidate(template_id)
 
             logger.info(f"更新模板成功: {template.name} (ID: {template.id})")
             return template
@@ -260,6 +363,7 @@ class TemplateService:
         try:
             db.delete(template)
             db.commit()
+            template_cache.invalidate(template_id)
             logger.info(f"删除模板成功: {template.name} (ID: {template_id})")
             return True
         except Exception as e:
@@ -289,85 +393,6 @@ class TemplateService:
             if isinstance(v, dict)
         ) and len(obj) > 0
 
-    @staticmethod
-    def _process_field_value(key: str, config: Any, field_values: Dict[str, Any]) -> Any:
-        """
-        递归处理字段配置，生成 payload 值
-
-        Args:
-            key: 字段名
-            config: 字段配置
-            field_values: 用户输入值
-
-        Returns:
-            处理后的值
-        """
-        # 1. 普通字段配置
-        if TemplateService._is_field_config(config):
-            if config.get('hidden', False):
-                value = config.get('default_value', '')
-            else:
-                value = field_values.get(key, config.get('default_value', ''))
-
-            value_type = config.get('value_type', 'string')
-            return TemplateService._validate_and_convert_value(value, value_type, key)
-
-        # 2. 数组字段
-        if isinstance(config, list):
-            result = []
-            for item_config in config:
-                # 检查数组元素是否是字段配置对象
-                if TemplateService._is_field_config(item_config):
-                    # 数组元素是字段配置对象，需要序列化为 JSON 字符串
-                    value = item_config.get('default_value', '')
-                    value_type = item_config.get('value_type', 'string')
-                    # 将对象序列化为 JSON 字符串
-                    if value_type == 'json':
-                        if isinstance(value, str):
-                            # 如果是字符串，验证 JSON 格式
-                            try:
-                                json.loads(value)
-                            except json.JSONDecodeError as e:
-                                # 提供更详细的错误信息
-                                error_detail = f"数组元素的默认值不是有效的 JSON: {value}\n"
-                                error_detail += f"JSON 解析错误: {str(e)}\n"
-                                error_detail += "常见问题: 数字不能有前导零（如 00.00 应改为 0.0）"
-                                raise HTTPException(
-                                    status_code=status.HTTP_400_BAD_REQUEST,
-                                    detail=error_detail
-                                )
-                            result.append(value)
-                        else:
-                            # 如果是对象，序列化为 JSON 字符串
-                            result.append(json.dumps(value, ensure_ascii=False))
-                    else:
-                        result.append(TemplateService._validate_and_convert_value(value, value_type, key))
-                elif isinstance(item_config, dict):
-                    # 数组元素是普通对象，递归处理
-                    item = {}
-                    for item_key, item_value in item_config.items():
-                        # 保持键名原样
-                        item[item_key] = TemplateService._process_field_value(
-                            item_key, item_value, field_values
-                        )
-                    result.append(item)
-                else:
-                    result.append(item_config)
-            return result
-
-        # 3. 对象字段（包含多个子字段）
-        if TemplateService._is_object_field(config):
-            result = {}
-            for sub_key, sub_config in config.items():
-                # 保持键名原样
-                result[sub_key] = TemplateService._process_field_value(
-                    sub_key, sub_config, field_values
-                )
-            return result
-
-        # 4. 其他情况，返回原值
-        return config
-
     @staticmethod
     def generate_preview_payload(template: TaskTemplate, db: Session) -> Dict[str, Any]:
         """
@@ -384,19 +409,9 @@ class TemplateService:
             预览 payload
         """
         try:
-            # 合并父模板配置
-            field_config = TemplateService.merge_parent_config(template, db)
-
-            # 初始化 payload，只包含 ThreadId（唯一必需，不在模板中配置）
-            payload = {
-                "ThreadId": "<接龙项目ID>"
-            }
-
-            # 递归处理所有字段，保持键名原样
-            for key, config in field_config.items():
-                payload[key] = TemplateService._process_field_value(key, config, {})
-
-            return payload
+            # 按编译后的组装计划生成，ThreadId 为唯一必需字段（不在模板中配置）
+            plan = TemplateService.get_payload_plan(template, db)
+            return plan.build("<接龙项目ID>", {})
 
         except json.JSONDecodeError as e:
             logger.error(f"解析模板配置失败: {str(e)}")
@@ -428,19 +443,9 @@ class TemplateService:
             完整的 payload
         """
         try:
-            # 合并父模板配置
-            field_config = TemplateService.merge_parent_config(template, db)
-
-            # 初始化 payload，只包含 ThreadId（唯一必需）
-            payload = {
-                "ThreadId": thread_id
-            }
-
-            # 递归处理所有字段，保持键名原样
-            for key, config in field_config.items():
-                payload[key] = TemplateService._process_field_value(key, config, field_values)
-
-            return payload
+            # 按编译后的组装计划线性生成，ThreadId 为唯一必需字段
+            plan = TemplateService.get_payload_plan(template, db)
+            return plan.build(thread_id, field_values)
 
         except json.JSONDecodeError as e:
             logger.error(f"解析模板配置失败: {str(e)}")
@@ -575,3 +580,141 @@ class TemplateService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"创建任务失败: {str(e)}"
             )
+
+    @staticmethod
+    def create_tasks_from_template_bulk(
+        template_id: int,
+        rows: List[Any],
+        db: Session,
+        cron_expression: Optional[str] = "0 20 * * *",
+        skip_invalid: bool = False
+    ) -> Dict[str, Any]:
+        """
+        从模板为多个用户批量创建打卡任务
+
+        模板只解析、编译一次；所有行先在内存中校验（用户存在、ThreadId 不重复、
+        字段值与 cron 表达式有效），再在同一事务中插入，最后一次性同步到调度器
+
+        Args:
+            template_id: 模板 ID
+            rows: 每行数据（BulkTaskRow：user_id, thread_id, field_values, task_name, cron_expression）
+            db: 数据库会话
+            cron_expression: 行未指定时使用的 Cron 表达式（默认每天 20:00）
+            skip_invalid: 是否跳过无效行继续创建（否则有任一行无效时不创建任何任务）
+
+        Returns:
+            {'created': 创建数, 'tasks': 创建的任务列表, 'errors': 无效行列表}
+        """
+        from croniter import croniter
+        from backend.models import User
+        from backend.services.task_service import TaskService
+        from backend.utils.json_helpers import extract_thread_id
+
+        # 获取模板
+        template = TemplateService.get_template(template_id, db)
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="模板不存在"
+            )
+
+        # 检查模板是否启用
+        if template.is_active is not True:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="该模板未启用，无法创建任务"
+            )
+
+        # 模板只解析、编译一次（隐藏字段等默认值错误对所有行相同，直接报错）
+        plan = TemplateService.get_payload_plan(template, db)
+
+        # 一次查询所有涉及的用户及其已有任务的 ThreadId
+        user_ids = {row.user_id for row in rows}
+        existing_users = {
+            user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids)).all()
+        }
+        taken = {
+            (user_id, extract_thread_id(payload_config))
+            for user_id, payload_config in db.query(
+                CheckInTask.user_id, CheckInTask.payload_config
+            ).filter(CheckInTask.user_id.in_(user_ids)).all()
+        }
+
+        default_cron = cron_expression or "0 20 * * *"
+        valid_crons: Dict[str, bool] = {}
+        errors: List[Dict[str, Any]] = []
+        tasks: List[CheckInTask] = []
+
+        for index, row in enumerate(rows):
+            def reject(detail: str) -> None:
+                errors.append({
+                    'index': index,
+                    'user_id': row.user_id,
+                    'thread_id': row.thread_id,
+                    'detail': detail,
+                })
+
+            if row.user_id not in existing_users:
+                reject(f"用户 ID {row.user_id} 不存在")
+                continue
+
+            if (row.user_id, row.thread_id) in taken:
+                reject(f"该接龙中已存在任务。ThreadId: {row.thread_id}")
+                continue
+
+            cron_str = row.cron_expression or default_cron
+            if cron_str not in valid_crons:
+                valid_crons[cron_str] = croniter.is_valid(cron_str)
+            if not valid_crons[cron_str]:
+                reject(f"无效的 Crontab 表达式: '{cron_str}'")
+                continue
+
+            try:
+                payload = plan.build(row.thread_id, row.field_values)
+            except HTTPException as e:
+                reject(str(e.detail))
+                continue
+
+            # 同一批次内也不能重复
+            taken.add((row.user_id, row.thread_id))
+
+            task_name = row.task_name
+            if not task_name:
+                signature = payload.get('Signature', 'Unknown')
+                task_name = f"{template.name} - {signature}"
+
+            tasks.append(CheckInTask(
+                user_id=row.user_id,
+                payload_config=json.dumps(payload, ensure_ascii=False),
+                name=task_name,
+                is_active=True,
+                cron_expression=cron_str
+            ))
+
+        if errors and not skip_invalid:
+            logger.warning(f"批量创建任务已取消: 模板 {template.name}, {len(errors)}/{len(rows)} 行无效")
+            return {'created': 0, 'tasks': [], 'errors': errors}
+
+        if tasks:
+            try:
+                db.add_all(tasks)
+                db.flush()
+                task_ids = [task.id for task in tasks]
+                db.commit()
+            except Exception as e:
+                logger.error(f"批量创建任务失败: {str(e)}")
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"批量创建任务失败: {str(e)}"
+                )
+
+            # 提交后一次性加载新任务（避免调度同步和响应序列化逐个刷新过期对象）
+            tasks = db.query(CheckInTask).filter(CheckInTask.id.in_(task_ids)).order_by(CheckInTask.id).all()
+
+            logger.info(f"从模板批量创建任务成功: 模板 {template.name}, 创建 {len(tasks)} 个, 无效 {len(errors)} 行")
+
+            # 一次协调所有新任务的定时调度
+            TaskService._sync_scheduler_for_tasks(tasks)
+
+        return {'created': len(tasks), 'tasks': tasks, 'errors': errors}
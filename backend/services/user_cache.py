@@ -0,0 +1,159 @@
+"""
+认证用户缓存
+
+为 get_current_user 提供进程内缓存，避免每个已认证请求都解码 JWT 并查询 users 表：
+- JWT 解码结果缓存到 token 过期为止
+- 用户行快照按 user_id 缓存，写操作显式失效，TTL 兜底（多进程部署时其他进程的修改最多延迟 TTL 秒可见）
+"""
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from backend.config import settings
+from backend.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """认证用户缓存 - JWT payload 与用户快照"""
+
+    def __init__(self, ttl_seconds: int = 60, max_users: int = 1024, max_tokens: int = 4096):
+        self._ttl_seconds = ttl_seconds
+        self._max_users = max_users
+        self._max_tokens = max_tokens
+
+        # 用户快照: {user_id: (列值字典, 缓存时间)}
+        self._users: "OrderedDict[int, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+        # JWT 解码结果: {token: (payload, exp 时间戳)}
+        self._payloads: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+        # 线程锁（同步端点运行在线程池中）
+        self._lock = threading.Lock()
+
+        # User 模型的列属性名
+        self._column_keys = [attr.key for attr in inspect(User).column_attrs]
+
+    def get_payload(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        获取已缓存的 JWT payload（已过期则丢弃）
+
+        Args:
+            token: JWT token 字符串
+
+        Returns:
+            payload 字典或 None
+        """
+        with self._lock:
+            entry = self._payloads.get(token)
+            if not entry:
+                return None
+
+            payload, exp = entry
+            if exp <= time.time():
+                del self._payloads[token]
+                return None
+
+            self._payloads.move_to_end(token)
+            return payload
+
+    def put_payload(self, token: str, payload: Dict[str, Any]) -> None:
+        """
+        缓存已验证的 JWT payload，直到其 exp 为止
+
+        Args:
+            token: JWT token 字符串
+            payload: 解码后的 payload
+        """
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+
+        with self._lock:
+            self._payloads[token] = (payload, float(exp))
+            self._payloads.move_to_end(token)
+            while len(self._payloads) > self._max_tokens:
+                self._payloads.popitem(last=False)
+
+    def get_user(self, user_id: int, db: Session) -> Optional[User]:
+        """
+        从缓存中获取用户并挂载到当前会话（不产生 SELECT）
+
+        Args:
+            user_id: 用户 ID
+            db: 当前请求的数据库会话
+
+        Returns:
+            挂载到 db 的用户对象，未命中返回 None
+        """
+        with self._lock:
+            entry = self._users.get(user_id)
+            if not entry:
+                return None
+
+            values, cached_at = entry
+            if time.time() - cached_at > self._ttl_seconds:
+                del self._users[user_id]
+                return None
+
+            self._users.move_to_end(user_id)
+
+        # 基于快照构造 detached 对象，再以 load=False 合并到会话，
+        # 这样关系属性（如 user.tasks）仍可在当前会话中懒加载
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def put_user(self, user: User) -> None:
+        """
+        缓存用户的列值快照
+
+        Args:
+            user: 已从数据库加载的用户对象
+        """
+        values = {key: getattr(user, key) for key in self._column_keys}
+
+        with self._lock:
+            self._users[values["id"]] = (values, time.time())
+            self._users.move_to_end(values["id"])
+            while len(self._users) > self._max_users:
+                self._users.popitem(last=False)
+
+    def invalidate_user(self, user_id: Optional[int]) -> None:
+        """
+        使指定用户的缓存失效（用户信息被修改或删除时调用）
+
+        Args:
+            user_id: 用户 ID
+        """
+        if user_id is None:
+            return
+
+        with self._lock:
+            if self._users.pop(user_id, None) is not None:
+                logger.debug(f"用户 {user_id} 的认证缓存已失效")
+
+    def clear(self) -> None:
+        """清空所有缓存"""
+        with self._lock:
+            self._users.clear()
+            self._payloads.clear()
+
+    def get_stats(self) -> Dict:
+        """获取当前状态统计"""
+        with self._lock:
+            return {
+                'cached_users_count': len(self._users),
+                'cached_tokens_count': len(self._payloads),
+                'ttl_seconds': self._ttl_seconds,
+            }
+
+
+# 全局单例
+user_cache = UserCache(ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
@@ -6,6 +6,7 @@ from sqlalchemy import or_
 
 from backend.models import User
 from backend.schemas.user import UserCreate, UserUpdate, UserUpdateProfile
+from backend.services.user_cache import user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -195,6 +196,7 @@ class UserService:
         user.updated_at = datetime.now()
         db.commit()
         db.refresh(user)
+        user_cache.invalidate_user(user.id)
 
         logger.info(f"更新用户成功: {user.alias} (ID: {user.id})")
         return user
@@ -202,7 +204,7 @@ class UserService:
     @staticmethod
     def update_user_profile(user_id: int, profile_data: UserUpdateProfile, db: Session) -> User:
         """
-        更新用户个人信息（别名、邮箱和密码）
+        更新用户个人信息（别名、邮箱、通知方式和密码）
 
         Args:
             user_id: 用户 ID
@@ -233,6 +235,11 @@ class UserService:
             user.email = update_data["email"]
             logger.info(f"用户 ID {user_id} 邮箱更新: {user.email}")
 
+        # 更新打卡结果通知方式
+        if update_data.get("notify_mode"):
+            user.notify_mode = update_data["notify_mode"]
+            logger.info(f"用户 ID {user_id} 通知方式更新: {user.notify_mode}")
+
         # 更新密码
         if "new_password" in update_data and update_data["new_password"]:
             # 如果用户已设置密码，需要验证当前密码
@@ -251,6 +258,7 @@ class UserService:
         user.updated_at = datetime.now()
         db.commit()
         db.refresh(user)
+        user_cache.invalidate_user(user.id)
 
         logger.info(f"✅ 更新用户个人信息成功: {user.alias} (ID: {user.id})")
         return user
@@ -274,6 +282,7 @@ class UserService:
         alias = user.alias
         db.delete(user)
         db.commit()
+        user_cache.invalidate_user(user_id)
 
         logger.info(f"删除用户成功: {alias} (ID: {user_id})")
         return True
@@ -2,13 +2,22 @@
 JSON 处理辅助函数
 
 提供安全的 JSON 解析和数据提取功能
+payload_config 的解析结果按字符串内容缓存，同一份配置在打卡和列表路径上只解码一次
 """
 import json
+import threading
 import logging
+from collections import OrderedDict
 from typing import Optional, Any, Dict
 
 logger = logging.getLogger(__name__)
 
+# payload_config 解析缓存: {payload_config 字符串: 解析后的字典}
+# 以内容为键，任务配置被修改后自然失效，无需显式清理
+_PAYLOAD_CACHE_SIZE = 2048
+_payload_cache: "OrderedDict[str, Dict]" = OrderedDict()
+_payload_cache_lock = threading.Lock()
+
 
 def safe_parse_json(
     json_str: Optional[str],
@@ -37,6 +46,41 @@ def safe_parse_json(
         return default
 
 
+def parse_payload_cached(payload_config: Optional[str]) -> Optional[Dict]:
+    """
+    解析 payload_config 并缓存结果
+
+    Args:
+        payload_config: payload 配置字符串
+
+    Returns:
+        解析后的字典（多个调用方共享，只读），解析失败返回 None
+    """
+    if not payload_config:
+        return None
+
+    key = str(payload_config)
+    with _payload_cache_lock:
+        cached = _payload_cache.get(key)
+        if cached is not None:
+            _payload_cache.move_to_end(key)
+            return cached
+
+    result = safe_parse_json(key)
+    # 确保解析结果是字典类型
+    if not isinstance(result, dict):
+        if result is not None:
+            logger.warning(f"payload_config 不是字典类型: {type(result)}")
+        return None
+
+    with _payload_cache_lock:
+        _payload_cache[key] = result
+        while len(_payload_cache) > _PAYLOAD_CACHE_SIZE:
+            _payload_cache.popitem(last=False)
+
+    return result
+
+
 def safe_parse_payload(
     payload_config: Optional[str],
     default: Optional[Dict] = None
@@ -44,6 +88,8 @@ def safe_parse_payload(
     """
     安全解析 payload_config，失败时返回默认字典
 
+    返回顶层字典的副本，嵌套对象与解析缓存共享，调用方不应修改
+
     Args:
         payload_config: payload 配置字符串
         default: 解析失败时的默认值
@@ -51,12 +97,10 @@ def safe_parse_payload(
     Returns:
         解析后的字典
     """
-    result = safe_parse_json(payload_config, default or {})
-    # 确保返回值是字典类型
-    if not isinstance(result, dict):
-        logger.warning(f"payload_config 不是字典类型: {type(result)}")
+    result = parse_payload_cached(payload_config)
+    if result is None:
         return default or {}
-    return result
+    return dict(result)
 
 
 def extract_thread_id(payload_config: Optional[str]) -> Optional[str]:
@@ -69,8 +113,8 @@ def extract_thread_id(payload_config: Optional[str]) -> Optional[str]:
     Returns:
         ThreadId 或 None
     """
-    payload = safe_parse_payload(payload_config)
-    return payload.get('ThreadId')
+    payload = parse_payload_cached(payload_config)
+    return payload.get('ThreadId') if payload else None
 
 
 def extract_signature(payload_config: Optional[str]) -> Optional[str]:
@@ -83,8 +127,8 @@ def extract_signature(payload_config: Optional[str]) -> Optional[str]:
     Returns:
         Signature 或 None
     """
-    payload = safe_parse_payload(payload_config)
-    return payload.get('Signature')
+    payload = parse_payload_cached(payload_config)
+    return payload.get('Signature') if payload else None
 
 
 def build_task_info(task) -> Dict[str, str]:
@@ -0,0 +1,380 @@
+"""
+结构化日志环形缓冲区
+
+在内存中保留最近 N 条结构化日志（时间、级别、logger、task_id、record_id、用户），
+并按任务 ID、打卡记录 ID 建立二级索引，按记录/任务查询日志的开销只与匹配条数相关
+- task_id / record_id / user 优先取自日志调用的 extra 参数，其次取自 log_context 设置的上下文
+- 缓冲区满后淘汰最旧的日志，索引同步淘汰
+
+LOG_BUFFER_STORE=sqlite 时改用 SQLite 文件（SQLiteLogBuffer），API 进程和独立打卡 worker（run_worker.py）写入同一个文件，
+queue 模式下 worker 中的打卡日志同样可以按任务/记录查询
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.config import settings
+
+# 当前线程/协程的日志上下文（task_id, record_id, user）
+_log_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+# 结构化字段
+CONTEXT_FIELDS = ("task_id", "record_id", "user")
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    为代码块内产生的日志附加上下文字段（可嵌套，内层覆盖外层）
+
+    Args:
+        **fields: task_id, record_id, user
+    """
+    merged = {**_log_context.get(), **{k: v for k, v in fields.items() if v is not None}}
+    token = _log_context.set(merged)
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def bind_log_context(**fields) -> None:
+    """
+    向当前上下文追加字段（在 log_context 代码块内调用，随代码块结束一并失效）
+
+    Args:
+        **fields: task_id, record_id, user
+    """
+    _log_context.set({**_log_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+
+
+class LogRingBuffer:
+    """带二级索引的日志环形缓冲区"""
+
+    def __init__(self, capacity: int = 10000):
+        self._capacity = max(1, capacity)
+
+        # {序号: 日志记录}，序号单调递增，最旧的记录序号最小
+        self._records: Dict[int, Dict[str, Any]] = {}
+        self._next_seq = 0
+        self._oldest_seq = 0
+
+        # 二级索引: {task_id / record_id: 序号队列（从旧到新）}
+        self._by_task: Dict[int, Deque[int]] = {}
+        self._by_record: Dict[int, Deque[int]] = {}
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index_add(index: Dict[int, Deque[int]], key: Optional[int], seq: int) -> None:
+        if key is not None:
+            index.setdefault(key, deque()).append(seq)
+
+    @staticmethod
+    def _index_evict(index: Dict[int, Deque[int]], key: Optional[int], seq: int) -> None:
+        if key is None:
+            return
+        seqs = index.get(key)
+        # 被淘汰的记录一定是该键下最旧的一条
+        if seqs and seqs[0] == seq:
+            seqs.popleft()
+            if not seqs:
+                del index[key]
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """
+        追加一条日志记录（超出容量时淘汰最旧的记录）
+
+        Args:
+            entry: 结构化日志记录
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            entry["seq"] = seq
+            self._records[seq] = entry
+            self._index_add(self._by_task, entry.get("task_id"), seq)
+            self._index_add(self._by_record, entry.get("record_id"), seq)
+
+            while len(self._records) > self._capacity:
+                oldest = self._records.pop(self._oldest_seq)
+                self._index_evict(self._by_task, oldest.get("task_id"), self._oldest_seq)
+                self._index_evict(self._by_record, oldest.get("record_id"), self._oldest_seq)
+                self._oldest_seq += 1
+
+    def query(
+        self,
+        task_id: Optional[int] = None,
+        record_id: Optional[int] = None,
+        user: Optional[str] = None,
+        min_level: Optional[int] = None,
+        logger_name: Optional[str] = None,
+        limit: int = 200
+    ) -> List[Dict[str, Any]]:
+        """
+        查询日志记录
+
+        指定 record_id 或 task_id 时走索引，只遍历匹配的记录；否则从最新记录开始扫描缓冲区
+
+        Args:
+            task_id: 任务 ID
+            record_id: 打卡记录 ID
+            user: 用户别名
+            min_level: 最低日志级别（数值）
+            logger_name: logger 名称前缀
+            limit: 最多返回条数（返回最新的 limit 条）
+
+        Returns:
+            日志记录列表（按时间正序）
+        """
+        def matches(entry: Dict[str, Any]) -> bool:
+            if task_id is not None and entry.get("task_id") != task_id:
+                return False
+            if user is not None and entry.get("user") != user:
+                return False
+            if min_level is not None and entry["levelno"] < min_level:
+                return False
+            if logger_name and not (
+                entry["logger"] == logger_name or entry["logger"].startswith(logger_name + ".")
+            ):
+                return False
+            return True
+
+        with self._lock:
+            if record_id is not None:
+                candidates = reversed(self._by_record.get(record_id, ()))
+            elif task_id is not None:
+                candidates = reversed(self._by_task.get(task_id, ()))
+            else:
+                candidates = range(self._next_seq - 1, self._oldest_seq - 1, -1)
+
+            result = []
+            for seq in candidates:
+                entry = self._records[seq]
+                if matches(entry):
+                    result.append(dict(entry))
+                    if len(result) >= limit:
+                        break
+
+        result.reverse()
+        return result
+
+    def flush(self) -> None:
+        """内存缓冲区无需写入（与 SQLiteLogBuffer 接口一致）"""
+
+    def clear(self) -> None:
+        """清空缓冲区"""
+        with self._lock:
+            self._records.clear()
+            self._by_task.clear()
+            self._by_record.clear()
+            self._oldest_seq = self._next_seq
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取当前状态统计"""
+        with self._lock:
+            return {
+                "capacity": self._capacity,
+                "size": len(self._records),
+                "indexed_tasks": len(self._by_task),
+                "indexed_records": len(self._by_record),
+            }
+
+
+class SQLiteLogBuffer:
+    """
+    多进程共享的结构化日志缓冲区（SQLite 文件）
+
+    接口与 LogRingBuffer 相同。append 只写入进程内的待写队列，由后台线程每隔 flush_interval 秒批量写入，
+    日志调用不等待磁盘 I/O；超出容量的最旧日志在写入时一并删除
+    """
+
+    def __init__(self, path: Path, capacity: int = 10000, flush_interval: float = 0.5):
+        """
+        Args:
+            path: 数据库文件路径
+            capacity: 保留的日志条数（所有进程合计）
+            flush_interval: 批量写入间隔（秒）
+        """
+        self.path = Path(path)
+        self._capacity = max(1, capacity)
+        self.flush_interval = flush_interval
+
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._local = threading.local()
+        self._flusher: Optional[threading.Thread] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS log_records ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, time TEXT NOT NULL, level TEXT NOT NULL, "
+            "levelno INTEGER NOT NULL, logger TEXT NOT NULL, message TEXT NOT NULL, "
+            "task_id INTEGER, record_id INTEGER, user TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_log_records_task ON log_records (task_id, seq)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_log_records_record ON log_records (record_id, seq)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """当前线程的数据库连接（autocommit，批量写入时显式 BEGIN IMMEDIATE）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _run_flusher(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # 写入失败的日志丢弃，不影响业务线程（也不能通过 logging 报告，避免递归）
+                pass
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """
+        追加一条日志记录（由后台线程批量写入）
+
+        Args:
+            entry: 结构化日志记录
+        """
+        with self._pending_lock:
+            self._pending.append(entry)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name="log-buffer-flush", daemon=True)
+                self._flusher.start()
+
+    def flush(self) -> None:
+        """将待写队列写入数据库，并删除超出容量的最旧日志"""
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO log_records (time, level, levelno, logger, message, task_id, record_id, user) "
+                    "VALUES (:time, :level, :levelno, :logger, :message, :task_id, :record_id, :user)",
+                    pending
+                )
+                last_seq = conn.execute("SELECT MAX(seq) FROM log_records").fetchone()[0]
+                conn.execute("DELETE FROM log_records WHERE seq <= ?", (last_seq - self._capacity,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def query(
+        self,
+        task_id: Optional[int] = None,
+        record_id: Optional[int] = None,
+        user: Optional[str] = None,
+        min_level: Optional[int] = None,
+        logger_name: Optional[str] = None,
+        limit: int = 200
+    ) -> List[Dict[str, Any]]:
+        """查询日志记录（参数与返回值同 LogRingBuffer.query）"""
+        # 先写入本进程尚未写入的日志
+        self.flush()
+
+        conditions, params = [], []
+        for column, value in (("task_id", task_id), ("record_id", record_id), ("user", user)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if min_level is not None:
+            conditions.append("levelno >= ?")
+            params.append(min_level)
+        if logger_name:
+            conditions.append("(logger = ? OR substr(logger, 1, ?) = ?)")
+            params.extend([logger_name, len(logger_name) + 1, logger_name + "."])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection().execute(
+            f"SELECT seq, time, level, levelno, logger, message, task_id, record_id, user "
+            f"FROM log_records {where} ORDER BY seq DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+
+        result = [dict(row) for row in rows]
+        result.reverse()
+        return result
+
+    def clear(self) -> None:
+        """清空缓冲区"""
+        with self._pending_lock:
+            self._pending = []
+        self._connection().execute("DELETE FROM log_records")
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取当前状态统计"""
+        self.flush()
+        conn = self._connection()
+        size, tasks, records = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT task_id), COUNT(DISTINCT record_id) FROM log_records"
+        ).fetchone()
+        return {
+            "capacity": self._capacity,
+            "size": size,
+            "indexed_tasks": tasks,
+            "indexed_records": records,
+        }
+
+
+class RingBufferHandler(logging.Handler):
+    """将日志写入结构化环形缓冲区的 logging Handler"""
+
+    def __init__(self, buffer: LogRingBuffer, level: int = logging.NOTSET):
+        super().__init__(level)
+        self._buffer = buffer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            context = _log_context.get()
+            message = record.getMessage()
+            if record.exc_info:
+                message = f"{message}\n{logging.Formatter().formatException(record.exc_info)}"
+
+            entry = {
+                "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+                "level": record.levelname,
+                "levelno": record.levelno,
+                "logger": record.name,
+                "message": message,
+            }
+            for field in CONTEXT_FIELDS:
+                entry[field] = getattr(record, field, None) or context.get(field)
+
+            self._buffer.append(entry)
+        except Exception:
+            self.handleError(record)
+
+
+def _create_log_buffer():
+    """按 LOG_BUFFER_STORE 创建日志缓冲区（为空时 queue 模式使用 sqlite，否则使用 memory）"""
+    store = settings.LOG_BUFFER_STORE.lower()
+    if not store:
+        store = "sqlite" if settings.CHECK_IN_EXECUTION_MODE.lower() == "queue" else "memory"
+    if store == "sqlite":
+        return SQLiteLogBuffer(settings.LOG_BUFFER_DB, settings.LOG_BUFFER_SIZE)
+    return LogRingBuffer(settings.LOG_BUFFER_SIZE)
+
+
+# 全局单例
+log_buffer = _create_log_buffer()
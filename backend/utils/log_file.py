@@ -0,0 +1,28 @@
+"""
+日志文件 handler
+
+LOG_ROTATION 选择日志文件的轮转方式：
+- size: 进程内按大小轮转（RotatingFileHandler），只适用于单个进程写入该文件的部署；
+  多个进程各自轮转同一个文件会互相覆盖，丢失或截断日志
+- external: 进程不轮转，由 logrotate 等外部工具轮转（WatchedFileHandler 检测到文件被移走后重新打开），
+  多个进程（uvicorn --workers、run_worker.py）写入同一个 LOG_FILE 时使用
+"""
+import logging
+from logging.handlers import RotatingFileHandler, WatchedFileHandler
+from pathlib import Path
+from typing import Union
+
+from backend.config import settings
+
+
+def create_file_handler(path: Union[str, Path]) -> logging.Handler:
+    """按 LOG_ROTATION 创建日志文件 handler（自动创建所在目录）"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if settings.LOG_ROTATION.lower() == "external":
+        return WatchedFileHandler(path, encoding="utf-8")
+    return RotatingFileHandler(
+        path,
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
@@ -0,0 +1,254 @@
+"""
+日志文件读取辅助函数
+
+提供日志尾部读取、过滤和实时跟踪功能
+- 从文件末尾按块反向读取，读取最后 N 条日志的开销与文件大小无关
+- 多行日志（如异常堆栈）按一条记录处理
+- 当前文件不足 N 条时继续读取轮转后的备份文件（backend.log.1, backend.log.2, ...）
+"""
+import os
+import re
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# 日志格式: "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_LINE_PATTERN = re.compile(
+    r"^(?P<time>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d{3} - (?P<logger>\S+) - (?P<level>[A-Z]+) - "
+)
+
+# 日志时间格式（asctime 去掉毫秒部分）
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 反向读取的块大小
+_BLOCK_SIZE = 64 * 1024
+
+
+def _iter_lines_reversed(path: Path) -> Iterator[str]:
+    """
+    从文件末尾开始逐行反向读取
+
+    Args:
+        path: 文件路径
+
+    Yields:
+        文件中的行（从最后一行开始，不含换行符）
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+
+        while position > 0:
+            read_size = min(_BLOCK_SIZE, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+
+            lines = block.split(b"\n")
+            # 第一段可能是不完整的行，留到下一个块拼接
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="ignore").rstrip("\r")
+
+        yield remainder.decode("utf-8", errors="ignore").rstrip("\r")
+
+
+def _log_files(log_file: Path) -> List[Path]:
+    """当前日志文件及其轮转备份（从新到旧）"""
+    files = [log_file]
+    index = 1
+    while True:
+        backup = log_file.with_name(f"{log_file.name}.{index}")
+        if not backup.exists():
+            break
+        files.append(backup)
+        index += 1
+    return [path for path in files if path.exists()]
+
+
+def parse_log_header(line: str) -> Optional[Tuple[str, str, str]]:
+    """
+    解析日志行头部
+
+    Args:
+        line: 日志行
+
+    Returns:
+        (时间 "YYYY-MM-DD HH:MM:SS", logger 名称, 级别)，不是日志头部（如堆栈续行）时返回 None
+        时间保持字符串形式（按字典序即时间序比较，免去逐行解析日期）
+    """
+    match = LOG_LINE_PATTERN.match(line)
+    if not match:
+        return None
+    return match.group("time"), match.group("logger"), match.group("level")
+
+
+class LogFilter:
+    """日志记录过滤条件"""
+
+    def __init__(
+        self,
+        level: Optional[str] = None,
+        logger_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ):
+        """
+        Args:
+            level: 最低日志级别（如 WARNING 时包含 ERROR、CRITICAL）
+            logger_name: logger 名称前缀（如 backend.services 包含其所有子 logger）
+            since: 起始时间（含）
+            until: 结束时间（含）
+        """
+        self.min_level = logging.getLevelName(level.upper()) if level else None
+        if not isinstance(self.min_level, int):
+            self.min_level = None
+        self.logger_name = logger_name
+        self.since = self._to_local(since)
+        self.until = self._to_local(until)
+
+    @staticmethod
+    def _to_local(value: Optional[datetime]) -> Optional[str]:
+        """日志时间为本地时间，带时区的查询时间先转换为本地时间，再格式化为日志中的时间格式"""
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value.strftime(_TIME_FORMAT)
+
+    @property
+    def is_empty(self) -> bool:
+        return (
+            self.min_level is None and not self.logger_name
+            and self.since is None and self.until is None
+        )
+
+    def matches(self, header: Optional[Tuple[str, str, str]]) -> bool:
+        """
+        判断日志记录是否满足过滤条件
+
+        Args:
+            header: parse_log_header 的结果（无法解析的记录只在无过滤条件时保留）
+
+        Returns:
+            是否保留
+        """
+        if self.is_empty:
+            return True
+        if header is None:
+            return False
+
+        timestamp, logger_name, level = header
+        if self.min_level is not None:
+            level_no = logging.getLevelName(level)
+            if not isinstance(level_no, int) or level_no < self.min_level:
+                return False
+        if self.logger_name and not (
+            logger_name == self.logger_name or logger_name.startswith(self.logger_name + ".")
+        ):
+            return False
+        if self.since is not None and timestamp < self.since:
+            return False
+        if self.until is not None and timestamp > self.until:
+            return False
+        return True
+
+
+def tail_log(log_file: Path, count: int, log_filter: Optional[LogFilter] = None) -> List[str]:
+    """
+    读取最后 N 条满足条件的日志记录
+
+    Args:
+        log_file: 日志文件路径
+        count: 记录条数
+        log_filter: 过滤条件（可选）
+
+    Returns:
+        日志记录列表（按时间正序，多行记录合并为一条，不含末尾换行）
+    """
+    log_filter = log_filter or LogFilter()
+    records: List[str] = []
+    continuation: List[str] = []
+
+    for path in _log_files(log_file):
+        for line in _iter_lines_reversed(path):
+            if not line and not continuation:
+                continue
+
+            header = parse_log_header(line)
+            if header is None:
+                # 堆栈等续行，先暂存，遇到所属记录的头部时再合并
+                continuation.append(line)
+                continue
+
+            if log_filter.matches(header):
+                continuation.append(line)
+                records.append("\n".join(reversed(continuation)))
+                if len(records) >= count:
+                    return list(reversed(records))
+            elif log_filter.since is not None and header[0] < log_filter.since:
+                # 日志按时间顺序写入，早于起始时间后无需继续读取
+                return list(reversed(records))
+            continuation = []
+
+    # 文件开头没有头部的残留行（无过滤条件时保留）
+    if continuation and log_filter.is_empty and len(records) < count:
+        records.append("\n".join(reversed(continuation)))
+
+    return list(reversed(records))
+
+
+class LogFollower:
+    """
+    跟踪日志文件新增内容（类似 tail -f）
+
+    每次 poll 返回自上次读取以来新增的完整行；检测到文件被轮转（文件变小或被替换）时从新文件开头读取
+    """
+
+    def __init__(self, log_file: Path):
+        self._log_file = log_file
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._remainder = b""
+
+        try:
+            stat = log_file.stat()
+            self._inode = stat.st_ino
+            self._offset = stat.st_size
+        except FileNotFoundError:
+            pass
+
+    def poll(self, max_bytes: int = 1024 * 1024) -> List[str]:
+        """
+        读取新增的行
+
+        Args:
+            max_bytes: 单次最多读取的字节数
+
+        Returns:
+            新增的完整行（不含换行符）
+        """
+        try:
+            stat = self._log_file.stat()
+        except FileNotFoundError:
+            return []
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # 文件已轮转，从新文件开头读取
+            self._inode = stat.st_ino
+            self._offset = 0
+            self._remainder = b""
+
+        if stat.st_size == self._offset:
+            return []
+
+        with open(self._log_file, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(max_bytes)
+        self._offset += len(data)
+
+        lines = (self._remainder + data).split(b"\n")
+        self._remainder = lines.pop()
+        return [line.decode("utf-8", errors="ignore").rstrip("\r") for line in lines]
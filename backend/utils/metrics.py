@@ -0,0 +1,359 @@
+"""
+运行指标（Prometheus 文本格式）
+
+轻量的进程内指标实现，由 /metrics 端点以 Prometheus 文本格式导出
+- Counter: 只增计数器（可带标签）
+- Gauge: 瞬时值（可手动增减，或在导出时通过回调读取）
+- Histogram: 耗时分布（累计桶 + 总和 + 次数）
+多 worker 部署时每个进程各自统计，由采集端按实例汇总
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """指标基类"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """只增计数器"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        if not values and not self.labelnames:
+            values = {(): 0}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """瞬时值（callback 不为空时在导出时读取）"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._callback = callback
+
+    def set_callback(self, callback: Callable[[], float]) -> None:
+        self._callback = callback
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    @contextmanager
+    def track(self):
+        """代码块执行期间计数 +1"""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def _samples(self) -> List[str]:
+        if self._callback is not None:
+            try:
+                value = float(self._callback())
+            except Exception:
+                # 读取失败时不导出该样本，避免影响其他指标
+                return []
+        else:
+            with self._lock:
+                value = self._value
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """耗时分布"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float]):
+        super().__init__(name, documentation)
+        self._buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts = [0] * len(self._buckets)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            for index, bound in enumerate(self._buckets):
+                if value <= bound:
+                    self._counts[index] += 1
+                    break
+            self._sum += value
+            self._count += 1
+
+    @contextmanager
+    def time(self):
+        """统计代码块耗时（秒）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self._buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_value(total)}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标已注册: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, callback: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, callback))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float]) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        """导出全部指标（Prometheus 文本格式）"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# 全局注册表
+registry = MetricsRegistry()
+
+# ==================== 打卡流程 ====================
+SIGNATURE_CAPTURE_SECONDS = registry.histogram(
+    "checkin_signature_capture_seconds",
+    "无头浏览器获取 x-api-request-payload 签名耗时（秒）",
+    buckets=(1, 2, 3, 5, 8, 10, 15, 20, 30, 60),
+)
+EDIT_RECORD_SECONDS = registry.histogram(
+    "checkin_edit_record_seconds",
+    "EditRecord 打卡请求耗时（秒）",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+CHECK_IN_SECONDS = registry.histogram(
+    "checkin_duration_seconds",
+    "单次打卡端到端耗时（秒）",
+    buckets=(1, 2, 5, 8, 10, 15, 20, 30, 45, 60, 120),
+)
+CHECK_IN_OUTCOMES = registry.counter(
+    "checkin_outcomes_total",
+    "按 CheckInRecord.status 统计的打卡结果数",
+    labelnames=("status",),
+)
+CHROME_INSTANCES = registry.gauge(
+    "checkin_chrome_instances",
+    "当前运行中的无头 Chrome 实例数",
+)
+CHECK_INS_IN_PROGRESS = registry.gauge(
+    "checkin_in_progress",
+    "当前正在执行的打卡数",
+)
+CHECK_INS_QUEUED = registry.gauge(
+    "checkin_queued",
+    "等待处理的打卡记录数（status 为 pending）",
+)
+SCHEDULER_JOBS = registry.gauge(
+    "checkin_scheduler_jobs",
+    "本进程调度器中注册的任务数",
+)
+
+# ==================== 基础设施 ====================
+SMTP_SEND_SECONDS = registry.histogram(
+    "checkin_smtp_send_seconds",
+    "通过 SMTP 连接池发送单封邮件耗时（秒）",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+DB_QUERY_SECONDS = registry.histogram(
+    "checkin_db_query_seconds",
+    "数据库语句执行耗时（秒）",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+
+def nearest_rank_percentile(ordered: Sequence[float], pct: float) -> float:
+    """
+    最近秩法百分位数
+
+    Args:
+        ordered: 已升序排列的样本（不能为空）
+        pct: 百分位（0-100）
+
+    Returns:
+        第 ceil(pct/100 × n) 个样本
+    """
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+@contextmanager
+def stage_timer(timings: Optional[Dict[str, int]], stage: str):
+    """
+    统计代码块耗时（毫秒）并写入 timings[stage]，用于记录单次打卡的分阶段耗时
+
+    Args:
+        timings: 分阶段耗时字典（为 None 时不统计）
+        stage: 阶段名称（见 CheckInRecord.TIMING_STAGES）
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            elapsed = int((time.perf_counter() - start) * 1000)
+            timings[stage] = timings.get(stage, 0) + elapsed
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1", token: str = ""):
+    """
+    在后台线程中启动只提供 /metrics 的 HTTP 服务（供没有 API 端点的独立 worker 进程导出指标）
+
+    Args:
+        port: 监听端口
+        host: 监听地址
+        token: 访问令牌（为空时不校验；设置后需携带 Authorization: Bearer <令牌>）
+
+    Returns:
+        ThreadingHTTPServer 实例（调用 shutdown() 停止）
+    """
+    import hmac
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            if token and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+                self.send_error(401)
+                return
+
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 采集请求不写入日志
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def instrument_engine(engine) -> None:
+    """
+    为 SQLAlchemy 引擎注册语句耗时统计
+
+    Args:
+        engine: SQLAlchemy Engine
+    """
+    from sqlalchemy import event
+
+    # 开始时间保存在每条语句的执行上下文上：语句出错时不会触发 after_cursor_execute，
+    # 上下文随语句结束而丢弃，不会在连接池连接上累积
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_metrics_query_start", None)
+        if start is not None:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start)
@@ -0,0 +1,176 @@
+"""
+跨进程共享的速率限制存储
+
+slowapi（limits）默认的内存存储按进程计数：多个 uvicorn worker 各自限流，计数也各自增长。
+这里提供基于 SQLite 文件的 limits 存储后端（scheme: checkin-sqlite），同一主机上的所有进程共用计数：
+- 每个限流键一行 (key, count, expires_at)，计数更新为单条 UPSERT ... RETURNING
+- 滑动窗口计数（sliding-window-counter）每个键只保存当前和上一个窗口两行，在同一个写事务中判断并计数
+- WAL 模式，读不阻塞写；每个线程一个连接
+- 写入时每隔 compact_interval 秒顺带删除已过期的行，文件大小保持稳定
+
+用法：
+    storage_from_string("checkin-sqlite:///data/ratelimit.db", compact_interval=300)
+"""
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+
+class SQLiteRateLimitStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """基于 SQLite 文件的 limits 存储（同一主机多进程共享）"""
+
+    STORAGE_SCHEME = ["checkin-sqlite"]
+
+    def __init__(
+        self,
+        uri: Optional[str] = None,
+        wrap_exceptions: bool = False,
+        compact_interval: float = 300,
+        **options
+    ):
+        """
+        Args:
+            uri: checkin-sqlite:///数据库文件路径
+            wrap_exceptions: 是否把存储异常包装为 limits.errors.StorageError
+            compact_interval: 清理过期行的间隔（秒）
+        """
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = (uri or "").split("://", 1)[-1]
+        if not path:
+            raise ValueError(f"速率限制存储地址缺少数据库文件路径: {uri}")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compact_interval = float(compact_interval)
+
+        self._local = threading.local()
+        self._last_compact = time.time()
+        self._compact_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limits_expires ON rate_limits (expires_at)")
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        """当前线程的数据库连接（autocommit，需要原子读改写时显式 BEGIN IMMEDIATE）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _maybe_compact(self, conn: sqlite3.Connection, now: float) -> None:
+        """每隔 compact_interval 秒删除已过期的行"""
+        if now - self._last_compact < self.compact_interval:
+            return
+        with self._compact_lock:
+            if now - self._last_compact < self.compact_interval:
+                return
+            self._last_compact = now
+        conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+
+    def _incr(self, conn: sqlite3.Connection, key: str, expiry: float, amount: int, now: float) -> int:
+        # 已过期的行视为新窗口：计数和过期时间一并重置
+        row = conn.execute(
+            "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "count = CASE WHEN rate_limits.expires_at <= ? THEN excluded.count ELSE rate_limits.count + excluded.count END, "
+            "expires_at = CASE WHEN rate_limits.expires_at <= ? THEN excluded.expires_at ELSE rate_limits.expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now)
+        ).fetchone()
+        return row[0]
+
+    def _get(self, conn: sqlite3.Connection, key: str, now: float) -> int:
+        row = conn.execute(
+            "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        conn = self._connection()
+        count = self._incr(conn, key, expiry, amount, now)
+        self._maybe_compact(conn, now)
+        return count
+
+    def get(self, key: str) -> int:
+        return self._get(self._connection(), key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def _sliding_window(
+        self, conn: sqlite3.Connection, key: str, expiry: int, now: float
+    ) -> Tuple[int, float, int, float]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._get(conn, previous_key, now)
+        current_count = self._get(conn, current_key, now)
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+
+        now = time.time()
+        conn = self._connection()
+        # 写事务内判断并计数，多进程并发时不会超发
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            previous_count, previous_ttl, current_count, _ = self._sliding_window(conn, key, expiry, now)
+            weighted_count = previous_count * previous_ttl / expiry + current_count
+            acquired = math.floor(weighted_count) + amount <= limit
+            if acquired:
+                # 当前窗口的计数需要在下一个窗口中作为"上一个窗口"继续参与计算，保留两个窗口长度
+                _, current_key = self.sliding_window_keys(key, expiry, now)
+                self._incr(conn, current_key, 2 * expiry, amount, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        if acquired:
+            self._maybe_compact(conn, now)
+        return acquired
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        return self._sliding_window(self._connection(), key, expiry, time.time())
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self._connection().execute("DELETE FROM rate_limits WHERE key IN (?, ?)", (previous_key, current_key))
@@ -3,7 +3,7 @@
 
 提供统一的时间戳处理和格式化功能
 """
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 
@@ -146,3 +146,22 @@ def parse_jwt_exp(jwt_exp: Optional[str]) -> Optional[int]:
         return int(jwt_exp)
     except (ValueError, TypeError):
         return None
+
+
+def to_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """
+    将时间转换为 UTC（不带时区的时间视为 UTC）
+
+    SQLite 的 DateTime 列绑定参数时会丢弃时区偏移，按时间范围查询前需先统一为 UTC
+
+    Args:
+        dt: 时间（可选）
+
+    Returns:
+        UTC 时间，输入为 None 时返回 None
+    """
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
@@ -0,0 +1,86 @@
+"""
+带过期时间的字典
+
+用最小堆按过期时间排序，每次读写时从堆顶弹出已过期的键（O(log n)），不需要后台线程定期全量扫描。
+更新过期时间时旧的堆元素不立即删除，弹出时与字典中的过期时间比对后丢弃；过期元素过多时重建堆。
+"""
+import heapq
+import time
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLMap(Generic[V]):
+    """带过期时间的字典（非线程安全，由调用方加锁）"""
+
+    def __init__(self):
+        self._data: Dict[Hashable, Tuple[V, float]] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = 0  # 堆元素的次序号（过期时间相同时避免比较键）
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def set(self, key: Hashable, value: V, expire_at: float) -> None:
+        """
+        写入键值
+
+        Args:
+            key: 键
+            value: 值
+            expire_at: 过期时间（time.time() 时间戳）
+        """
+        self._data[key] = (value, expire_at)
+        self._counter += 1
+        heapq.heappush(self._heap, (expire_at, self._counter, key))
+
+        # 被覆盖的旧堆元素过多时重建堆，避免堆无限增长
+        if len(self._heap) > 2 * len(self._data) + 64:
+            self._heap = [(expire, index, k) for index, (k, (_, expire)) in enumerate(self._data.items())]
+            heapq.heapify(self._heap)
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[Tuple[V, float]]:
+        """
+        读取未过期的键值
+
+        Args:
+            key: 键
+            now: 当前时间（默认 time.time()）
+
+        Returns:
+            (值, 过期时间)，不存在或已过期时返回 None
+        """
+        now = time.time() if now is None else now
+        self.expire(now)
+        return self._data.get(key)
+
+    def pop(self, key: Hashable) -> Optional[Tuple[V, float]]:
+        """删除键（旧的堆元素在弹出时丢弃）"""
+        return self._data.pop(key, None)
+
+    def keys(self, now: Optional[float] = None) -> List[Any]:
+        """未过期的键列表"""
+        self.expire(time.time() if now is None else now)
+        return list(self._data.keys())
+
+    def expire(self, now: float) -> int:
+        """
+        弹出已过期的键
+
+        Args:
+            now: 当前时间
+
+        Returns:
+            删除的键数
+        """
+        removed = 0
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expire_at, _, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            # 过期时间不一致说明该键已被更新或删除，堆元素已失效
+            if entry is not None and entry[1] == expire_at:
+                del self._data[key]
+                removed += 1
+        return removed
@@ -0,0 +1,339 @@
+"""
+打卡作业队列 worker
+
+职能：认领并执行 pending 状态的 CheckInRecord（即待执行的打卡作业）
+- 线程模式下在 API 进程内运行；CHECK_IN_EXECUTION_MODE=queue 时由 run_worker.py 在独立进程中运行
+- 按创建时间取件，单条 UPDATE ... RETURNING 原子认领一批（写入 worker_id 和租约到期时间），多个 worker 进程/主机互不重复
+- 执行期间定期续租；进程崩溃后租约过期，作业由其他 worker 重新认领（执行次数 +1，超过 CHECK_IN_MAX_ATTEMPTS 记为失败）
+- 同一用户同时到期的多个作业合并为一组（只获取一次签名、复用 HTTP 连接按顺序提交，见 CheckInService.execute_check_in_group）；
+  定时触发的作业入队后等待 CHECK_IN_COALESCE_WINDOW_SECONDS 再认领，让同一时刻触发的任务都进入同一组
+- 每个进程最多同时执行 CHECK_IN_WORKER_CONCURRENCY 组打卡，执行完成后立即认领下一批
+"""
+
+import os
+import socket
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_, select, update
+
+from backend.config import settings
+from backend.models import CheckInRecord, CheckInTask, User
+from backend.utils.metrics import CHECK_IN_OUTCOMES
+
+logger = logging.getLogger(__name__)
+
+
+def make_worker_id(role: str) -> str:
+    """
+    生成执行进程标识
+
+    Args:
+        role: 进程角色（api / worker）
+
+    Returns:
+        形如 "worker:host:1234" 的标识
+    """
+    return f"{role}:{socket.gethostname()}:{os.getpid()}"
+
+
+class CheckInQueueWorker:
+    """打卡作业队列 worker"""
+
+    def __init__(self, concurrency: Optional[int] = None, role: str = "worker"):
+        """
+        Args:
+            concurrency: 同时执行的打卡组数（默认 CHECK_IN_WORKER_CONCURRENCY）
+            role: 进程角色（api / worker），用于生成执行进程标识
+        """
+        self.concurrency = max(1, concurrency or settings.CHECK_IN_WORKER_CONCURRENCY)
+        self.worker_id = make_worker_id(role)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Set[int] = set()
+        self._groups_in_flight = 0
+        self._lock = threading.Lock()
+        self._last_renewal = 0.0
+        self._notify_timer: Optional[threading.Timer] = None
+
+        # 唤醒事件：有打卡执行完成时立即认领下一批
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def in_flight(self) -> int:
+        """正在执行的打卡数"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def notify(self, coalesce: bool = False) -> None:
+        """
+        有新作业入队时唤醒取件线程
+
+        Args:
+            coalesce: 是否等待合并窗口结束再唤醒（定时触发的作业，同一窗口内的多次通知只唤醒一次）
+        """
+        window = settings.CHECK_IN_COALESCE_WINDOW_SECONDS
+        if not coalesce or window <= 0:
+            self._wakeup.set()
+            return
+
+        with self._lock:
+            if self._notify_timer is not None:
+                return
+            self._notify_timer = threading.Timer(window, self._fire_notify)
+            self._notify_timer.daemon = True
+            self._notify_timer.start()
+
+    def _fire_notify(self) -> None:
+        with self._lock:
+            self._notify_timer = None
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """启动取件线程（重复调用无副作用）"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self.reclaim_expired()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="check-in")
+        self._thread = threading.Thread(target=self._run, name="check-in-queue", daemon=True)
+        self._thread.start()
+        logger.info(f"打卡 worker 已启动 ({self.worker_id})，并发数: {self.concurrency}")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        停止取件并等待正在执行的打卡完成
+
+        Args:
+            timeout: 等待取件线程退出的时间（秒，None 表示一直等待）
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info(f"打卡 worker 已停止 ({self.worker_id})")
+
+    def _run(self) -> None:
+        """取件循环：有空闲执行槽时认领到期作业，然后等待唤醒或轮询超时"""
+        while not self._stop.is_set():
+            try:
+                self.renew_leases()
+                self.process_due()
+            except Exception as e:
+                logger.error(f"打卡作业队列处理异常: {e}", exc_info=True)
+
+            self._wakeup.wait(timeout=settings.CHECK_IN_WORKER_POLL_SECONDS)
+            self._wakeup.clear()
+
+    def process_due(self) -> int:
+        """
+        认领并提交待执行的打卡作业（数量不超过空闲执行槽）
+
+        Returns:
+            本轮提交的作业数
+        """
+        with self._lock:
+            free_slots = self.concurrency - self._groups_in_flight
+        if free_slots <= 0 or self._executor is None:
+            return 0
+
+        groups = self._claim(free_slots)
+        for jobs in groups:
+            with self._lock:
+                self._in_flight.update(record_id for record_id, _, _, _, _ in jobs)
+                self._groups_in_flight += 1
+            self._executor.submit(self._execute, jobs)
+        return sum(len(jobs) for jobs in groups)
+
+    def renew_leases(self) -> int:
+        """
+        为正在执行的作业续租（每 CHECK_IN_LEASE_SECONDS / 3 秒一次）
+
+        Returns:
+            续租的作业数
+        """
+        lease_seconds = settings.CHECK_IN_LEASE_SECONDS
+        if time.monotonic() - self._last_renewal < lease_seconds / 3:
+            return 0
+        self._last_renewal = time.monotonic()
+
+        with self._lock:
+            record_ids = list(self._in_flight)
+        if not record_ids:
+            return 0
+
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            renewed = db.query(CheckInRecord).filter(
+                CheckInRecord.id.in_(record_ids),
+                CheckInRecord.worker_id == self.worker_id
+            ).update({
+                "lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+            }, synchronize_session=False)
+            db.commit()
+            return renewed
+        finally:
+            db.close()
+
+    def reclaim_expired(self) -> int:
+        """
+        释放租约已过期的作业（执行进程崩溃或失联），使其可被重新认领
+
+        Returns:
+            释放的作业数
+        """
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            released = db.query(CheckInRecord).filter(
+                CheckInRecord.status == "pending",
+                CheckInRecord.worker_id.isnot(None),
+                CheckInRecord.lease_expires_at < datetime.now(timezone.utc)
+            ).update({
+                "worker_id": None,
+                "lease_expires_at": None
+            }, synchronize_session=False)
+            db.commit()
+            if released:
+                logger.warning(f"♻️ 释放了 {released} 个租约已过期的打卡作业")
+            return released
+        finally:
+            db.close()
+
+    def _claim(self, limit: int) -> List[List[Tuple[int, int, str, float, int]]]:
+        """
+        原子认领：单条 UPDATE ... RETURNING 把一批到期作业的 worker_id 写为自身标识
+
+        可认领的作业：pending 状态、未被认领或租约已过期、已到重试时间；定时触发的作业还需入队超过合并窗口。
+        先选出最早有到期作业的最多 limit 个用户，再认领这些用户的全部到期作业，按用户分组。
+        PostgreSQL 下子查询加 FOR UPDATE SKIP LOCKED，并发 worker 互不阻塞。
+
+        Args:
+            limit: 最多认领的组数
+
+        Returns:
+            按用户分组的 [[(record_id, task_id, 用户打卡 Token, 入队时刻, 第几次执行)]]，入队时刻已换算为本进程的 time.perf_counter() 基准
+        """
+        from backend.models.database import SessionLocal, engine
+
+        now = datetime.now(timezone.utc)
+        coalesce_before = now - timedelta(seconds=settings.CHECK_IN_COALESCE_WINDOW_SECONDS)
+        due_filter = (
+            CheckInRecord.status == "pending",
+            or_(CheckInRecord.worker_id.is_(None), CheckInRecord.lease_expires_at < now),
+            or_(CheckInRecord.next_attempt_at.is_(None), CheckInRecord.next_attempt_at <= now),
+            or_(CheckInRecord.trigger_type != "scheduled", CheckInRecord.check_in_time <= coalesce_before)
+        )
+        # LIMIT 作用于用户而非作业：单个用户的大量到期作业不会占满本轮的全部执行槽
+        seed_users = select(CheckInTask.user_id).join(
+            CheckInRecord, CheckInRecord.task_id == CheckInTask.id
+        ).where(*due_filter).group_by(CheckInTask.user_id).order_by(
+            func.min(CheckInRecord.check_in_time)
+        ).limit(limit)
+        due = select(CheckInRecord.id).join(
+            CheckInTask, CheckInTask.id == CheckInRecord.task_id
+        ).where(*due_filter, CheckInTask.user_id.in_(seed_users.scalar_subquery()))
+        if engine.dialect.name == "postgresql":
+            due = due.with_for_update(skip_locked=True, of=CheckInRecord)
+
+        db = SessionLocal()
+        try:
+            claimed_ids = db.execute(
+                update(CheckInRecord)
+                .where(CheckInRecord.id.in_(due.scalar_subquery()))
+                .values(
+                    worker_id=self.worker_id,
+                    claimed_at=now,
+                    lease_expires_at=now + timedelta(seconds=settings.CHECK_IN_LEASE_SECONDS),
+                    attempts=CheckInRecord.attempts + 1
+                )
+                .returning(CheckInRecord.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            db.commit()
+            if not claimed_ids:
+                return []
+
+            rows = db.query(
+                CheckInRecord.id, CheckInRecord.task_id, CheckInRecord.check_in_time,
+                CheckInRecord.attempts, CheckInTask.user_id, User.authorization
+            ).join(
+                CheckInTask, CheckInTask.id == CheckInRecord.task_id
+            ).outerjoin(
+                User, User.id == CheckInTask.user_id
+            ).filter(
+                CheckInRecord.id.in_(claimed_ids)
+            ).order_by(CheckInRecord.check_in_time).all()
+
+            groups: Dict[int, List[Tuple[int, int, str, float, int]]] = OrderedDict()
+            exhausted = []
+            for record_id, task_id, created_at, attempts, user_id, user_token in rows:
+                # 租约过期被重新认领的作业也会累加执行次数，超过上限不再执行
+                if attempts > settings.CHECK_IN_MAX_ATTEMPTS:
+                    exhausted.append(record_id)
+                    continue
+
+                # 排队等待耗时按记录创建时间计算（跨进程时 perf_counter 不可比）
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                waited = max(0.0, (now - created_at).total_seconds())
+                groups.setdefault(user_id, []).append(
+                    (record_id, task_id, user_token or "", time.perf_counter() - waited, attempts)
+                )
+
+            if exhausted:
+                db.query(CheckInRecord).filter(
+                    CheckInRecord.id.in_(exhausted),
+                    CheckInRecord.worker_id == self.worker_id
+                ).update({
+                    "status": "failure",
+                    "error_message": f"已执行 {settings.CHECK_IN_MAX_ATTEMPTS} 次仍未完成（执行进程多次中断）"
+                }, synchronize_session=False)
+                db.commit()
+                CHECK_IN_OUTCOMES.inc("failure", amount=len(exhausted))
+                logger.error(f"❌ {len(exhausted)} 个打卡作业超过最大执行次数，已标记失败: {exhausted}")
+            return list(groups.values())
+        finally:
+            db.close()
+
+    def _execute(self, jobs: List[Tuple[int, int, str, float, int]]) -> None:
+        """在执行线程中运行一组打卡（同一用户的多个作业合并执行）"""
+        from backend.services.check_in_service import CheckInService
+
+        try:
+            if len(jobs) == 1:
+                record_id, task_id, user_token, queued_at, attempt = jobs[0]
+                CheckInService.execute_check_in_async(
+                    task_id, record_id, user_token, queued_at,
+                    worker_id=self.worker_id, attempt=attempt
+                )
+            else:
+                CheckInService.execute_check_in_group(
+                    [(task_id, record_id, queued_at, attempt) for record_id, task_id, _, queued_at, attempt in jobs],
+                    jobs[0][2],
+                    worker_id=self.worker_id
+                )
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(record_id for record_id, _, _, _, _ in jobs)
+                self._groups_in_flight -= 1
+            self._wakeup.set()
+
+
+# 全局单例（线程模式下随 API 进程启动）
+check_in_queue_worker = CheckInQueueWorker(role="api")
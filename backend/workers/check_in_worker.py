@@ -1,119 +1,35 @@
 import requests
 import json
-import time
-import os
 import logging
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from backend.config import settings
+from backend.utils.metrics import (
+    CHECK_IN_OUTCOMES,
+    CHECK_IN_SECONDS,
+    CHECK_INS_IN_PROGRESS,
+    EDIT_RECORD_SECONDS,
+    SIGNATURE_CAPTURE_SECONDS,
+    stage_timer,
+)
 
 logger = logging.getLogger(__name__)
 
-# Chrome 配置路径 - 从设置中读取
-CHROME_BINARY_PATH = settings.CHROME_BINARY_PATH
-CHROMEDRIVER_PATH = settings.CHROMEDRIVER_PATH
 
-
-def get_live_x_api_payload(auth_token: str) -> str:
+def get_live_x_api_payload(auth_token: str, timings: Optional[Dict[str, int]] = None) -> str:
     """
-    启动一个临时的无头浏览器会话，获取新鲜的 x-api-request-payload
+    获取新鲜的 x-api-request-payload（由 SIGNATURE_PROVIDER 配置的方式获取，默认启动无头浏览器）
 
     Args:
         auth_token: 用户的 Authorization Token
+        timings: 分阶段耗时字典（可选，写入 browser 和 capture 阶段耗时）
 
     Returns:
         x-api-request-payload 值，失败返回 None
     """
-    logger.info("正在启动临时浏览器会话以监听网络日志...")
-
-    # 根据配置创建 Service
-    if CHROMEDRIVER_PATH:
-        service = Service(executable_path=CHROMEDRIVER_PATH)
-    else:
-        service = Service()  # 使用 Selenium Manager 自动管理
-
-    chrome_options = Options()
-
-    # 如果配置了 Chrome 路径，则使用配置的路径
-    if CHROME_BINARY_PATH:
-        chrome_options.binary_location = CHROME_BINARY_PATH
-
-    # 开启性能日志记录功能
-    logging_prefs = {'performance': 'ALL'}
-    chrome_options.set_capability('goog:loggingPrefs', logging_prefs)
-
-    # Headless 模式配置
-    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36"
-    chrome_options.add_argument(f'user-agent={user_agent}')
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument('--ignore-certificate-errors')
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-
-    payload_signature = None
-    try:
-        # 导航到同源空白页，用于设置 Cookie
-        driver.get("https://i.jielong.com/my-class")
-
-        # 注入长期 Token
-        driver.add_cookie({
-            'name': 'token',
-            'value': auth_token,
-            'domain': '.jielong.com'
-        })
-
-        # 导航到触发 API 的页面
-        driver.get("https://i.jielong.com/my-form")
-
-        # 等待并捕获 x-api-request-payload
-        max_wait_time = 20  # 最多等待20秒
-        start_time = time.time()
-        found = False
-
-        while time.time() - start_time < max_wait_time:
-            logs = driver.get_log('performance')
-            for entry in logs:
-                log = json.loads(entry['message'])['message']
-                if log['method'] == 'Network.requestWillBeSent':
-                    headers = log.get('params', {}).get('request', {}).get('headers', {})
-                    headers_lower = {k.lower(): v for k, v in headers.items()}
-                    if 'x-api-request-payload' in headers_lower:
-                        payload_signature = headers_lower['x-api-request-payload']
-                        logger.info("成功通过网络日志捕获到现场的 x-api-request-payload！")
-                        found = True
-                        break
-            if found:
-                break
-            time.sleep(1)
-
-        if not payload_signature:
-            raise Exception(f"在 {max_wait_time} 秒内未能通过网络日志捕获到 x-api-request-payload。")
+    from backend.workers.signature_provider import get_signature_provider
 
-    except Exception as e:
-        logger.error(f"获取现场 x-api-request-payload 时失败: {e}")
-        try:
-            debug_screenshot = os.path.join(settings.BASE_DIR, 'payload_debug.png')
-            driver.save_screenshot(debug_screenshot)
-        except Exception as screenshot_error:
-            logger.warning(f"保存调试截图失败: {screenshot_error}")
-
-    finally:
-        # 优雅关闭 WebDriver，避免 Windows asyncio ConnectionResetError
-        try:
-            driver.quit()
-        except Exception as e:
-            # 忽略 WebDriver 关闭时的连接错误（Windows 平台常见问题）
-            if "WinError 10054" not in str(e) and "ConnectionResetError" not in str(e):
-                logger.warning(f"关闭 WebDriver 时出现警告: {e}")
-
-    return payload_signature
+    return get_signature_provider().get_signature(auth_token, timings)
 
 
 def perform_check_in(task, user_token: str) -> Dict[str, Any]:
@@ -130,12 +46,103 @@ def perform_check_in(task, user_token: str) -> Dict[str, Any]:
             - status: 状态 (success/failure)
             - response_text: 响应文本
             - error_message: 错误信息
+            - transient: 是否为暂时性失败（网络错误、签名获取失败等，可重试），仅失败时可能出现
+            - timings: 分阶段耗时（毫秒）{browser, capture, http, notify}，未经过的阶段不包含
+    """
+    timings: Dict[str, int] = {}
+    with CHECK_INS_IN_PROGRESS.track(), CHECK_IN_SECONDS.time():
+        result = _perform_check_in(task, user_token, timings)
+
+    # 打卡未成功时作废预热签名，重试时重新获取
+    if not result["success"]:
+        _invalidate_prewarmed_signature(user_token)
+
+    CHECK_IN_OUTCOMES.inc(result["status"])
+    result["timings"] = timings
+    return result
+
+
+def perform_check_ins(tasks: List[Any], user_token: str) -> List[Dict[str, Any]]:
+    """
+    合并执行同一用户的多个打卡任务：只获取一次签名，复用同一个 HTTP 连接按顺序提交
+
+    Args:
+        tasks: 同一用户的 CheckInTask 对象列表
+        user_token: 用户的 Authorization Token
+
+    Returns:
+        与 tasks 一一对应的打卡结果（格式同 perform_check_in，签名获取耗时计入第一个任务）
+    """
+    shared_timings: Dict[str, int] = {}
+    payload_signature = _acquire_signature(user_token, shared_timings) if user_token and tasks else None
+
+    results = []
+    with requests.Session() as http:
+        for index, task in enumerate(tasks):
+            timings = dict(shared_timings) if index == 0 else {}
+            with CHECK_INS_IN_PROGRESS.track(), CHECK_IN_SECONDS.time():
+                result = _perform_check_in(task, user_token, timings, payload_signature, http)
+            CHECK_IN_OUTCOMES.inc(result["status"])
+            result["timings"] = timings
+            results.append(result)
+
+    if any(not result["success"] for result in results):
+        _invalidate_prewarmed_signature(user_token)
+    return results
+
+
+def _acquire_signature(user_token: str, timings: Dict[str, int]) -> Optional[str]:
+    """获取 x-api-request-payload（优先使用定时打卡高峰前预热的签名）"""
+    if settings.SIGNATURE_PREWARM_MINUTES > 0:
+        from backend.services.signature_cache import SignatureCache
+        payload_signature = SignatureCache.get(user_token)
+        if payload_signature:
+            logger.info("使用预热签名")
+            return payload_signature
+
+    with SIGNATURE_CAPTURE_SECONDS.time():
+        return get_live_x_api_payload(user_token, timings)
+
+
+def _invalidate_prewarmed_signature(user_token: str) -> None:
+    """作废预热签名（打卡未成功时调用）"""
+    if not user_token or settings.SIGNATURE_PREWARM_MINUTES <= 0:
+        return
+
+    from backend.services.signature_cache import SignatureCache
+    try:
+        SignatureCache.invalidate(user_token)
+    except Exception as e:
+        logger.error(f"作废预热签名失败: {e}")
+
+
+# 未预先获取签名（由 _perform_check_in 自行获取）
+_FETCH_SIGNATURE = object()
+
+
+def _perform_check_in(
+    task,
+    user_token: str,
+    timings: Dict[str, int],
+    payload_signature: Any = _FETCH_SIGNATURE,
+    http: Any = requests
+) -> Dict[str, Any]:
+    """
+    执行打卡任务（perform_check_in 的实现，不含指标统计）
+
+    Args:
+        task: CheckInTask 对象
+        user_token: 用户的 Authorization Token
+        timings: 分阶段耗时字典
+        payload_signature: 已获取的签名（合并打卡时共用，None 表示获取失败；默认由本函数获取）
+        http: 发送请求的对象（requests 模块或复用连接的 requests.Session）
     """
     # 从 payload_config 中提取 Signature 用于日志
-    from backend.utils.json_helpers import safe_parse_payload, extract_signature
+    from backend.utils.json_helpers import safe_parse_payload
 
-    payload_dict = safe_parse_payload(task.payload_config)
-    signature = extract_signature(task.payload_config) or 'Unknown'
+    # 只解析一次 payload_config，后续复用
+    payload = safe_parse_payload(task.payload_config)
+    signature = payload.get('Signature') or 'Unknown'
 
     logger.info(f"Selenium打卡: 正在为任务 ID: {task.id} (Signature: {signature}) 执行打卡...")
 
@@ -150,7 +157,8 @@ def perform_check_in(task, user_token: str) -> Dict[str, Any]:
         }
 
     # 获取 x-api-request-payload
-    payload_signature = get_live_x_api_payload(user_token)
+    if payload_signature is _FETCH_SIGNATURE:
+        payload_signature = _acquire_signature(user_token, timings)
     if not payload_signature:
         error_msg = f"任务 ID: {task.id} (Signature: {signature}) 未能获取到现场签名，打卡中止。"
         logger.error(error_msg)
@@ -158,15 +166,13 @@ def perform_check_in(task, user_token: str) -> Dict[str, Any]:
             "success": False,
             "status": "failure",
             "response_text": "",
-            "error_message": error_msg
+            "error_message": error_msg,
+            "transient": True
         }
 
     try:
         # 使用任务的 payload_config（从模板生成的完整配置，包含 ThreadId）
-        from backend.utils.json_helpers import safe_parse_payload, extract_thread_id
-
-        payload = safe_parse_payload(task.payload_config)
-        thread_id = extract_thread_id(task.payload_config)
+        thread_id = payload.get('ThreadId')
 
         if not thread_id:
             error_msg = f"任务 ID: {task.id} 的 payload_config 缺少 ThreadId"
@@ -190,7 +196,7 @@ def perform_check_in(task, user_token: str) -> Dict[str, Any]:
             'x-api-request-mode': "cors",
         }
 
-        url = "https://api.jielong.com/api/CheckIn/EditRecord"
+        url = settings.jielong_edit_record_url
 
         # 打印请求详情用于调试
         payload_json = json.dumps(payload, ensure_ascii=False)
@@ -199,7 +205,8 @@ def perform_check_in(task, user_token: str) -> Dict[str, Any]:
         logger.info(f"📦 Payload: {payload_json}")
         logger.info(f"🔑 x-api-request-payload: {payload_signature[:50]}...")
 
-        response = requests.post(url, data=payload_json, headers=headers)
+        with EDIT_RECORD_SECONDS.time(), stage_timer(timings, "http"):
+            response = http.post(url, data=payload_json, headers=headers)
         response.raise_for_status()
         response_text = response.text
 
@@ -217,7 +224,8 @@ def perform_check_in(task, user_token: str) -> Dict[str, Any]:
                         'thread_id': payload.get('ThreadId', '未知'),
                         'name': getattr(task, 'name', '打卡任务')
                     }
-                    EmailService.notify_check_in_result(task.user, task_info, True, "打卡成功")
+                    with stage_timer(timings, "notify"):
+                        EmailService.notify_check_in_result(task.user, task_info, True, "打卡成功")
                 except Exception as e:
                     logger.error(f"发送打卡成功邮件失败: {e}")
 
@@ -268,7 +276,8 @@ def perform_check_in(task, user_token: str) -> Dict[str, Any]:
                     task_info = build_task_info(task)
 
                     # 只发送打卡失败通知（内容已说明Token失效）
-                    EmailService.notify_check_in_result(task.user, task_info, False, "Token 已失效，需要重新授权")
+                    with stage_timer(timings, "notify"):
+                        EmailService.notify_check_in_result(task.user, task_info, False, "Token 已失效，需要重新授权")
                 except Exception as e:
                     logger.error(f"发送打卡失败邮件失败: {e}")
 
@@ -303,7 +312,9 @@ def perform_check_in(task, user_token: str) -> Dict[str, Any]:
             "success": False,
             "status": "failure",
             "response_text": response_text,
-            "error_message": str(e)
+            "error_message": str(e),
+            # 连接失败、超时、限流和服务端错误可以重试
+            "transient": e.response is None or e.response.status_code == 429 or e.response.status_code >= 500
         }
 
     except Exception as e:
@@ -2,19 +2,19 @@
 邮件发送引擎 (底层)
 
 职能：提供基础的 SMTP 邮件发送功能
-- SMTP 服务器连接
+- SMTP 服务器连接（通过 smtp_pool 复用）
 - 邮件发送
 - 配置管理
 - 不包含业务逻辑
 """
 
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
 from typing import List, Optional
 
 from backend.config import settings
+from backend.workers.smtp_pool import smtp_pool
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +53,7 @@ class EmailNotifier:
         to_emails: List[str],
         subject: str,
         html_content: str,
+        text_content: Optional[str] = None,
         from_email: Optional[str] = None
     ) -> bool:
         """
@@ -62,6 +63,7 @@ class EmailNotifier:
             to_emails: 收件人邮箱列表
             subject: 邮件主题
             html_content: HTML 邮件内容
+            text_content: 纯文本邮件内容（可选，作为 HTML 的替代版本）
             from_email: 发件人邮箱（可选，默认使用配置中的发件人）
 
         Returns:
@@ -79,26 +81,16 @@ class EmailNotifier:
             msg['To'] = ', '.join(to_emails)
             msg['Subject'] = subject
 
+            # 添加纯文本正文（multipart/alternative 中靠后的部分优先显示，纯文本放在 HTML 之前）
+            if text_content:
+                msg.attach(MIMEText(text_content, 'plain', 'utf-8'))
+
             # 添加 HTML 正文
             html_part = MIMEText(html_content, 'html', 'utf-8')
             msg.attach(html_part)
 
-            # 连接 SMTP 服务器并发送
-            if email_config.get('use_ssl', True):
-                server = smtplib.SMTP_SSL(
-                    email_config['smtp_server'],
-                    int(email_config['smtp_port'])
-                )
-            else:
-                server = smtplib.SMTP(
-                    email_config['smtp_server'],
-                    int(email_config['smtp_port'])
-                )
-                server.starttls()
-
-            server.login(email_config['sender_email'], email_config['sender_password'])
-            server.sendmail(msg['From'], to_emails, msg.as_string())
-            server.quit()
+            # 通过连接池发送（复用已认证的连接）
+            smtp_pool.send(email_config, msg['From'], to_emails, msg.as_string())
 
             logger.info(f"邮件发送成功: {subject} -> {', '.join(to_emails)}")
             return True
@@ -0,0 +1,280 @@
+"""
+邮件发件箱后台发送线程
+
+职能：将邮件发送从业务调用链中解耦
+- enqueue: 把邮件写入 email_outbox 表后立即返回
+- 后台线程按到期时间取件，通过 EmailNotifier 经 SMTP 连接池发送
+- 连接池允许多个连接时，同一批邮件并行发送
+- 失败按指数退避重试，超过最大次数标记为 failed
+- 多进程部署时通过条件 UPDATE 原子认领，避免重复发送
+- 认领时写入租约到期时间，进程中断后遗留在 sending 状态的邮件在租约到期后由任一发送线程重新入队
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from backend.config import settings
+from backend.models import EmailOutbox
+from backend.workers.email_notifier import EmailNotifier
+from backend.workers.smtp_pool import smtp_pool
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxWorker:
+    """邮件发件箱发送线程"""
+
+    def __init__(self):
+        # 唤醒事件：有新邮件入队时立即唤醒发送线程
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, to_emails: List[str], subject: str, html_content: str, text_content: Optional[str] = None) -> bool:
+        """
+        将邮件写入发件箱并立即返回
+
+        Args:
+            to_emails: 收件人邮箱列表
+            subject: 邮件主题
+            html_content: HTML 邮件内容
+            text_content: 纯文本邮件内容（可选）
+
+        Returns:
+            是否入队成功（邮件功能未配置时返回 False）
+        """
+        if not EmailNotifier.is_email_enabled():
+            logger.warning("邮件配置不完整，跳过发送邮件")
+            return False
+
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            item = EmailOutbox(
+                to_emails=json.dumps(to_emails, ensure_ascii=False),
+                subject=subject,
+                html_content=html_content,
+                text_content=text_content,
+                status="pending",
+            )
+            db.add(item)
+            db.commit()
+            logger.info(f"📨 邮件已入队 (ID: {item.id}): {subject} -> {', '.join(to_emails)}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"邮件入队失败: {e}")
+            return False
+        finally:
+            db.close()
+
+        self._wakeup.set()
+        return True
+
+    def start(self) -> None:
+        """启动后台发送线程（重复调用无副作用）"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+        logger.info("邮件发件箱发送线程已启动")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """停止后台发送线程"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+            logger.info("邮件发件箱发送线程已停止")
+        smtp_pool.close_all()
+
+    def _run(self) -> None:
+        """发送循环：处理所有到期邮件，然后等待唤醒或轮询超时"""
+        while not self._stop.is_set():
+            try:
+                self._reclaim_stale()
+                self.process_due()
+            except Exception as e:
+                logger.error(f"邮件发件箱处理异常: {e}", exc_info=True)
+
+            # 关闭空闲过久的 SMTP 连接，避免长期占用服务器连接
+            smtp_pool.close_idle()
+
+            self._wakeup.wait(timeout=settings.EMAIL_OUTBOX_POLL_SECONDS)
+            self._wakeup.clear()
+
+    def process_due(self, batch_size: int = 50) -> int:
+        """
+        发送所有到期的待发邮件
+
+        每次认领 SMTP_POOL_SIZE 封，经连接池并行发送后统一记录结果
+
+        Args:
+            batch_size: 每轮最多处理的邮件数
+
+        Returns:
+            本轮发送成功的邮件数
+        """
+        from backend.models.database import SessionLocal
+
+        sent_count = 0
+        chunk_size = max(1, settings.SMTP_POOL_SIZE)
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            due_ids = [
+                item_id for (item_id,) in db.query(EmailOutbox.id).filter(
+                    EmailOutbox.status == "pending",
+                    EmailOutbox.next_attempt_at <= now
+                ).order_by(EmailOutbox.next_attempt_at).limit(batch_size).all()
+            ]
+
+            for i in range(0, len(due_ids), chunk_size):
+                if self._stop.is_set():
+                    break
+
+                items = self._claim(due_ids[i:i + chunk_size], db)
+                if not items:
+                    continue
+
+                results = self._send_chunk(items)
+                for item, success in zip(items, results):
+                    self._record_result(item, success)
+                    if success:
+                        sent_count += 1
+                db.commit()
+        finally:
+            db.close()
+
+        return sent_count
+
+    def _claim(self, item_ids: List[int], db) -> List[EmailOutbox]:
+        """
+        原子认领：只有从 pending 成功改为 sending 的进程才负责发送
+
+        Returns:
+            认领成功的邮件列表
+        """
+        items = []
+        now = datetime.now(timezone.utc)
+        for item_id in item_ids:
+            claimed = db.query(EmailOutbox).filter(
+                EmailOutbox.id == item_id,
+                EmailOutbox.status == "pending"
+            ).update({
+                "status": "sending",
+                "next_attempt_at": now,
+                "lease_expires_at": now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+            }, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                continue
+
+            item = db.query(EmailOutbox).filter(EmailOutbox.id == item_id).first()
+            if item:
+                items.append(item)
+        return items
+
+    @staticmethod
+    def _send_chunk(items: List[EmailOutbox]) -> List[bool]:
+        """
+        发送一组邮件，连接池允许多个连接时并行发送
+
+        工作线程只做 SMTP I/O，不访问数据库会话
+        """
+        messages = [
+            (json.loads(str(item.to_emails)), str(item.subject), str(item.html_content), item.text_content)
+            for item in items
+        ]
+
+        if len(messages) == 1:
+            return [EmailNotifier.send_email(*messages[0])]
+
+        with ThreadPoolExecutor(max_workers=len(messages), thread_name_prefix="smtp-send") as executor:
+            return list(executor.map(lambda args: EmailNotifier.send_email(*args), messages))
+
+    def _record_result(self, item: EmailOutbox, success: bool) -> None:
+        """记录单封邮件的发送结果（由调用方提交）"""
+        item.attempts = (item.attempts or 0) + 1
+        item.lease_expires_at = None
+
+        if success:
+            item.status = "sent"
+            item.sent_at = datetime.now(timezone.utc)
+            item.last_error = ""
+        elif item.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            item.status = "failed"
+            item.last_error = f"已达到最大重试次数 {settings.EMAIL_OUTBOX_MAX_ATTEMPTS}"
+            logger.error(f"❌ 邮件发送最终失败 (ID: {item.id}): {item.subject}")
+        else:
+            delay = self._backoff_seconds(item.attempts)
+            item.status = "pending"
+            item.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            item.last_error = "SMTP 发送失败"
+            logger.warning(f"邮件发送失败 (ID: {item.id})，第 {item.attempts} 次，{delay} 秒后重试")
+
+    @staticmethod
+    def _backoff_seconds(attempts: int) -> int:
+        """指数退避：base * 2^(attempts-1)，上限 1 小时"""
+        return min(settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1)), 3600)
+
+    def purge_sent(self) -> int:
+        """
+        删除超过保留期的已发送邮件
+
+        Returns:
+            删除的邮件数
+        """
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+            deleted = db.query(EmailOutbox).filter(
+                EmailOutbox.status == "sent",
+                EmailOutbox.sent_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def _reclaim_stale(self) -> None:
+        """将租约已到期的 sending 状态邮件（发送进程已中断）重新放回队列"""
+        from sqlalchemy import and_, or_
+        from backend.models.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            reclaimed = db.query(EmailOutbox).filter(
+                EmailOutbox.status == "sending",
+                or_(
+                    EmailOutbox.lease_expires_at < now,
+                    # 迁移前认领的邮件没有租约，按认领时间判断
+                    and_(
+                        EmailOutbox.lease_expires_at.is_(None),
+                        EmailOutbox.next_attempt_at < now - timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+                    )
+                )
+            ).update({"status": "pending", "lease_expires_at": None}, synchronize_session=False)
+            db.commit()
+            if reclaimed:
+                logger.info(f"重新入队 {reclaimed} 封中断的邮件")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"回收中断邮件失败: {e}")
+        finally:
+            db.close()
+
+
+# 全局单例
+email_outbox_worker = EmailOutboxWorker()
@@ -0,0 +1,220 @@
+"""
+打卡签名（x-api-request-payload）获取
+
+签名由接龙网页端的前端脚本生成，获取方式通过 SIGNATURE_PROVIDER 配置选择：
+- selenium: 启动无头浏览器打开表单页，从网络日志中捕获请求头（生产环境）
+- stub: 不启动浏览器，直接请求表单页并读取响应头中的签名（仅本地替身服务 benchmarks/fake_jielong.py 支持），
+        用于全速压测打卡引擎
+"""
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Type
+
+import requests
+
+from backend.config import settings
+from backend.utils.metrics import CHROME_INSTANCES, stage_timer
+
+logger = logging.getLogger(__name__)
+
+# 签名请求头名称
+SIGNATURE_HEADER = "x-api-request-payload"
+
+
+class SignatureProvider:
+    """签名获取方式基类"""
+
+    name = ""
+
+    def get_signature(self, auth_token: str, timings: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """
+        获取新鲜的 x-api-request-payload
+
+        Args:
+            auth_token: 用户的 Authorization Token
+            timings: 分阶段耗时字典（可选，写入 browser 和 capture 阶段耗时）
+
+        Returns:
+            签名，失败返回 None
+        """
+        raise NotImplementedError
+
+
+class SeleniumSignatureProvider(SignatureProvider):
+    """启动临时的无头浏览器会话，从网络日志中捕获签名"""
+
+    name = "selenium"
+
+    # 最多等待签名出现的时间（秒）
+    max_wait_time = 20
+
+    def get_signature(self, auth_token: str, timings: Optional[Dict[str, int]] = None) -> Optional[str]:
+        # Selenium 只在实际启动浏览器时导入（stub 模式和 API 进程不加载）
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+
+        logger.info("正在启动临时浏览器会话以监听网络日志...")
+        web_base_url = settings.JIELONG_WEB_BASE_URL.rstrip("/")
+
+        # 根据配置创建 Service
+        if settings.CHROMEDRIVER_PATH:
+            service = Service(executable_path=settings.CHROMEDRIVER_PATH)
+        else:
+            service = Service()  # 使用 Selenium Manager 自动管理
+
+        chrome_options = Options()
+
+        # 如果配置了 Chrome 路径，则使用配置的路径
+        if settings.CHROME_BINARY_PATH:
+            chrome_options.binary_location = settings.CHROME_BINARY_PATH
+
+        # 开启性能日志记录功能
+        logging_prefs = {'performance': 'ALL'}
+        chrome_options.set_capability('goog:loggingPrefs', logging_prefs)
+
+        # Headless 模式配置
+        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36"
+        chrome_options.add_argument(f'user-agent={user_agent}')
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument('--ignore-certificate-errors')
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+
+        with stage_timer(timings, "browser"):
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+        CHROME_INSTANCES.inc()
+
+        payload_signature = None
+        capture_start = time.perf_counter()
+        try:
+            # 导航到同源空白页，用于设置 Cookie
+            driver.get(f"{web_base_url}/my-class")
+
+            # 注入长期 Token（未配置域名时使用当前页面的主机名）
+            cookie = {'name': 'token', 'value': auth_token}
+            if settings.JIELONG_COOKIE_DOMAIN:
+                cookie['domain'] = settings.JIELONG_COOKIE_DOMAIN
+            driver.add_cookie(cookie)
+
+            # 导航到触发 API 的页面
+            driver.get(f"{web_base_url}/my-form")
+
+            # 等待并捕获 x-api-request-payload
+            start_time = time.time()
+            found = False
+
+            while time.time() - start_time < self.max_wait_time:
+                logs = driver.get_log('performance')
+                for entry in logs:
+                    log = json.loads(entry['message'])['message']
+                    if log['method'] == 'Network.requestWillBeSent':
+                        headers = log.get('params', {}).get('request', {}).get('headers', {})
+                        headers_lower = {k.lower(): v for k, v in headers.items()}
+                        if SIGNATURE_HEADER in headers_lower:
+                            payload_signature = headers_lower[SIGNATURE_HEADER]
+                            logger.info("成功通过网络日志捕获到现场的 x-api-request-payload！")
+                            found = True
+                            break
+                if found:
+                    break
+                time.sleep(1)
+
+            if not payload_signature:
+                raise Exception(f"在 {self.max_wait_time} 秒内未能通过网络日志捕获到 x-api-request-payload。")
+
+        except Exception as e:
+            logger.error(f"获取现场 x-api-request-payload 时失败: {e}")
+            try:
+                debug_screenshot = os.path.join(settings.BASE_DIR, 'payload_debug.png')
+                driver.save_screenshot(debug_screenshot)
+            except Exception as screenshot_error:
+                logger.warning(f"保存调试截图失败: {screenshot_error}")
+
+        finally:
+            if timings is not None:
+                timings["capture"] = int((time.perf_counter() - capture_start) * 1000)
+
+            # 优雅关闭 WebDriver，避免 Windows asyncio ConnectionResetError
+            try:
+                driver.quit()
+            except Exception as e:
+                # 忽略 WebDriver 关闭时的连接错误（Windows 平台常见问题）
+                if "WinError 10054" not in str(e) and "ConnectionResetError" not in str(e):
+                    logger.warning(f"关闭 WebDriver 时出现警告: {e}")
+            CHROME_INSTANCES.dec()
+
+        return payload_signature
+
+
+class StubSignatureProvider(SignatureProvider):
+    """不启动浏览器，直接请求表单页读取响应头中的签名（仅本地替身服务支持）"""
+
+    name = "stub"
+
+    def __init__(self):
+        # 复用连接，压测时避免每次打卡重新建立 TCP 连接
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=64)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def get_signature(self, auth_token: str, timings: Optional[Dict[str, int]] = None) -> Optional[str]:
+        url = f"{settings.JIELONG_WEB_BASE_URL.rstrip('/')}/my-form"
+        try:
+            with stage_timer(timings, "capture"):
+                response = self._session.get(url, cookies={"token": auth_token}, timeout=30)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"通过 stub 获取 x-api-request-payload 失败: {e}")
+            return None
+
+        payload_signature = response.headers.get(SIGNATURE_HEADER)
+        if not payload_signature:
+            logger.error(f"{url} 的响应头中没有 x-api-request-payload（stub 仅适用于本地替身服务）")
+        return payload_signature
+
+
+# 已注册的签名获取方式
+_PROVIDERS: Dict[str, Type[SignatureProvider]] = {
+    SeleniumSignatureProvider.name: SeleniumSignatureProvider,
+    StubSignatureProvider.name: StubSignatureProvider,
+}
+
+# 已创建的实例（按名称缓存）
+_instances: Dict[str, SignatureProvider] = {}
+
+
+def register_signature_provider(provider_class: Type[SignatureProvider]) -> None:
+    """
+    注册自定义签名获取方式（注册后可通过 SIGNATURE_PROVIDER=<name> 启用）
+
+    Args:
+        provider_class: SignatureProvider 子类
+    """
+    _PROVIDERS[provider_class.name] = provider_class
+    _instances.pop(provider_class.name, None)
+
+
+def get_signature_provider() -> SignatureProvider:
+    """
+    获取当前配置的签名获取方式
+
+    Returns:
+        SignatureProvider 实例
+
+    Raises:
+        ValueError: SIGNATURE_PROVIDER 不是已注册的名称
+    """
+    name = settings.SIGNATURE_PROVIDER.strip().lower()
+    provider = _instances.get(name)
+    if provider is None:
+        provider_class = _PROVIDERS.get(name)
+        if provider_class is None:
+            raise ValueError(f"未知的签名获取方式: {name}（可选: {', '.join(_PROVIDERS)}）")
+        provider = _instances.setdefault(name, provider_class())
+    return provider
@@ -0,0 +1,158 @@
+"""
+SMTP 连接池 (底层)
+
+职能：复用已认证的 SMTP 连接，避免每封邮件都重新握手 TCP/TLS 并 AUTH
+- 空闲超时的连接在取用时透明重连
+- 单个连接发送达到上限后主动关闭，避免被服务商断开
+- 可同时持有多个并行连接（由 SMTP_POOL_SIZE 控制）
+"""
+
+import time
+import smtplib
+import threading
+import logging
+from contextlib import contextmanager
+from typing import List, Optional
+
+from backend.config import settings
+from backend.utils.metrics import SMTP_SEND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    """池中的单个 SMTP 连接"""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.last_used = time.monotonic()
+        self.sent_count = 0
+
+    def close(self) -> None:
+        try:
+            self.server.quit()
+        except Exception:
+            # 连接可能已被服务器关闭，忽略
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """SMTP 连接池"""
+
+    def __init__(self, max_connections: int = 1, max_messages_per_connection: int = 100, idle_timeout: float = 60):
+        self._max_messages = max_messages_per_connection
+        self._idle_timeout = idle_timeout
+
+        # 限制同时持有的连接数
+        self._slots = threading.BoundedSemaphore(max(1, max_connections))
+
+        # 空闲连接（后进先出，优先复用最近使用的连接）
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self, email_config: dict) -> _PooledConnection:
+        """建立并认证新的 SMTP 连接"""
+        if email_config.get('use_ssl', True):
+            server = smtplib.SMTP_SSL(email_config['smtp_server'], int(email_config['smtp_port']), timeout=30)
+        else:
+            server = smtplib.SMTP(email_config['smtp_server'], int(email_config['smtp_port']), timeout=30)
+            server.starttls()
+
+        server.login(email_config['sender_email'], email_config['sender_password'])
+        logger.debug(f"已建立 SMTP 连接: {email_config['smtp_server']}:{email_config['smtp_port']}")
+        return _PooledConnection(server)
+
+    def _take_idle(self) -> Optional[_PooledConnection]:
+        """取出一个仍然可用的空闲连接"""
+        with self._lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if time.monotonic() - conn.last_used < self._idle_timeout:
+                    return conn
+                # 空闲过久，服务器大概率已断开，直接丢弃
+                conn.close()
+        return None
+
+    @contextmanager
+    def connection(self, email_config: dict):
+        """
+        借出一个已认证的 SMTP 连接
+
+        出现异常时连接会被丢弃，正常归还时按发送上限决定是否保留
+        """
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._take_idle() or self._connect(email_config)
+            yield conn
+        except Exception:
+            if conn:
+                conn.close()
+                conn = None
+            raise
+        finally:
+            if conn:
+                conn.last_used = time.monotonic()
+                if conn.sent_count >= self._max_messages:
+                    conn.close()
+                else:
+                    with self._lock:
+                        self._idle.append(conn)
+            self._slots.release()
+
+    def send(self, email_config: dict, from_email: str, to_emails: List[str], message: str) -> None:
+        """
+        通过池中连接发送一封邮件
+
+        复用的连接如果已被服务器断开，会自动重连并重试一次
+
+        Raises:
+            smtplib.SMTPException / OSError: 发送失败
+        """
+        with SMTP_SEND_SECONDS.time():
+            for attempt in range(2):
+                try:
+                    with self.connection(email_config) as conn:
+                        conn.server.sendmail(from_email, to_emails, message)
+                        conn.sent_count += 1
+                    return
+                except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                    if attempt == 0:
+                        logger.info(f"SMTP 连接已断开，重新连接后重试: {e}")
+                        continue
+                    raise
+
+    def close_idle(self) -> int:
+        """
+        关闭超过空闲超时的连接
+
+        Returns:
+            关闭的连接数
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [c for c in self._idle if now - c.last_used >= self._idle_timeout]
+            self._idle = [c for c in self._idle if now - c.last_used < self._idle_timeout]
+
+        for conn in expired:
+            conn.close()
+        return len(expired)
+
+    def close_all(self) -> None:
+        """关闭所有空闲连接"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for conn in idle:
+            conn.close()
+
+
+# 全局单例
+smtp_pool = SMTPConnectionPool(
+    max_connections=settings.SMTP_POOL_SIZE,
+    max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS,
+)
@@ -2,13 +2,6 @@ import os
 import logging
 import json
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
 from filelock import FileLock
 
 from backend.config import settings
@@ -147,6 +140,15 @@ def get_token_headless(session_id: str, jwt_sub: str = None, alias: str = None,
         alias: 用户别名（用于新用户注册）
         client_ip: 客户端 IP 地址
     """
+    # Selenium 只在扫码登录线程中导入，API 进程启动时不加载
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
     driver = None
     current_step = "初始化"
 
@@ -195,7 +197,7 @@ def get_token_headless(session_id: str, jwt_sub: str = None, alias: str = None,
         logger.info(f"Selenium ({session_id}): Chrome 浏览器启动成功")
         current_step = "导航到登录页面"
         logger.info(f"Selenium ({session_id}): {current_step}...")
-        driver.get("https://i.jielong.com/login?redirectTo=https%3A%2F%2Fi.jielong.com%2F")
+        driver.get(settings.jielong_login_url)
 
         wait = WebDriverWait(driver, 60)
 
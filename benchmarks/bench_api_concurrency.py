@@ -0,0 +1,155 @@
+"""
+API 并发吞吐基准测试
+
+对比两种执行模型在并发请求下的吞吐量：
+- legacy: async def 端点内直接执行同步阻塞操作（数据库查询 + 模拟的外部 I/O），整个事件循环被串行化
+- threadpool: 普通 def 端点，由 FastAPI 放入大小受 API_THREADPOOL_SIZE 限制的线程池执行
+
+另外对真实应用的热点读接口（/api/tasks/、/api/users/me）施压，
+可在改动前后的代码上分别运行以对比结果。
+
+注意：legacy 模式下并发度超过数据库连接池容量（SQLite 默认 5 + 10）时，
+事件循环会阻塞在连接池等待上，而归还连接的依赖清理又需要事件循环调度，
+请求会一直卡到连接池超时（30 秒）——这正是改为线程池模型的原因之一。
+
+运行方式：
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_api_concurrency --requests 200 --concurrency 10 --io-ms 20
+"""
+import argparse
+import asyncio
+import time
+from typing import List, Dict, Any
+
+from benchmarks.common import setup_isolated_env, summarize, print_results
+
+setup_isolated_env()
+
+import httpx  # noqa: E402
+from anyio import to_thread  # noqa: E402
+from fastapi import FastAPI, Depends  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from backend.config import settings  # noqa: E402
+from backend.models import get_db, init_db, User, CheckInTask  # noqa: E402
+from backend.models.database import SessionLocal  # noqa: E402
+from backend.utils.jwt import JWTManager  # noqa: E402
+
+
+def seed_database(user_count: int, tasks_per_user: int) -> List[str]:
+    """
+    写入测试用户和任务
+
+    Returns:
+        每个用户的 JWT access token 列表
+    """
+    init_db()
+    db = SessionLocal()
+    try:
+        tokens = []
+        for i in range(user_count):
+            user = User(alias=f"bench_user_{i}", role="user", is_approved=True, jwt_exp="0")
+            db.add(user)
+            db.flush()
+            for j in range(tasks_per_user):
+                db.add(CheckInTask(
+                    user_id=user.id,
+                    payload_config=f'{{"ThreadId": "bench-{i}-{j}", "Signature": "user {i}"}}',
+                    name=f"bench task {i}-{j}",
+                ))
+            tokens.append(JWTManager.create_access_token(user.id, user.alias))
+        db.commit()
+        return tokens
+    finally:
+        db.close()
+
+
+def build_synthetic_app(io_ms: float) -> FastAPI:
+    """构造对比用的最小应用：同一段阻塞逻辑分别以 async def 和 def 暴露"""
+    app = FastAPI()
+
+    def blocking_work(db: Session) -> int:
+        count = db.query(CheckInTask).count()
+        time.sleep(io_ms / 1000)  # 模拟 Selenium / SMTP / 远程数据库等阻塞 I/O
+        return count
+
+    @app.get("/legacy")
+    async def legacy(db: Session = Depends(get_db)):
+        return {"count": blocking_work(db)}
+
+    @app.get("/threadpool")
+    def threadpool(db: Session = Depends(get_db)):
+        return {"count": blocking_work(db)}
+
+    return app
+
+
+async def run_load(
+    app: FastAPI,
+    name: str,
+    paths: List[str],
+    headers_list: List[Dict[str, str]],
+    total_requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """以固定并发度对应用发起请求并统计延迟"""
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total_requests))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                path = paths[i % len(paths)]
+                headers = headers_list[i % len(headers_list)] if headers_list else {}
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return summarize(name, latencies, elapsed, errors)
+
+
+async def main(args: argparse.Namespace) -> None:
+    tokens = seed_database(args.users, args.tasks_per_user)
+    headers_list = [{"Authorization": f"Bearer {token}"} for token in tokens]
+
+    # ASGITransport 不触发 lifespan，这里手动应用线程池配置
+    to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+
+    results = []
+
+    synthetic_app = build_synthetic_app(args.io_ms)
+    for mode in ("legacy", "threadpool"):
+        results.append(await run_load(
+            synthetic_app, f"synthetic/{mode} (io={args.io_ms}ms)", [f"/{mode}"], [],
+            args.requests, args.concurrency
+        ))
+
+    from backend.main import app
+    results.append(await run_load(
+        app, "app GET /api/tasks/", ["/api/tasks/"], headers_list, args.requests, args.concurrency
+    ))
+    results.append(await run_load(
+        app, "app GET /api/users/me", ["/api/users/me"], headers_list, args.requests, args.concurrency
+    ))
+
+    print(f"threadpool={settings.API_THREADPOOL_SIZE}, concurrency={args.concurrency}")
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API 并发吞吐基准测试")
+    parser.add_argument("--requests", type=int, default=200, help="每个场景的请求总数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发客户端数量")
+    parser.add_argument("--io-ms", type=float, default=20.0, help="合成场景中模拟的阻塞 I/O 耗时（毫秒）")
+    parser.add_argument("--users", type=int, default=50, help="测试用户数量")
+    parser.add_argument("--tasks-per-user", type=int, default=3, help="每个用户的任务数量")
+    asyncio.run(main(parser.parse_args()))
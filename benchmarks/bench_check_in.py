@@ -0,0 +1,453 @@
+"""
+打卡流程离线基准测试
+
+启动本地接龙替身服务（benchmarks.fake_jielong），通过 JIELONG_*_BASE_URL 配置把上游请求指向替身服务，
+签名使用 stub 方式获取（SIGNATURE_PROVIDER=stub），扫码登录的浏览器流程替换为等价的 HTTP 流程，
+在不访问真实接龙、不启动 Chrome 的情况下对以下场景施压：
+
+- cron_burst: 同一分钟触发 N 个定时任务（默认 1000），经 APScheduler 默认的 10 线程执行器调用 scheduled_check_in_task
+- batch: 管理员批量打卡 POST /api/admin/batch_check_in（入队后由 API 进程内置的 worker 执行）
+- qr_storm: 大量用户同时请求扫码登录并轮询状态（request_qrcode + qrcode_status）
+- dashboard: 多个管理员并发轮询仪表盘接口（统计、打卡记录、任务列表）
+
+每个场景报告吞吐量、p50/p99 延迟和运行期间的进程内存峰值（peak RSS），
+可在改动 check_in_worker / CheckInService 前后分别运行以对比结果。
+
+签名获取在 stub 模式下是一次到 /my-form 的 HTTP 请求（从响应头读取签名），不包含浏览器启动耗时，
+因此结果反映的是打卡引擎本身（调度、线程、数据库、HTTP）的开销。
+加 --browser 时改用 Selenium 签名获取和真实的扫码登录流程（需要本机安装 Chrome），用于评估浏览器开销。
+
+运行方式：
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_check_in --scenario all
+    python -m benchmarks.bench_check_in --scenario cron_burst --tasks 1000 --edit-latency-ms 80 --mix success:0.95,out_of_time:0.05
+"""
+import argparse
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+from benchmarks.common import setup_isolated_env, summarize, print_results, RssSampler
+
+setup_isolated_env()
+
+import httpx  # noqa: E402
+import requests  # noqa: E402
+from anyio import to_thread  # noqa: E402
+
+from benchmarks.fake_jielong import FakeJielongConfig, FakeJielongServer, make_fake_token  # noqa: E402
+from backend.config import settings  # noqa: E402
+from backend.models import init_db, User, CheckInTask, CheckInRecord  # noqa: E402
+from backend.models.database import SessionLocal  # noqa: E402
+from backend.utils.jwt import JWTManager  # noqa: E402
+
+# ==================== 上游替身接入 ====================
+
+def use_upstream(base_url: str, qr_poll_interval: float, browser: bool) -> ExitStack:
+    """
+    将打卡和扫码登录的上游访问指向替身服务
+
+    Args:
+        base_url: 替身服务地址
+        qr_poll_interval: 模拟浏览器轮询扫码状态的间隔（秒）
+        browser: 是否使用真实浏览器（Selenium 签名获取 + 扫码登录流程）
+
+    Returns:
+        ExitStack（退出时恢复原配置）
+    """
+    import backend.services.auth_service as auth_service
+    from backend.workers.token_refresher import update_session_file, get_session_status
+
+    stack = ExitStack()
+    overrides = {
+        "JIELONG_WEB_BASE_URL": base_url,
+        "JIELONG_API_BASE_URL": base_url,
+        "JIELONG_COOKIE_DOMAIN": "",
+        "SIGNATURE_PROVIDER": "selenium" if browser else "stub",
+    }
+    for name, value in overrides.items():
+        stack.enter_context(mock.patch.object(settings, name, value))
+    if browser:
+        return stack
+
+    http = requests.Session()
+    http.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=256))
+
+    def fake_token_headless(session_id: str, jwt_sub: str = None, alias: str = None, client_ip: str = "") -> None:
+        # 与 get_token_headless 相同的会话文件状态流转：waiting_scan -> success / error
+        try:
+            qrcode = http.post(f"{base_url}/login/qrcode", timeout=30).json()
+            update_session_file(session_id, {
+                'status': 'waiting_scan',
+                'qr_image_data': qrcode["qrcode_base64"],
+                'jwt_sub': jwt_sub,
+                'alias': alias,
+                'client_ip': client_ip
+            })
+            deadline = time.monotonic() + 120
+            while time.monotonic() < deadline:
+                if get_session_status(session_id) == 'cancelled':
+                    return
+                state = http.get(f"{base_url}/login/poll", params={"ticket": qrcode["ticket"]}, timeout=30).json()
+                if state["status"] == "scanned":
+                    update_session_file(session_id, {
+                        'status': 'success',
+                        'token': state["token"],
+                        'alias': alias,
+                        'client_ip': client_ip
+                    })
+                    return
+                time.sleep(qr_poll_interval)
+            raise TimeoutError("等待扫码超时")
+        except Exception as e:
+            if alias:
+                from backend.services.registration_manager import registration_manager
+                registration_manager.release_alias(alias, session_id)
+            update_session_file(session_id, {'status': 'error', 'message': str(e), 'jwt_sub': jwt_sub})
+
+    stack.enter_context(mock.patch.object(auth_service, "get_token_headless", fake_token_headless))
+    stack.callback(http.close)
+    return stack
+
+
+# ==================== 测试数据 ====================
+
+def seed_database(user_count: int, task_count: int) -> Dict[str, Any]:
+    """
+    写入测试用户（含有效打卡 Token）、管理员和任务
+
+    Returns:
+        {"admin_token": 管理员 JWT, "task_ids": 任务 ID 列表}
+    """
+    init_db()
+    db = SessionLocal()
+    try:
+        admin = User(alias="bench_admin", role="admin", is_approved=True, jwt_exp="0")
+        db.add(admin)
+
+        users = []
+        for i in range(user_count):
+            token = make_fake_token(f"bench-sub-{i}")
+            users.append(User(
+                alias=f"bench_user_{i}",
+                role="user",
+                is_approved=True,
+                jwt_sub=f"bench-sub-{i}",
+                authorization=token,
+                jwt_exp=str(int(time.time()) + 30 * 86400),
+            ))
+        db.add_all(users)
+        db.flush()
+
+        tasks = [
+            CheckInTask(
+                user_id=users[i % user_count].id,
+                payload_config=f'{{"ThreadId": "bench-{i}", "Signature": "bench {i}"}}',
+                name=f"bench task {i}",
+                cron_expression="0 20 * * *",
+                is_active=True,
+            )
+            for i in range(task_count)
+        ]
+        db.add_all(tasks)
+        db.commit()
+
+        return {
+            "admin_token": JWTManager.create_access_token(admin.id, admin.alias),
+            "task_ids": [task.id for task in tasks],
+        }
+    finally:
+        db.close()
+
+
+def count_record_statuses(record_ids: Optional[List[int]] = None, since_id: int = 0) -> Dict[str, int]:
+    """统计打卡记录状态分布"""
+    from sqlalchemy import func
+
+    db = SessionLocal()
+    try:
+        query = db.query(CheckInRecord.status, func.count()).filter(CheckInRecord.id > since_id)
+        if record_ids is not None:
+            query = query.filter(CheckInRecord.id.in_(record_ids))
+        return dict(query.group_by(CheckInRecord.status).all())
+    finally:
+        db.close()
+
+
+def max_record_id() -> int:
+    from sqlalchemy import func
+
+    db = SessionLocal()
+    try:
+        return db.query(func.max(CheckInRecord.id)).scalar() or 0
+    finally:
+        db.close()
+
+
+# ==================== 场景 ====================
+
+def prewarm_signatures(task_ids: List[int]) -> Dict[str, Any]:
+    """模拟调度器在高峰前预热签名（SignatureCache.prewarm_users），返回统计和耗时"""
+    from sqlalchemy.orm import joinedload
+    from backend.services.signature_cache import SignatureCache
+
+    db = SessionLocal()
+    try:
+        tasks = db.query(CheckInTask).options(joinedload(CheckInTask.user)).filter(CheckInTask.id.in_(task_ids)).all()
+        users = [task.user for task in tasks if task.user]
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    stats = SignatureCache.prewarm_users(users)
+    stats["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+@contextmanager
+def track_completions(expected: int):
+    """
+    统计打卡完成时间（包装 worker 调用的 execute_check_in_async / execute_check_in_group）
+
+    Yields:
+        ({task_id: 完成时刻（perf_counter）}, 全部 expected 个任务完成后置位的 Event)
+    """
+    from backend.services.check_in_service import CheckInService
+
+    real_execute = CheckInService.execute_check_in_async
+    real_execute_group = CheckInService.execute_check_in_group
+    finished: Dict[int, float] = {}
+    lock = threading.Lock()
+    all_done = threading.Event()
+
+    def mark_finished(finished_task_ids):
+        with lock:
+            now = time.perf_counter()
+            for task_id in finished_task_ids:
+                finished[task_id] = now
+            if len(finished) >= expected:
+                all_done.set()
+
+    def tracked_execute(task_id, record_id, *args, **kwargs):
+        try:
+            return real_execute(task_id, record_id, *args, **kwargs)
+        finally:
+            mark_finished([task_id])
+
+    def tracked_execute_group(jobs, *args, **kwargs):
+        try:
+            return real_execute_group(jobs, *args, **kwargs)
+        finally:
+            mark_finished([job[0] for job in jobs])
+
+    with mock.patch.object(CheckInService, "execute_check_in_async", staticmethod(tracked_execute)), \
+            mock.patch.object(CheckInService, "execute_check_in_group", staticmethod(tracked_execute_group)):
+        yield finished, all_done
+
+
+def scenario_cron_burst(task_ids: List[int], executor_workers: int, timeout: float, prewarm: bool = False) -> Dict[str, Any]:
+    """同一时刻触发全部定时任务，统计从触发到打卡结果写入的耗时（prewarm 时先预热签名，不计入耗时）"""
+    from backend.services.scheduler_service import scheduled_check_in_task
+
+    prewarm_stats = prewarm_signatures(task_ids) if prewarm else None
+
+    first_record = max_record_id()
+    with RssSampler() as rss, track_completions(len(task_ids)) as (finished, all_done):
+        start = time.perf_counter()
+        # APScheduler BackgroundScheduler 默认使用 10 线程的 ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=executor_workers) as executor:
+            for task_id in task_ids:
+                executor.submit(scheduled_check_in_task, task_id)
+        all_done.wait(timeout)
+        elapsed = time.perf_counter() - start
+
+    latencies = [done - start for done in list(finished.values())]
+    statuses = count_record_statuses(since_id=first_record)
+    errors = len(task_ids) - statuses.get("success", 0)
+    name = f"cron_burst ({len(task_ids)} tasks{', prewarmed' if prewarm else ''})"
+    result = summarize(name, latencies, elapsed, errors, rss.peak_mb)
+    result["statuses"] = statuses
+    if prewarm_stats:
+        print(f"签名预热: {prewarm_stats}")
+    return result
+
+
+async def scenario_batch(app, admin_token: str, task_ids: List[int], timeout: float) -> Dict[str, Any]:
+    """管理员批量打卡：统计入队请求耗时，以及从请求到每个打卡结果写入的耗时和整批吞吐"""
+    first_record = max_record_id()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        with RssSampler() as rss, track_completions(len(task_ids)) as (finished, all_done):
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/admin/batch_check_in",
+                json={"task_ids": task_ids},
+                headers={"Authorization": f"Bearer {admin_token}"},
+            )
+            enqueued = time.perf_counter() - start
+            await to_thread.run_sync(all_done.wait, timeout)
+            elapsed = time.perf_counter() - start
+
+    latencies = [done - start for done in list(finished.values())]
+    statuses = count_record_statuses(since_id=first_record)
+    errors = len(task_ids) - statuses.get("success", 0) if response.status_code == 200 else len(task_ids)
+    result = summarize(f"batch ({len(task_ids)} tasks)", latencies, elapsed, errors, rss.peak_mb)
+    result["enqueue_ms"] = round(enqueued * 1000, 1)
+    result["statuses"] = statuses
+    return result
+
+
+async def scenario_qr_storm(app, users: int, poll_interval: float, timeout: float) -> List[Dict[str, Any]]:
+    """大量新用户同时扫码登录：统计二维码返回耗时和扫码到登录成功的端到端耗时"""
+    qrcode_latencies: List[float] = []
+    login_latencies: List[float] = []
+    errors = 0
+    storm_id = int(time.time())
+
+    async def login(index: int):
+        nonlocal errors
+        # 每个用户独立的客户端地址，避免共享 IP 维度的限流
+        transport = httpx.ASGITransport(app=app, client=(f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}", 40000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            start = time.perf_counter()
+            response = await client.post("/api/auth/request_qrcode", json={"alias": f"storm_{storm_id}_{index}"})
+            qrcode_latencies.append(time.perf_counter() - start)
+            session_id = response.json().get("session_id") if response.status_code == 200 else None
+            if not session_id:
+                errors += 1
+                return
+
+            deadline = time.perf_counter() + timeout
+            while time.perf_counter() < deadline:
+                await asyncio.sleep(poll_interval)
+                state = (await client.get(f"/api/auth/qrcode_status/{session_id}")).json()
+                if state.get("status") == "success":
+                    login_latencies.append(time.perf_counter() - start)
+                    return
+                if state.get("status") == "error":
+                    break
+            errors += 1
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(users)))
+        elapsed = time.perf_counter() - start
+
+    return [
+        summarize(f"qr_storm request_qrcode ({users} users)", qrcode_latencies, elapsed, errors, rss.peak_mb),
+        summarize(f"qr_storm login end-to-end ({users} users)", login_latencies, elapsed, errors, rss.peak_mb),
+    ]
+
+
+async def scenario_dashboard(app, admin_token: str, clients: int, duration: float) -> Dict[str, Any]:
+    """多个管理员并发轮询仪表盘接口（闭环，无等待）"""
+    paths = itertools.cycle([
+        "/api/admin/stats",
+        "/api/check_in/records?skip=0&limit=20",
+        "/api/tasks/",
+        "/api/admin/check_in_timings",
+    ])
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    latencies: List[float] = []
+    errors = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def poller():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                request_start = time.perf_counter()
+                response = await client.get(next(paths), headers=headers)
+                latencies.append(time.perf_counter() - request_start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        with RssSampler() as rss:
+            start = time.perf_counter()
+            deadline = start + duration
+            await asyncio.gather(*(poller() for _ in range(clients)))
+            elapsed = time.perf_counter() - start
+
+    return summarize(f"dashboard ({clients} clients)", latencies, elapsed, errors, rss.peak_mb)
+
+
+# ==================== 入口 ====================
+
+async def main(args: argparse.Namespace) -> None:
+    scenarios = {"cron_burst", "batch", "qr_storm", "dashboard"} if args.scenario == "all" else {args.scenario}
+
+    config = FakeJielongConfig(
+        edit_latency_ms=args.edit_latency_ms,
+        edit_jitter_ms=args.edit_jitter_ms,
+        capture_latency_ms=args.capture_latency_ms,
+        scan_delay_ms=args.scan_delay_ms,
+        mix=args.mix,
+        seed=args.seed,
+    )
+    seeded = seed_database(args.users, args.tasks)
+    task_ids, admin_token = seeded["task_ids"], seeded["admin_token"]
+
+    # ASGITransport 不触发 lifespan，这里手动应用线程池配置
+    to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+
+    from backend.main import app
+    from backend.workers.check_in_queue_worker import check_in_queue_worker
+
+    # 同样手动启动 API 进程内置的打卡 worker（线程模式下由它认领执行打卡作业）
+    check_in_queue_worker.concurrency = args.worker_concurrency
+    check_in_queue_worker.start()
+
+    results: List[Dict[str, Any]] = []
+    with FakeJielongServer(config) as server, use_upstream(server.base_url, args.qr_poll_interval, args.browser):
+        if "cron_burst" in scenarios:
+            results.append(await asyncio.to_thread(
+                scenario_cron_burst, task_ids, args.executor_workers, args.timeout, args.prewarm
+            ))
+        if "batch" in scenarios:
+            results.append(await scenario_batch(app, admin_token, task_ids[:args.batch_size], args.timeout))
+        if "qr_storm" in scenarios:
+            results.extend(await scenario_qr_storm(app, args.qr_users, args.qr_poll_interval, args.timeout))
+        if "dashboard" in scenarios:
+            results.append(await scenario_dashboard(app, admin_token, args.dashboard_clients, args.dashboard_seconds))
+        upstream_stats = server.stats
+    check_in_queue_worker.stop()
+
+    statuses = {r["scenario"]: r.pop("statuses") for r in results if "statuses" in r}
+
+    print(
+        f"threadpool={settings.API_THREADPOOL_SIZE}, check_in_workers={args.worker_concurrency}, "
+        f"edit_latency={args.edit_latency_ms}ms, capture_latency={args.capture_latency_ms}ms, mix={args.mix}, signature={'selenium' if args.browser else 'stub'}"
+    )
+    print_results(results)
+    for scenario, counts in statuses.items():
+        print(f"{scenario} 记录状态: {counts}")
+    print(f"替身服务请求计数: {upstream_stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="打卡流程离线基准测试")
+    parser.add_argument("--scenario", default="all", choices=["all", "cron_burst", "batch", "qr_storm", "dashboard"])
+    parser.add_argument("--users", type=int, default=100, help="测试用户数量")
+    parser.add_argument("--tasks", type=int, default=1000, help="定时任务数量（cron_burst 全部触发）")
+    parser.add_argument("--executor-workers", type=int, default=10, help="模拟调度器执行器线程数（APScheduler 默认 10）")
+    parser.add_argument("--worker-concurrency", type=int, default=settings.CHECK_IN_WORKER_CONCURRENCY, help="内置打卡 worker 的并发数")
+    parser.add_argument("--prewarm", action="store_true", help="cron_burst 前先预热签名（模拟调度器的高峰前预热）")
+    parser.add_argument("--batch-size", type=int, default=100, help="批量打卡的任务数量")
+    parser.add_argument("--qr-users", type=int, default=50, help="同时扫码登录的用户数量")
+    parser.add_argument("--qr-poll-interval", type=float, default=1.0, help="扫码状态轮询间隔（秒）")
+    parser.add_argument("--dashboard-clients", type=int, default=20, help="并发轮询仪表盘的管理员数量")
+    parser.add_argument("--dashboard-seconds", type=float, default=10.0, help="仪表盘轮询持续时间（秒）")
+    parser.add_argument("--edit-latency-ms", type=float, default=50.0, help="EditRecord 基础延迟（毫秒）")
+    parser.add_argument("--edit-jitter-ms", type=float, default=20.0, help="EditRecord 延迟抖动上限（毫秒）")
+    parser.add_argument("--capture-latency-ms", type=float, default=0.0, help="签名获取延迟（毫秒，模拟页面加载）")
+    parser.add_argument("--scan-delay-ms", type=float, default=2000.0, help="扫码会话多久后视为已扫码（毫秒）")
+    parser.add_argument("--mix", default="success:1", help="EditRecord 响应比例，如 success:0.9,out_of_time:0.1")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--browser", action="store_true", help="使用 Selenium 签名获取和真实扫码登录流程（需要 Chrome）")
+    parser.add_argument("--timeout", type=float, default=300.0, help="单个场景最长等待时间（秒）")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,167 @@
+"""
+API 冷启动基准测试
+
+每次运行启动一个全新的 Python 解释器（子进程），统计：
+- import_profile: python -X importtime 导入 backend.main 的总耗时、耗时最多的顶层包，
+  以及只应由浏览器 / 打卡 worker 按需导入的重型依赖（selenium、requests、apscheduler）是否被提前加载
+- startup: 导入应用、执行 lifespan 直到开始响应请求（/health）的耗时，
+  以及后台加载完全部定时任务、/ready 返回 200 的耗时
+
+可在改动导入结构或 lifespan 前后分别运行以对比冷启动时间。
+
+运行方式：
+    python -m benchmarks.bench_startup --runs 5 --tasks 1000
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks.common import PROJECT_ROOT, setup_isolated_env, print_results
+
+setup_isolated_env()
+
+from backend.models import init_db, User, CheckInTask  # noqa: E402
+from backend.models.database import SessionLocal  # noqa: E402
+
+# API 进程启动时不应导入的重型依赖（由浏览器 worker、打卡 worker 和后台调度器线程按需导入）
+DEFERRED_MODULES = ("selenium", "requests", "apscheduler")
+
+# 子进程：导入应用并执行 lifespan，输出各阶段耗时（毫秒）
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from backend.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    client.get("/health")
+    serving = time.perf_counter()
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.005)
+    ready = time.perf_counter()
+    scheduler = client.get("/ready").json()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "serving_ms": (serving - start) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "scheduler": scheduler["scheduler"],
+    "tasks": (scheduler["tasks"] or {}).get("loaded", 0),
+}))
+"""
+
+
+def seed_database(user_count: int, task_count: int) -> None:
+    """写入测试用户和定时任务（调度器启动时加载）"""
+    init_db()
+    db = SessionLocal()
+    try:
+        users = [User(alias=f"bench_user_{i}", role="user", is_approved=True, jwt_exp="0") for i in range(user_count)]
+        db.add_all(users)
+        db.flush()
+        db.add_all([
+            CheckInTask(
+                user_id=users[i % user_count].id,
+                payload_config=f'{{"ThreadId": "bench-{i}", "Signature": "bench {i}"}}',
+                name=f"bench task {i}",
+                cron_expression=f"{i % 60} 20 * * *",
+                is_active=True,
+            )
+            for i in range(task_count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    """在项目根目录下启动新的解释器"""
+    return subprocess.run(
+        [sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    解析 -X importtime 的输出
+
+    Returns:
+        {模块名: 累计导入耗时（微秒）}
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, cumulative, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        modules[name] = int(cumulative)
+    return modules
+
+
+def import_profile(runs: int, top: int) -> Dict[str, Any]:
+    """统计 backend.main 的导入耗时和导入的模块"""
+    totals = []
+    package_us: Dict[str, List[int]] = defaultdict(list)
+    loaded = set()
+    for _ in range(runs):
+        modules = parse_importtime(run_python(["-X", "importtime", "-c", "import backend.main"]).stderr)
+        totals.append(modules.get("backend.main", 0) / 1000)
+        loaded.update(modules)
+
+        # 顶层包的累计耗时包含其导入的子模块和依赖
+        for name, cumulative in modules.items():
+            if "." not in name:
+                package_us[name].append(cumulative)
+
+    slowest = sorted(package_us.items(), key=lambda item: -statistics.median(item[1]))[:top]
+    print("耗时最多的顶层包（累计导入耗时中位数）：")
+    for package, samples in slowest:
+        print(f"  {package:<24} {statistics.median(samples) / 1000:8.1f} ms")
+
+    deferred = [m for m in DEFERRED_MODULES if any(name == m or name.startswith(m + ".") for name in loaded)]
+    return {
+        "scenario": "import_profile",
+        "runs": runs,
+        "import_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "modules": len(loaded),
+        "eager_heavy_imports": ",".join(deferred) or "-",
+    }
+
+
+def startup(runs: int) -> Dict[str, Any]:
+    """统计导入、开始响应请求和调度器就绪的耗时"""
+    samples = [json.loads(run_python(["-c", STARTUP_SCRIPT]).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return {
+        "scenario": "startup",
+        "runs": runs,
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "serving_ms": round(statistics.median(s["serving_ms"] for s in samples), 1),
+        "ready_ms": round(statistics.median(s["ready_ms"] for s in samples), 1),
+        "scheduler": samples[-1]["scheduler"],
+        "tasks_loaded": samples[-1]["tasks"],
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    seed_database(args.users, args.tasks)
+
+    results = [import_profile(args.runs, args.top)]
+    results.append(startup(args.runs))
+
+    print()
+    print(f"runs={args.runs}, tasks={args.tasks}")
+    for result in results:
+        print_results([result])
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API 冷启动基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="每个场景启动的解释器次数（取中位数）")
+    parser.add_argument("--tasks", type=int, default=1000, help="调度器启动时加载的定时任务数量")
+    parser.add_argument("--users", type=int, default=50, help="测试用户数量")
+    parser.add_argument("--top", type=int, default=10, help="列出耗时最多的顶层包数量")
+    main(parser.parse_args())
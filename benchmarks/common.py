@@ -0,0 +1,149 @@
+"""
+基准测试公共工具
+
+- 隔离的临时数据库 / 日志目录（必须在导入 backend 之前调用 setup_isolated_env）
+- 延迟统计（吞吐量、p50/p99）
+- 进程内存峰值采样（peak RSS）
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+import statistics
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def setup_isolated_env() -> Path:
+    """
+    为基准测试创建独立的临时目录，并通过环境变量覆盖数据库、日志、会话和限流计数路径
+
+    Returns:
+        临时目录路径
+    """
+    work_dir = Path(tempfile.mkdtemp(prefix="checkin-bench-"))
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'bench.db'}"
+    os.environ["LOG_FILE"] = str(work_dir / "bench.log")
+    os.environ["SESSION_DIR"] = str(work_dir / "sessions")
+    os.environ["RATE_LIMIT_DB"] = str(work_dir / "ratelimit.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    return work_dir
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法，与 /api/admin/check_in_timings 的统计方式相同）"""
+    # 在函数内导入：本模块须在 setup_isolated_env 之前可导入
+    from backend.utils.metrics import nearest_rank_percentile
+
+    if not samples:
+        return 0.0
+    return nearest_rank_percentile(sorted(samples), pct)
+
+
+def summarize(
+    name: str,
+    latencies: List[float],
+    elapsed: float,
+    errors: int = 0,
+    peak_rss_mb: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    汇总一次场景运行的结果
+
+    Args:
+        name: 场景名称
+        latencies: 每个请求的耗时（秒）
+        elapsed: 场景总耗时（秒）
+        errors: 失败次数
+        peak_rss_mb: 场景运行期间的进程内存峰值（MB，可选）
+
+    Returns:
+        结果字典
+    """
+    result = {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+    if peak_rss_mb is not None:
+        result["peak_rss_mb"] = round(peak_rss_mb, 1)
+    return result
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """以表格形式打印结果"""
+    if not results:
+        return
+    columns = list(results[0].keys())
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in results)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for r in results:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+class Timer:
+    """简单计时器"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def current_rss_mb() -> float:
+    """当前进程常驻内存（MB），非 Linux 平台退回到 ru_maxrss（历史峰值）"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 单位为字节，Linux 为 KB
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RssSampler:
+    """
+    后台线程定期采样进程内存，统计代码块运行期间的峰值
+
+    ru_maxrss 是整个进程生命周期的峰值，无法区分多个场景，因此按场景单独采样
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_mb = current_rss_mb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
@@ -0,0 +1,331 @@
+"""
+接龙服务本地替身（i.jielong.com + api.jielong.com）
+
+在一个本地 HTTP 服务中模拟打卡流程依赖的上游接口，用于离线基准测试和联调：
+- GET  /login                    QQ 扫码登录页（选择器与 token_refresher 使用的一致，扫码后写入 token Cookie）
+- POST /login/qrcode             创建扫码会话，返回二维码图片（Base64）和 ticket
+- GET  /login/poll?ticket=...    查询扫码状态，扫码完成后返回 token
+- GET  /my-class                 同源空白页（用于设置 Cookie）
+- GET  /my-form                  表单页，页面脚本携带 x-api-request-payload 请求头发起 API 请求，
+                                 响应头中也带有同一签名，便于非浏览器客户端直接读取
+- POST /api/CheckIn/EditRecord   打卡接口，延迟和响应文本可配置
+
+运行方式（独立启动，供手动联调）：
+    python -m benchmarks.fake_jielong --port 8765 --edit-latency-ms 80 --mix success:0.9,out_of_time:0.1
+"""
+import argparse
+import base64
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# EditRecord 响应文本（与 check_in_worker 的判定分支一一对应）
+RESPONSE_TEXTS = {
+    "success": {"Type": "000001", "Data": "打卡成功", "Description": ""},
+    "duplicate": {"Type": "000002", "Data": None, "Description": "该打卡已被提交，请勿重复提交"},
+    "out_of_time": {"Type": "000003", "Data": None, "Description": "不在打卡时间范围内"},
+    "token_expired": {"Type": "000401", "Data": None, "Description": "未登录或登录已过期"},
+    "unknown": {"Type": "000500", "Data": None, "Description": "服务繁忙"},
+}
+
+# 1x1 PNG，作为二维码图片
+_QR_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    """
+    解析响应比例配置
+
+    Args:
+        spec: 形如 "success:0.9,out_of_time:0.1" 的字符串（权重无需归一化）
+
+    Returns:
+        [(响应类型, 权重)]
+    """
+    mix = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition(":")
+        name = name.strip()
+        if name not in RESPONSE_TEXTS:
+            raise ValueError(f"未知的响应类型: {name}（可选: {', '.join(RESPONSE_TEXTS)}）")
+        mix.append((name, float(weight or 1)))
+    if not mix:
+        raise ValueError("响应比例不能为空")
+    return mix
+
+
+def make_fake_token(sub: str, ttl_seconds: int = 30 * 86400) -> str:
+    """
+    生成与接龙 token 结构相同的 JWT（后端只解析 sub 和 exp，不校验签名）
+
+    Args:
+        sub: 用户标识（对应 User.jwt_sub）
+        ttl_seconds: 有效期（秒）
+    """
+    def encode(part: Dict) -> str:
+        raw = json.dumps(part, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    header = encode({"alg": "HS256", "typ": "JWT"})
+    payload = encode({"sub": sub, "exp": int(time.time()) + ttl_seconds})
+    return f"{header}.{payload}.{secrets.token_urlsafe(32)}"
+
+
+class FakeJielongConfig:
+    """替身服务配置"""
+
+    def __init__(
+        self,
+        edit_latency_ms: float = 50.0,
+        edit_jitter_ms: float = 0.0,
+        capture_latency_ms: float = 0.0,
+        scan_delay_ms: float = 2000.0,
+        mix: str = "success:1",
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            edit_latency_ms: EditRecord 基础延迟（毫秒）
+            edit_jitter_ms: EditRecord 延迟随机抖动上限（毫秒）
+            capture_latency_ms: /my-form 返回签名前的延迟（毫秒，模拟页面加载）
+            scan_delay_ms: 创建扫码会话后多久视为"已扫码"（毫秒）
+            mix: EditRecord 响应比例，见 parse_mix
+            seed: 随机种子（可选，便于复现）
+        """
+        self.edit_latency_ms = edit_latency_ms
+        self.edit_jitter_ms = edit_jitter_ms
+        self.capture_latency_ms = capture_latency_ms
+        self.scan_delay_ms = scan_delay_ms
+        self.mix = parse_mix(mix)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def pick_response(self) -> str:
+        names, weights = zip(*self.mix)
+        with self.lock:
+            return self.random.choices(names, weights)[0]
+
+    def edit_delay(self) -> float:
+        with self.lock:
+            jitter = self.random.uniform(0, self.edit_jitter_ms) if self.edit_jitter_ms else 0.0
+        return (self.edit_latency_ms + jitter) / 1000
+
+
+_LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>接龙管家 - 登录</title></head>
+<body>
+<div class="login-wrap">
+  <div class="toggle" onclick="document.getElementById('qq').style.display='block'">QQ 登录</div>
+  <div id="qq" style="display:none">
+    <label><input class="ant-checkbox-input" type="checkbox">同意服务协议</label>
+    <button class="css-1wli0ry ant-btn ant-btn-default login-btn" onclick="startLogin()">立即登录</button>
+    <div id="login_container"></div>
+  </div>
+</div>
+<script>
+function startLogin() {
+  fetch('/login/qrcode', {method: 'POST'}).then(r => r.json()).then(data => {
+    var img = document.createElement('img');
+    img.src = 'data:image/png;base64,' + data.qrcode_base64;
+    img.width = 200; img.height = 200;
+    document.getElementById('login_container').appendChild(img);
+    var timer = setInterval(function () {
+      fetch('/login/poll?ticket=' + data.ticket).then(r => r.json()).then(s => {
+        if (s.status === 'scanned') {
+          clearInterval(timer);
+          document.cookie = 'token=' + s.token + '; path=/';
+        }
+      });
+    }, 500);
+  });
+}
+</script>
+</body></html>
+"""
+
+_MY_FORM_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>我的表单</title></head>
+<body>
+<div id="forms">加载中...</div>
+<script>
+fetch('/api/Form/List', {headers: {'x-api-request-payload': '%s'}})
+  .then(r => r.json()).then(() => { document.getElementById('forms').textContent = '表单列表'; });
+</script>
+</body></html>
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """请求处理（server.config / server.stats 由 FakeJielongServer 注入）"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # 基准测试时不输出访问日志
+        pass
+
+    def _count(self, key: str) -> None:
+        with self.server.stats_lock:
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(data, ensure_ascii=False).encode(), "application/json; charset=utf-8", headers)
+
+    def _send_html(self, html: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(200, html.encode(), "text/html; charset=utf-8", headers)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        config: FakeJielongConfig = self.server.config
+
+        if url.path == "/login":
+            self._count("login_page")
+            self._send_html(_LOGIN_PAGE)
+        elif url.path == "/login/poll":
+            self._count("login_poll")
+            ticket = parse_qs(url.query).get("ticket", [""])[0]
+            with self.server.stats_lock:
+                created = self.server.tickets.get(ticket)
+            if created is None:
+                self._send_json({"status": "expired"}, status=404)
+            elif time.monotonic() - created < config.scan_delay_ms / 1000:
+                self._send_json({"status": "waiting"})
+            else:
+                self._send_json({"status": "scanned", "token": make_fake_token(f"fake-{ticket}")})
+        elif url.path == "/my-class":
+            self._count("my_class")
+            self._send_html("<!DOCTYPE html><html><body>我的班级</body></html>")
+        elif url.path == "/my-form":
+            self._count("my_form")
+            if config.capture_latency_ms:
+                time.sleep(config.capture_latency_ms / 1000)
+            signature = secrets.token_hex(32)
+            self._send_html(_MY_FORM_PAGE % signature, headers={"x-api-request-payload": signature})
+        elif url.path == "/api/Form/List":
+            self._count("form_list")
+            self._send_json({"Type": "000001", "Data": []})
+        else:
+            self._send_json({"message": "not found"}, status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        config: FakeJielongConfig = self.server.config
+
+        # 读取请求体（保持连接可复用）
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        if url.path == "/login/qrcode":
+            self._count("login_qrcode")
+            ticket = secrets.token_urlsafe(12)
+            with self.server.stats_lock:
+                self.server.tickets[ticket] = time.monotonic()
+            self._send_json({"ticket": ticket, "qrcode_base64": base64.b64encode(_QR_PNG).decode()})
+        elif url.path == "/api/CheckIn/EditRecord":
+            self._count("edit_record")
+            time.sleep(config.edit_delay())
+            if not self.headers.get("authorization") or not self.headers.get("x-api-request-payload"):
+                self._send_json(RESPONSE_TEXTS["token_expired"], status=401)
+                return
+            kind = config.pick_response()
+            self._count(f"edit_record_{kind}")
+            self._send_json(RESPONSE_TEXTS[kind])
+        else:
+            self._send_json({"message": "not found"}, status=404)
+
+
+class FakeJielongServer:
+    """在后台线程中运行的接龙替身服务"""
+
+    def __init__(self, config: Optional[FakeJielongConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            config: 服务配置（默认 FakeJielongConfig()）
+            host: 监听地址
+            port: 监听端口（0 表示随机端口）
+        """
+        self.config = config or FakeJielongConfig()
+
+        # 打卡突发时会同时建立大量连接，放大监听队列避免连接被拒绝
+        ThreadingHTTPServer.request_queue_size = 1024
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.config = self.config
+        self._server.stats = {}
+        self._server.tickets = {}
+        self._server.stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """各接口请求计数"""
+        with self._server.stats_lock:
+            return dict(self._server.stats)
+
+    def start(self) -> "FakeJielongServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="接龙服务本地替身")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--edit-latency-ms", type=float, default=50.0, help="EditRecord 基础延迟（毫秒）")
+    parser.add_argument("--edit-jitter-ms", type=float, default=0.0, help="EditRecord 延迟抖动上限（毫秒）")
+    parser.add_argument("--capture-latency-ms", type=float, default=0.0, help="/my-form 签名延迟（毫秒）")
+    parser.add_argument("--scan-delay-ms", type=float, default=2000.0, help="扫码会话多久后视为已扫码（毫秒）")
+    parser.add_argument("--mix", default="success:1", help=f"EditRecord 响应比例（{', '.join(RESPONSE_TEXTS)}）")
+    args = parser.parse_args()
+
+    server = FakeJielongServer(
+        FakeJielongConfig(
+            edit_latency_ms=args.edit_latency_ms,
+            edit_jitter_ms=args.edit_jitter_ms,
+            capture_latency_ms=args.capture_latency_ms,
+            scan_delay_ms=args.scan_delay_ms,
+            mix=args.mix,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+    print(f"接龙替身服务已启动: {server.base_url}（Ctrl+C 退出）")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
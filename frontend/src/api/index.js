@@ -184,6 +184,21 @@ export const adminAPI = {
     });
   },
 
+  // 批量修改任务 Cron 表达式
+  batchUpdateCron: (taskIds, cronExpression) => {
+    return client.post('/api/admin/batch_update_cron', {
+      task_ids: taskIds,
+      cron_expression: cronExpression,
+    });
+  },
+
+  // 批量删除任务
+  batchDeleteTasks: taskIds => {
+    return client.post('/api/admin/batch_delete_tasks', {
+      task_ids: taskIds,
+    });
+  },
+
   // 批量触发打卡（V2 更新）
   batchCheckIn: taskIds => {
     return client.post('/api/admin/batch_check_in', {
@@ -245,6 +260,11 @@ export const templateAPI = {
   createTaskFromTemplate: requestData => {
     return client.post('/api/templates/create-task', requestData);
   },
+
+  // 从模板批量创建任务（管理员）
+  createTasksFromTemplateBulk: requestData => {
+    return client.post('/api/templates/create-tasks-bulk', requestData);
+  },
 };
 
 // 导出所有 API
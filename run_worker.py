@@ -0,0 +1,88 @@
+"""
+Check-in worker startup script - Executes queued check-ins in a separate process
+打卡 worker 启动脚本 - 在独立进程中执行队列中的打卡作业
+
+配合 CHECK_IN_EXECUTION_MODE=queue 使用：API 进程只写入待执行的打卡记录，
+本进程认领并执行（启动浏览器获取签名、提交打卡、写入结果）。可在多核或多台主机上同时运行多个实例。
+
+用法：
+    python run_worker.py [--concurrency 4] [--email] [--log-file logs/worker-1.log] [--metrics-port 9101]
+"""
+import sys
+import os
+import argparse
+import logging
+import signal
+import threading
+from pathlib import Path
+
+# Add project root directory to Python path
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR))
+os.chdir(BASE_DIR)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="打卡 worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="同时执行的打卡数（默认 CHECK_IN_WORKER_CONCURRENCY）")
+    parser.add_argument("--email", action="store_true", help="同时在本进程发送邮件发件箱中的邮件")
+    parser.add_argument("--log-file", default=None, help="日志文件路径（默认只输出到标准输出）")
+    parser.add_argument("--metrics-port", type=int, default=None, help="在该端口提供 /metrics（本进程的打卡指标，默认不启动）")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="/metrics 监听地址（默认 127.0.0.1）")
+    args = parser.parse_args()
+
+    from backend.config import settings
+
+    from backend.utils.log_buffer import log_buffer, RingBufferHandler
+
+    # 结构化日志缓冲区：LOG_BUFFER_STORE 为 sqlite（queue 模式默认）时与 API 进程共享，可按任务/记录查询本进程的打卡日志
+    handlers = [logging.StreamHandler(), RingBufferHandler(log_buffer)]
+    if args.log_file:
+        # 按 LOG_ROTATION 轮转：与 API 进程写同一个文件时需使用 external，否则为每个 worker 指定单独的文件
+        from backend.utils.log_file import create_file_handler
+        handlers.append(create_file_handler(args.log_file))
+    logging.basicConfig(
+        level=settings.LOG_LEVEL,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=handlers,
+    )
+    logger = logging.getLogger("run_worker")
+
+    if settings.CHECK_IN_EXECUTION_MODE.lower() != "queue":
+        logger.warning("CHECK_IN_EXECUTION_MODE 不是 queue，API 进程内置的 worker 也会认领打卡作业")
+
+    from backend.models import init_db
+    from backend.workers.check_in_queue_worker import CheckInQueueWorker
+    from backend.workers.email_outbox_worker import email_outbox_worker
+
+    init_db()
+
+    # queue 模式下打卡指标记录在 worker 进程中，API 进程的 /metrics 不包含这些指标
+    metrics_server = None
+    if args.metrics_port:
+        from backend.utils.metrics import start_metrics_server
+        metrics_server = start_metrics_server(args.metrics_port, args.metrics_host, settings.METRICS_TOKEN)
+        logger.info(f"指标端点: http://{args.metrics_host}:{args.metrics_port}/metrics")
+
+    worker = CheckInQueueWorker(concurrency=args.concurrency)
+    worker.start()
+    if args.email:
+        email_outbox_worker.start()
+
+    # SIGTERM / SIGINT：停止取件，等待正在执行的打卡完成后退出
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    stop_event.wait()
+
+    logger.info(f"收到退出信号，等待 {worker.in_flight} 个正在执行的打卡完成...")
+    worker.stop()
+    if args.email:
+        email_outbox_worker.stop()
+    log_buffer.flush()
+    if metrics_server:
+        metrics_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()